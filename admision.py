@@ -0,0 +1,118 @@
+"""
+Control de admisión para la ruta pública de escritura
+Tope de requests en curso por worker y token bucket por IP compartido entre
+workers (archivo mapeado en memoria en RUN_DIR).
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows (desarrollo): los buckets quedan locales al proceso
+    fcntl = None
+
+# Casilla del token bucket: tokens disponibles y momento (time.time()) del último cálculo
+_SLOT = struct.Struct('dd')
+
+
+class InFlightLimiter:
+    """Admite como máximo `limit` requests simultáneas en este worker.
+
+    Si está lleno, `acquire()` espera hasta `wait` segundos a que se libere un
+    lugar y, si no, devuelve False para responder 503 de inmediato.
+    """
+
+    def __init__(self, limit, wait=0.0):
+        self.limit = limit
+        self.wait = wait
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self):
+        with self._cond:
+            if self.in_flight >= self.limit and self.wait > 0:
+                deadline = time.monotonic() + self.wait
+                while self.in_flight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+
+class SharedTokenBucket:
+    """Token bucket por llave (IP) compartido entre procesos.
+
+    Las llaves se reparten por hash en `slots` casillas de un archivo mapeado
+    en memoria; cada casilla se bloquea con fcntl.lockf sobre su rango de
+    bytes, así que dos workers solo se esperan si atienden la misma casilla.
+    Dos llaves que caen en la misma casilla comparten cupo (error conservador).
+    Una casilla en ceros equivale a un bucket lleno.
+    """
+
+    def __init__(self, path, rate, burst, slots=65536):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.slots = slots
+        self.limited = 0
+        self._lock = threading.Lock()
+        self._fd = None
+        self._mm = None
+        self._local = {}
+
+    def _open(self):
+        # Se abre en el primer uso (después del fork de Gunicorn)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        size = self.slots * _SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._mm = mmap.mmap(fd, size)
+        self._fd = fd
+
+    def _take(self, tokens, last, now):
+        elapsed = max(0.0, now - last)
+        tokens = min(float(self.burst), tokens + elapsed * self.rate)
+        if tokens >= 1:
+            return True, tokens - 1, 0.0
+        return False, tokens, (1 - tokens) / self.rate
+
+    def consume(self, key):
+        """Toma un token para `key`; devuelve (permitido, segundos hasta el siguiente)."""
+        now = time.time()
+        index = zlib.crc32(key.encode('utf-8')) % self.slots
+        # fcntl bloquea por proceso: el candado de hilos cubre los hilos del worker
+        with self._lock:
+            if fcntl is None:
+                tokens, last = self._local.get(index, (0.0, 0.0))
+                allowed, tokens, wait = self._take(tokens, last, now)
+                self._local[index] = (tokens, now)
+            else:
+                if self._mm is None:
+                    self._open()
+                offset = index * _SLOT.size
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, _SLOT.size, offset)
+                try:
+                    tokens, last = _SLOT.unpack_from(self._mm, offset)
+                    allowed, tokens, wait = self._take(tokens, last, now)
+                    _SLOT.pack_into(self._mm, offset, tokens, now)
+                finally:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, _SLOT.size, offset)
+            if not allowed:
+                self.limited += 1
+        return allowed, wait
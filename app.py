@@ -4,25 +4,51 @@ Aplicación Flask para gestión de eventos y confirmaciones
 """
 import os
 import csv
+import hashlib
+import hmac
 import io
+import json
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import math
+import mimetypes
 import re
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
 from functools import wraps
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from flask import (
     Flask, request, render_template, redirect, url_for, 
-    jsonify, session, Response, flash
+    jsonify, session, Response, flash, stream_with_context, has_request_context,
+    send_file, send_from_directory, before_render_template, template_rendered
 )
+from flask.json.provider import DefaultJSONProvider
+from markupsafe import Markup, escape
+import click
 from dotenv import load_dotenv
 import mysql.connector
-from mysql.connector import pooling, Error as MySQLError
-from werkzeug.security import check_password_hash, generate_password_hash
+from mysql.connector import errorcode, pooling, Error as MySQLError
+from werkzeug.http import is_resource_modified
+from werkzeug.security import check_password_hash, generate_password_hash, safe_join
+
+import registro
+import tiempos
+from admision import InFlightLimiter, SharedTokenBucket
+from exportaciones import FORMATOS as EXPORT_FORMATOS, LISTO as EXPORT_LISTO, ExportJobs, ExportQueueFull, formato_disponible
+from metricas import MultiProcessStore, Registry, render_prometheus
+from pool_conexiones import ElasticPool, PooledConnection, PoolTimeout, ReplicaHealth
+from validacion import PLACAS_REGEX, normalize_text, validate_confirmacion, validation_error_payload
 
 def configure_logging():
-    """Configura logging a consola + archivo persistente (rotación diaria)."""
+    """Configura logging a consola + archivo persistente (rotación diaria).
+
+    Los handlers corren en un hilo aparte (registro.py): la request solo
+    encola el registro. LOG_QUEUE=0 vuelve a escribir en el hilo que loguea.
+    """
     # Permite controlar por variables de entorno / .env
     level_name = (os.getenv('LOG_LEVEL') or 'INFO').upper()
     level = getattr(logging, level_name, logging.INFO)
@@ -32,46 +58,31 @@ def configure_logging():
     log_dir = os.getenv('LOG_DIR') or default_log_dir
     log_file = os.getenv('LOG_FILE') or os.path.join(log_dir, 'app.log')
 
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-    fmt = logging.Formatter(
-        '%(asctime)s %(levelname)s pid=%(process)d %(name)s: %(message)s'
+    pipeline = registro.configure_logging(
+        level,
+        log_file,
+        backup_count=int(os.getenv('LOG_BACKUP_COUNT', '14')),
+        json_output=(os.getenv('LOG_FORMAT') or 'text').lower() == 'json',
+        use_queue=os.getenv('LOG_QUEUE', '1').lower() in ('1', 'true', 'yes', 'on'),
+        max_queue=int(os.getenv('LOG_QUEUE_MAX', '10000')),
     )
 
-    root = logging.getLogger()
-    root.setLevel(level)
-
-    # Evitar duplicar handlers si Gunicorn/uWSGI ya configuraron logging
-    has_file_handler = any(isinstance(h, TimedRotatingFileHandler) for h in root.handlers)
-    if not has_file_handler:
-        file_handler = TimedRotatingFileHandler(
-            log_file,
-            when='midnight',
-            backupCount=int(os.getenv('LOG_BACKUP_COUNT', '14')),
-            encoding='utf-8',
-        )
-        file_handler.setLevel(level)
-        file_handler.setFormatter(fmt)
-        root.addHandler(file_handler)
-
-    has_stream_handler = any(isinstance(h, logging.StreamHandler) for h in root.handlers)
-    if not has_stream_handler:
-        stream_handler = logging.StreamHandler()
-        stream_handler.setLevel(level)
-        stream_handler.setFormatter(fmt)
-        root.addHandler(stream_handler)
-
     # Mantener el nivel de werkzeug alineado
     logging.getLogger('werkzeug').setLevel(level)
+    return pipeline
 
 
 # Cargar variables de entorno antes de configurar logging
 load_dotenv()
 
 # Configurar logging (archivo + consola)
-configure_logging()
+log_pipeline = configure_logging()
 logger = logging.getLogger(__name__)
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Directorio para estado compartido entre workers del mismo host (versiones de caché, etc.)
+RUN_DIR = os.getenv('RUN_DIR') or os.path.join(BASE_DIR, 'run')
+
 # Inicializar Flask
 app = Flask(__name__)
 # Soportar tanto SECRET_KEY como FLASK_SECRET_KEY para compatibilidad
@@ -85,10 +96,9 @@ def log_request_summary():
         path = request.path or ''
         if path.startswith('/admin') or path.startswith('/api/'):
             ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-            ua = (request.headers.get('User-Agent') or '')
-            if len(ua) > 160:
-                ua = ua[:160] + '...'
-            logger.info('HTTP %s %s ip=%s', request.method, path, ip)
+            # extra: campos propios en la salida JSON (LOG_FORMAT=json)
+            logger.info('HTTP %s %s ip=%s', request.method, path, ip,
+                        extra={'method': request.method, 'path': path, 'ip': ip})
     except Exception:
         # Nunca romper la request por logging
         pass
@@ -130,6 +140,131 @@ def list_predefined_locations():
         for key, value in PREDEFINED_LOCATIONS.items()
     ]
 
+# ============================================================================
+# MÉTRICAS (Prometheus, combinadas entre workers vía RUN_DIR/metrics)
+# ============================================================================
+
+metrics = Registry()
+DB_POOL_CHECKOUT_SECONDS = metrics.histogram(
+    'db_pool_checkout_seconds', 'Espera para obtener una conexión del pool'
+)
+DB_QUERY_SECONDS = metrics.histogram(
+    'db_query_seconds', 'Duración de cada sentencia SQL por ruta', ('route',)
+)
+DB_COMMIT_SECONDS = metrics.histogram('db_commit_seconds', 'Duración de los commits')
+DB_ROLLBACK_SECONDS = metrics.histogram('db_rollback_seconds', 'Duración de los rollbacks')
+DB_POOL_ERRORS = metrics.counter('db_pool_errors_total', 'PoolError al obtener conexión')
+DB_ERRORS = metrics.counter('db_errors_total', 'Errores MySQL por errno', ('errno',))
+DB_READS = metrics.counter('db_reads_total', 'Conexiones de lectura por destino (con réplica configurada)', ('target',))
+
+if log_pipeline is not None:
+    metrics.callback('log_queue_size', 'Registros de log en cola sin escribir', 'gauge', lambda: log_pipeline.stats()['queued'])
+    metrics.callback('log_records_dropped_total', 'Registros de log descartados por cola llena', 'counter', lambda: log_pipeline.stats()['dropped'])
+
+metrics_store = MultiProcessStore(
+    metrics,
+    os.getenv('METRICS_DIR') or os.path.join(RUN_DIR, 'metrics'),
+    interval=float(os.getenv('METRICS_FLUSH_INTERVAL', 1)),
+)
+
+
+def current_route():
+    """Etiqueta de ruta para métricas (endpoint de Flask o 'background')."""
+    if has_request_context():
+        return request.endpoint or 'unknown'
+    return 'background'
+
+
+@app.after_request
+def flush_metrics(response):
+    """Publica el snapshot de métricas de este worker (como máximo 1 vez por intervalo)."""
+    try:
+        metrics_store.maybe_flush()
+    except Exception:
+        logger.exception("Error al volcar métricas")
+    return response
+
+
+# ============================================================================
+# TIEMPOS POR REQUEST (Server-Timing y log de requests lentas)
+# ============================================================================
+
+# Spans de pool, consultas, commit, render, JSON y compresión por request.
+# Apagado, cada punto instrumentado solo lee una ContextVar vacía
+REQUEST_TIMING = os.getenv('REQUEST_TIMING', '1').lower() in ('1', 'true', 'yes', 'on')
+# Requests más lentas que esto (ms, hasta cerrar la respuesta) se loguean con sus spans; 0 = nunca
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 1000))
+REQUEST_TIMING_MAX_SPANS = int(os.getenv('REQUEST_TIMING_MAX_SPANS', 200))
+
+SLOW_REQUESTS = metrics.counter('http_slow_requests_total', 'Requests sobre SLOW_REQUEST_MS por ruta', ('route',))
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON de Flask con la serialización de jsonify() medida como span `encode`."""
+
+    def dumps(self, obj, **kwargs):
+        with tiempos.span('encode'):
+            return super().dumps(obj, **kwargs)
+
+
+def start_request_timer():
+    tiempos.start(REQUEST_TIMING_MAX_SPANS)
+
+
+def _render_started(sender, template, context, **extra):
+    timer = tiempos.current()
+    if timer is not None:
+        timer.begin('render')
+
+
+def _render_finished(sender, template, context, **extra):
+    timer = tiempos.current()
+    if timer is not None:
+        timer.end('render', template.name)
+
+
+def finish_request_timer(response):
+    """Server-Timing para admins; el log de lentas espera al cierre (streaming incluido)."""
+    timer = tiempos.current()
+    if timer is None:
+        return response
+    # Sin cookie no se toca la sesión (evita Vary: Cookie en respuestas públicas)
+    if app.config['SESSION_COOKIE_NAME'] in request.cookies and session.get('is_admin'):
+        response.headers['Server-Timing'] = timer.server_timing()
+
+    route = request.endpoint or 'unknown'
+    method, path, status = request.method, request.path, response.status_code
+
+    def on_close():
+        tiempos.finish()
+        elapsed_ms = timer.elapsed() * 1000
+        if SLOW_REQUEST_MS <= 0 or elapsed_ms < SLOW_REQUEST_MS:
+            return
+        SLOW_REQUESTS.inc(route=route)
+        spans = timer.breakdown()
+        lines = ''.join(
+            f"\n  +{s['inicio_ms']:.1f}ms {s['span']} {s['ms']:.2f}ms" + (f" {s['detalle']}" if s['detalle'] else '')
+            for s in spans
+        )
+        if timer.dropped:
+            lines += f"\n  ... {timer.dropped} spans más"
+        logger.warning(
+            "Request lenta %s %s -> %s en %.1f ms (%s)%s", method, path, status, elapsed_ms, timer.summary(), lines,
+            extra={'route': route, 'status': status, 'duration_ms': round(elapsed_ms, 2), 'spans': spans},
+        )
+
+    response.call_on_close(on_close)
+    return response
+
+
+if REQUEST_TIMING:
+    app.json = TimedJSONProvider(app)
+    app.before_request(start_request_timer)
+    app.after_request(finish_request_timer)
+    before_render_template.connect(_render_started, app)
+    template_rendered.connect(_render_finished, app)
+
+
 # Configuración de base de datos
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', '127.0.0.1'),
@@ -142,7 +277,28 @@ DB_CONFIG = {
     'autocommit': True
 }
 
+# Réplica de lectura opcional: db_cursor lee de ella y db_transaction siempre
+# escribe en el primario (DB_CONFIG)
+REPLICA_DB_CONFIG = None
+if os.getenv('DB_REPLICA_HOST'):
+    REPLICA_DB_CONFIG = dict(
+        DB_CONFIG,
+        host=os.getenv('DB_REPLICA_HOST'),
+        port=int(os.getenv('DB_REPLICA_PORT', DB_CONFIG['port'])),
+        user=os.getenv('DB_REPLICA_USER', DB_CONFIG['user']),
+        password=os.getenv('DB_REPLICA_PASSWORD', DB_CONFIG['password']),
+        connection_timeout=int(os.getenv('DB_REPLICA_CONNECT_TIMEOUT', 2)),
+    )
+# Tras una escritura del admin, sus lecturas van al primario durante esta ventana
+REPLICA_READ_AFTER_WRITE = float(os.getenv('DB_REPLICA_READ_AFTER_WRITE', 10))
+
 connection_pool = None
+replica_pool = None
+replica_health = None
+
+# Sentencias calientes (INSERT de confirmación, evento por slug, evento activo)
+# como prepared statements del lado del servidor, preparadas una vez por conexión
+PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'True').lower() in ('1', 'true', 'yes', 'on')
 
 
 def init_connection_pool():
@@ -151,61 +307,271 @@ def init_connection_pool():
     if connection_pool is not None:
         return connection_pool
 
+    pool_size = int(os.getenv('DB_POOL_SIZE', 5))
+    connection_pool = ElasticPool(
+        DB_CONFIG,
+        pool_size=pool_size,
+        max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+        timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        recycle=float(os.getenv('DB_POOL_RECYCLE', 1800)),
+        pre_ping_idle=float(os.getenv('DB_POOL_PRE_PING_IDLE', 30)),
+        idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', 60)),
+        reset_session=os.getenv('DB_POOL_RESET_SESSION', 'False').lower() in ('1', 'true', 'yes', 'on'),
+    )
     try:
-        pool_size = int(os.getenv('DB_POOL_SIZE', 5))
-        connection_pool = pooling.MySQLConnectionPool(
-            pool_name="fes_pool",
-            pool_size=pool_size,
-            pool_reset_session=True,
-            **DB_CONFIG
-        )
+        # Abrir una conexión al arrancar para detectar credenciales/host incorrectos
+        connection_pool.warm_up(1)
         logger.info(
-            "Pool MySQL listo (pool_size=%s host=%s port=%s db=%s user=%s)",
+            "Pool MySQL listo (pool_size=%s max_overflow=%s host=%s port=%s db=%s user=%s)",
             pool_size,
+            connection_pool.max_overflow,
             DB_CONFIG.get('host'),
             DB_CONFIG.get('port'),
             DB_CONFIG.get('database'),
             DB_CONFIG.get('user'),
         )
-        return connection_pool
     except MySQLError:
+        # El pool queda creado: cada préstamo reintenta la conexión
         logger.exception(
-            "Error al crear pool MySQL (host=%s port=%s db=%s user=%s)",
+            "Error al conectar con MySQL (host=%s port=%s db=%s user=%s)",
             DB_CONFIG.get('host'),
             DB_CONFIG.get('port'),
             DB_CONFIG.get('database'),
             DB_CONFIG.get('user'),
         )
-        connection_pool = None
-        return None
+    return connection_pool
 
 
 # Intento inicial (en arranque); si falla, se reintenta en la primera petición
 init_connection_pool()
 
 
+def init_replica_pool():
+    """Pool de la réplica, si está configurada (no conecta hasta la primera lectura)."""
+    global replica_pool, replica_health
+    if REPLICA_DB_CONFIG is None or replica_pool is not None:
+        return replica_pool
+
+    replica_pool = ElasticPool(
+        REPLICA_DB_CONFIG,
+        pool_size=int(os.getenv('DB_REPLICA_POOL_SIZE', os.getenv('DB_POOL_SIZE', 5))),
+        max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+        # Espera corta: con la réplica saturada conviene leer del primario
+        timeout=float(os.getenv('DB_REPLICA_POOL_TIMEOUT', 2)),
+        recycle=float(os.getenv('DB_POOL_RECYCLE', 1800)),
+        pre_ping_idle=float(os.getenv('DB_POOL_PRE_PING_IDLE', 30)),
+        idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', 60)),
+        reset_session=os.getenv('DB_POOL_RESET_SESSION', 'False').lower() in ('1', 'true', 'yes', 'on'),
+    )
+    replica_health = ReplicaHealth(
+        replica_pool,
+        max_lag=float(os.getenv('DB_REPLICA_MAX_LAG', 5)),
+        interval=float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 5)),
+    )
+    logger.info(
+        "Réplica de lectura configurada (host=%s port=%s max_lag=%ss)",
+        REPLICA_DB_CONFIG.get('host'),
+        REPLICA_DB_CONFIG.get('port'),
+        replica_health.max_lag,
+    )
+    return replica_pool
+
+
+init_replica_pool()
+
+
+def close_connection_pools():
+    """Cierra las conexiones inactivas de los pools de este proceso.
+
+    Con Gunicorn --preload el maestro importa app.py (y valida credenciales
+    con una conexión); gunicorn.conf.py llama a esto antes de crear workers
+    para que el maestro no quede con conexiones abiertas.
+    """
+    for pool in (connection_pool, replica_pool):
+        if pool is not None:
+            pool.dispose()
+
+
+def init_worker(warm_up=None):
+    """Preparación de un worker recién creado (hook post_fork de gunicorn.conf.py).
+
+    Cada pool detecta el fork y empieza vacío; aquí se abren por adelantado
+    DB_POOL_WARMUP conexiones propias del worker para que las primeras
+    requests no paguen el connect.
+    """
+    # Los contadores heredados del maestro se sumarían otra vez en cada worker
+    metrics.reset()
+    pool = init_connection_pool()
+    if warm_up is None:
+        warm_up = int(os.getenv('DB_POOL_WARMUP', 1))
+    if pool is not None and warm_up > 0:
+        try:
+            pool.warm_up(warm_up)
+        except MySQLError:
+            logger.exception("No se pudieron abrir conexiones de calentamiento (pid=%s)", os.getpid())
+    init_replica_pool()
+
+
+def pool_stats():
+    """Estado del pool de este proceso (ceros si aún no existe)."""
+    pool = connection_pool
+    if pool is None:
+        return {'pool_size': 0, 'open': 0, 'in_use': 0, 'waiting': 0, 'timeouts': 0, 'prepares': 0}
+    return pool.stats()
+
+
+metrics.callback('db_pool_size', 'Conexiones permanentes configuradas en el pool', 'gauge', lambda: pool_stats()['pool_size'])
+metrics.callback('db_pool_open', 'Conexiones abiertas (incluye desborde)', 'gauge', lambda: pool_stats()['open'])
+metrics.callback('db_pool_in_use', 'Conexiones del pool en uso', 'gauge', lambda: pool_stats()['in_use'])
+metrics.callback('db_pool_waiting', 'Requests esperando una conexión', 'gauge', lambda: pool_stats()['waiting'])
+metrics.callback(
+    'db_replica_healthy', 'Réplica usable para lecturas (0 si no hay réplica)', 'gauge',
+    lambda: 1 if replica_health is not None and replica_health.healthy else 0
+)
+metrics.callback(
+    'db_replica_lag_seconds', 'Último retraso medido de la réplica (-1 si se desconoce)', 'gauge',
+    lambda: replica_health.lag if replica_health is not None and replica_health.lag is not None else -1
+)
+metrics.callback('db_prepared_statements_total', 'Sentencias preparadas en el servidor (una por conexión y SQL)', 'counter', lambda: pool_stats()['prepares'])
+
+
+class InstrumentedCursor:
+    """Cursor que mide cada execute/executemany y cuenta errores MySQL por errno."""
+
+    __slots__ = ('_cursor', '_conn', '_dictionary')
+
+    def __init__(self, cursor, conn=None, dictionary=False):
+        self._cursor = cursor
+        self._conn = conn
+        self._dictionary = dictionary
+
+    def _timed(self, method, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except MySQLError as e:
+            DB_ERRORS.inc(errno=e.errno)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_QUERY_SECONDS.observe(elapsed, route=current_route())
+            timer = tiempos.current()
+            if timer is not None:
+                timer.record('db', start, elapsed, args[0] if args else None)
+
+    def execute(self, *args, **kwargs):
+        return self._timed(self._cursor.execute, *args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._timed(self._cursor.executemany, *args, **kwargs)
+
+    def execute_prepared(self, sql, params=()):
+        """Ejecuta `sql` con el cursor preparado que su conexión cachea para él.
+
+        Devuelve el cursor que ejecutó (para fetch*/lastrowid); comparte la
+        conexión y, por lo tanto, la transacción de este cursor. Con
+        DB_PREPARED_STATEMENTS desactivado se ejecuta en modo texto aquí mismo.
+        Los resultados deben leerse completos antes de volver a usarlo.
+        """
+        if not PREPARED_STATEMENTS or not isinstance(self._conn, PooledConnection):
+            self.execute(sql, params)
+            return self
+        for retry in (False, True):
+            stmt = InstrumentedCursor(self._conn.prepared_cursor(sql, self._dictionary))
+            try:
+                stmt.execute(sql, params)
+                return stmt
+            except MySQLError as e:
+                # El servidor liberó el statement (p. ej. RESET CONNECTION): se prepara de nuevo
+                if retry or e.errno != errorcode.ER_UNKNOWN_STMT_HANDLER:
+                    raise
+                self._conn.forget_prepared(sql, self._dictionary)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
 # Función para obtener conexión del pool
 def db_conn():
     """Obtiene una conexión del pool"""
     pool = init_connection_pool()
     if not pool:
         raise Exception("Pool de conexiones no disponible")
+    start = time.perf_counter()
     try:
         return pool.get_connection()
     except pooling.PoolError:
+        DB_POOL_ERRORS.inc()
         logger.exception("Error al obtener conexión del pool")
         raise
+    finally:
+        elapsed = time.perf_counter() - start
+        DB_POOL_CHECKOUT_SECONDS.observe(elapsed)
+        timer = tiempos.current()
+        if timer is not None:
+            timer.record('db-checkout', start, elapsed)
+
+
+def read_your_writes():
+    """True si la sesión actual escribió hace poco y debe leer del primario."""
+    return has_request_context() and session.get('leer_primario_hasta', 0) > time.time()
+
+
+def mark_recent_write():
+    """Tras un commit del admin, sus siguientes lecturas evitan la réplica por un rato."""
+    if replica_health is not None and has_request_context() and session.get('is_admin'):
+        session['leer_primario_hasta'] = time.time() + REPLICA_READ_AFTER_WRITE
+
+
+def db_read_conn(primary=False):
+    """Conexión para lecturas: de la réplica si está sana, si no del primario.
+
+    Devuelve (conn, desde_replica).
+    """
+    if replica_health is None:
+        return db_conn(), False
+    if not primary and not read_your_writes():
+        if replica_health.usable():
+            start = time.perf_counter()
+            try:
+                conn = replica_pool.get_connection()
+            except MySQLError as e:
+                replica_health.mark_down(e)
+            else:
+                DB_READS.inc(target='replica')
+                return conn, True
+            finally:
+                elapsed = time.perf_counter() - start
+                DB_POOL_CHECKOUT_SECONDS.observe(elapsed)
+                timer = tiempos.current()
+                if timer is not None:
+                    timer.record('db-checkout', start, elapsed, 'réplica')
+        replica_health.fallbacks += 1
+    DB_READS.inc(target='primary')
+    return db_conn(), False
 
 
 @contextmanager
-def db_cursor(dictionary=False):
-    """Cursor protegido: siempre cierra cursor y devuelve conexión al pool."""
+def db_cursor(dictionary=False, primary=False):
+    """Cursor protegido: siempre cierra cursor y devuelve conexión al pool.
+
+    Solo para lecturas: usa la réplica si está configurada y sana.
+    `primary=True` fuerza el primario (p. ej. para leer una escritura propia).
+    """
     conn = None
     cursor = None
+    from_replica = False
     try:
-        conn = db_conn()
-        cursor = conn.cursor(dictionary=dictionary)
+        conn, from_replica = db_read_conn(primary)
+        cursor = InstrumentedCursor(conn.cursor(dictionary=dictionary), conn, dictionary)
         yield conn, cursor
+    except MySQLError as e:
+        if from_replica and e.errno in ReplicaHealth.CONNECTION_ERRORS:
+            replica_health.mark_down(e)
+        raise
     finally:
         if cursor is not None:
             try:
@@ -226,19 +592,39 @@ def db_transaction(dictionary=False):
     cursor = None
     try:
         conn = db_conn()
-        cursor = conn.cursor(dictionary=dictionary)
+        # DB_CONFIG usa autocommit=True: sin START TRANSACTION cada sentencia se
+        # confirmaría por separado y commit()/rollback() no tendrían efecto
+        conn.start_transaction()
+        cursor = InstrumentedCursor(conn.cursor(dictionary=dictionary), conn, dictionary)
         yield conn, cursor
+        start = time.perf_counter()
         try:
             conn.commit()
-        except Exception:
+        except Exception as e:
+            if isinstance(e, MySQLError):
+                DB_ERRORS.inc(errno=e.errno)
             logger.exception("Error al hacer commit")
             raise
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_COMMIT_SECONDS.observe(elapsed)
+            timer = tiempos.current()
+            if timer is not None:
+                timer.record('db-commit', start, elapsed)
+        mark_recent_write()
     except Exception:
         if conn is not None:
+            start = time.perf_counter()
             try:
                 conn.rollback()
             except Exception:
                 logger.exception("Error al hacer rollback")
+            finally:
+                elapsed = time.perf_counter() - start
+                DB_ROLLBACK_SECONDS.observe(elapsed)
+                timer = tiempos.current()
+                if timer is not None:
+                    timer.record('db-rollback', start, elapsed)
         raise
     finally:
         if cursor is not None:
@@ -253,6 +639,466 @@ def db_transaction(dictionary=False):
                 logger.exception("Error al cerrar conexión")
 
 
+# ============================================================================
+# CACHÉ DE EVENTOS (por worker)
+# ============================================================================
+
+class EventoCache:
+    """Caché LRU con TTL para filas de `evento`, local a cada proceso.
+
+    La invalidación entre workers usa un archivo de versión en RUN_DIR: cada
+    lectura compara su (inode, mtime) con un `os.stat` (sin tocar MySQL) y, si
+    cambió, descarta todas las entradas. Los eventos inexistentes también se
+    cachean (con un TTL más corto) para no consultar la BD con slugs inválidos.
+    """
+
+    def __init__(self, max_entries, ttl, negative_ttl, version_file):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.version_file = version_file
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _read_version(self):
+        try:
+            st = os.stat(self.version_file)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def get(self, key, loader):
+        """Devuelve el valor cacheado para `key` o lo obtiene con `loader()`."""
+        found, value, version = self.lookup(key)
+        if found:
+            return value
+        value = loader()
+        self.store(key, value, version)
+        return value
+
+    def lookup(self, key):
+        """(encontrado, valor, versión) sin consultar la BD.
+
+        Si no se encontró, quien consulte la BD debe pasar la versión a
+        `store()` (así lo hace el camino asíncrono de asgi.py).
+        """
+        if not self.enabled:
+            return False, None, None
+
+        version = self._read_version()
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1], version
+            self.misses += 1
+        return False, None, version
+
+    def store(self, key, value, version):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if not self.enabled or ttl <= 0:
+            return
+        with self._lock:
+            # Si otro hilo observó una versión nueva mientras consultábamos, no guardar
+            if self._version == version:
+                self._entries[key] = (time.monotonic() + ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def changed_within(self, seconds):
+        """True si la última invalidación publicada ocurrió hace menos de `seconds`."""
+        version = self._read_version()
+        return version is not None and time.time_ns() - version[1] < seconds * 1e9
+
+    def invalidate(self):
+        """Vacía la caché local y publica una versión nueva para los demás workers."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+        try:
+            os.makedirs(os.path.dirname(self.version_file), exist_ok=True)
+            tmp_path = f'{self.version_file}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                fh.write(f'{time.time():.6f} pid={os.getpid()}\n')
+            # os.replace cambia el inode: todos los workers ven la versión nueva
+            os.replace(tmp_path, self.version_file)
+        except OSError:
+            logger.exception("No se pudo publicar la versión de caché de eventos (%s)", self.version_file)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'negative_ttl': self.negative_ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+            }
+
+
+evento_cache = EventoCache(
+    max_entries=int(os.getenv('EVENTO_CACHE_MAX', 256)),
+    ttl=float(os.getenv('EVENTO_CACHE_TTL', 60)),
+    negative_ttl=float(os.getenv('EVENTO_CACHE_NEGATIVE_TTL', 10)),
+    version_file=os.getenv('EVENTO_CACHE_VERSION_FILE') or os.path.join(RUN_DIR, 'evento_cache.version'),
+)
+
+metrics.callback('evento_cache_hits_total', 'Aciertos de la caché de eventos', 'counter', lambda: evento_cache.hits)
+metrics.callback('evento_cache_misses_total', 'Fallos de la caché de eventos', 'counter', lambda: evento_cache.misses)
+
+# Llave reservada para "evento activo más reciente" (los slugs nunca son tuplas)
+ACTIVE_EVENTO_KEY = ('activo',)
+
+
+EVENTO_ACTIVO_SQL = """
+    SELECT slug FROM evento 
+    WHERE activo = TRUE 
+    ORDER BY creado_en DESC 
+    LIMIT 1
+"""
+
+EVENTO_POR_SLUG_SQL = """
+    SELECT * FROM evento 
+    WHERE slug = %s AND activo = TRUE
+"""
+
+
+def fetch_evento_activo(cursor):
+    # fetchall: el cursor preparado se reutiliza y no debe quedar con filas sin leer
+    rows = cursor.execute_prepared(EVENTO_ACTIVO_SQL).fetchall()
+    return rows[0] if rows else None
+
+
+def fetch_evento_por_slug(cursor, slug):
+    rows = cursor.execute_prepared(EVENTO_POR_SLUG_SQL, (slug,)).fetchall()
+    return rows[0] if rows else None
+
+
+def evento_recien_modificado():
+    # Justo después de modificar un evento la réplica puede no tenerlo aún, y lo
+    # que se cargue aquí queda cacheado todo el TTL: se lee del primario
+    return replica_health is not None and evento_cache.changed_within(REPLICA_READ_AFTER_WRITE)
+
+
+def get_evento_activo():
+    """Evento activo más reciente (cacheado); None si no hay ninguno."""
+    def load():
+        with db_cursor(dictionary=True, primary=evento_recien_modificado()) as (_, cursor):
+            return fetch_evento_activo(cursor)
+    return evento_cache.get(ACTIVE_EVENTO_KEY, load)
+
+
+def get_evento_activo_por_slug(slug):
+    """Evento activo con ese slug (cacheado, incluidos los no encontrados)."""
+    def load():
+        with db_cursor(dictionary=True, primary=evento_recien_modificado()) as (_, cursor):
+            return fetch_evento_por_slug(cursor, slug)
+    return evento_cache.get(('slug', slug), load)
+
+
+def invalidate_evento_cache():
+    """Debe llamarse después de cualquier commit que modifique la tabla evento."""
+    evento_cache.invalidate()
+
+
+# ============================================================================
+# ESCRITURA DE CONFIRMACIONES (group commit opcional)
+# ============================================================================
+
+INSERT_CONFIRMACION_SQL = """
+    INSERT INTO confirmacion_asistencia 
+    (id_evento, dependencia, puesto, grado, nombre_completo, email,
+     trae_vehiculo, vehiculo_modelo, vehiculo_color, vehiculo_placas,
+     ip, user_agent, confirmado_en)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+"""
+
+
+def confirmacion_params(values, ip, user_agent):
+    """Parámetros de INSERT_CONFIRMACION_SQL a partir de los valores validados."""
+    return (
+        values['id_evento'],
+        values['dependencia'],
+        values['puesto'],
+        values['grado'],
+        values['nombre_completo'],
+        values['email'],
+        values['trae_vehiculo'],
+        values['vehiculo_modelo'],
+        values['vehiculo_color'],
+        values['vehiculo_placas'],
+        ip,
+        user_agent
+    )
+
+
+# Contadores por evento repartidos en N filas (slots) para que las inserciones
+# concurrentes de un mismo evento no esperen el mismo candado de fila
+CONTADOR_SLOTS = max(1, int(os.getenv('CONTADOR_SLOTS', 8)))
+
+INCREMENTAR_CONTADOR_SQL = """
+    INSERT INTO evento_contador (id_evento, slot, total_confirmaciones, total_vehiculos)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_confirmaciones = total_confirmaciones + VALUES(total_confirmaciones),
+        total_vehiculos = total_vehiculos + VALUES(total_vehiculos)
+"""
+
+
+def contador_params(params_list):
+    """Parámetros de INCREMENTAR_CONTADOR_SQL para las filas insertadas.
+
+    Se agrupa por evento y se ordena por id_evento para evitar deadlocks.
+    """
+    deltas = {}
+    for params in params_list:
+        total, vehiculos = deltas.get(params[0], (0, 0))
+        deltas[params[0]] = (total + 1, vehiculos + (1 if params[6] else 0))
+    return [
+        (evento_id, random.randrange(CONTADOR_SLOTS), total, vehiculos)
+        for evento_id, (total, vehiculos) in sorted(deltas.items())
+    ]
+
+
+def incrementar_contadores(cursor, params_list):
+    """Suma las filas insertadas a evento_contador en la misma transacción."""
+    for params in contador_params(params_list):
+        cursor.execute(INCREMENTAR_CONTADOR_SQL, params)
+
+
+def insert_confirmacion(cursor, params):
+    """INSERT de una confirmación (y su contador) en la transacción de `cursor`; devuelve su id."""
+    confirmacion_id = cursor.execute_prepared(INSERT_CONFIRMACION_SQL, params).lastrowid
+    incrementar_contadores(cursor, (params,))
+    return confirmacion_id
+
+
+def insert_confirmaciones_lote(cursor, params_list):
+    """Inserta varias confirmaciones, una sentencia por fila, en la misma transacción.
+
+    Devuelve por fila su id o la MySQLError 1062 si era duplicada (InnoDB solo
+    revierte esa sentencia). Cualquier otro error se propaga.
+    """
+    results = []
+    inserted = []
+    for params in params_list:
+        try:
+            stmt = cursor.execute_prepared(INSERT_CONFIRMACION_SQL, params)
+        except MySQLError as e:
+            if e.errno != 1062:
+                raise
+            results.append(e)
+            continue
+        results.append(stmt.lastrowid)
+        inserted.append(params)
+    incrementar_contadores(cursor, inserted)
+    return results
+
+
+def insert_confirmaciones_chunk(cursor, params_list):
+    """Como insert_confirmaciones_lote, pero intenta primero un INSERT multi-fila.
+
+    executemany se envía como un solo INSERT con todas las filas; si alguna es
+    duplicada la sentencia completa falla sin dejar filas y se repite fila por
+    fila para saber cuál. En el camino rápido no hay id por fila (None).
+    """
+    try:
+        cursor.executemany(INSERT_CONFIRMACION_SQL, params_list)
+        incrementar_contadores(cursor, params_list)
+        return [None] * len(params_list)
+    except MySQLError as e:
+        if e.errno != 1062:
+            raise
+    return insert_confirmaciones_lote(cursor, params_list)
+
+
+class _PendingInsert:
+    __slots__ = ('params', 'done', 'result', 'error', 'started', 'cancelled')
+
+    def __init__(self, params):
+        self.params = params
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Ambos se cambian con GroupCommitWriter._lock tomado
+        self.started = False
+        self.cancelled = False
+
+
+class GroupCommitWriter:
+    """Agrupa INSERTs de requests concurrentes del mismo worker en un solo commit.
+
+    Un hilo de fondo junta hasta `max_rows` filas o las que lleguen en `window`
+    segundos y las inserta en una transacción: cada fila conserva su
+    `lastrowid` y su propio error 1062 (un duplicado solo revierte su
+    sentencia), pero todas comparten el commit (un fsync de MySQL). Si falla
+    cualquier otra cosa, la tanda se revierte y se reintenta fila por fila.
+
+    Solo agrupa requests concurrentes dentro de un proceso, así que sirve con
+    workers gthread; con workers sync cada tanda tendría una sola fila.
+
+    Una fila que vence `timeout` antes de que su tanda empiece se cancela y no
+    se inserta (la request responde 503 y el reintento no choca con un 409);
+    si la tanda ya empezó se espera su resultado. Con `max_queue` filas en
+    espera, submit() rechaza sin encolar.
+    """
+
+    def __init__(self, window, max_rows, timeout, max_queue=200):
+        self.window = window
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.fallbacks = 0
+
+    def _thread_ready(self):
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    def _ensure_thread(self):
+        if self._thread_ready():
+            return
+        with self._lock:
+            if self._thread_ready():
+                return
+            if self._pid != os.getpid():
+                # Tras un fork, la cola heredada no tiene hilo que la atienda
+                self._queue = queue.Queue(self.max_queue)
+                self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._queue,), name='group-commit', daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, params):
+        """Encola un INSERT y espera su resultado (id o la excepción original)."""
+        self._ensure_thread()
+        item = _PendingInsert(params)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            raise TimeoutError('Cola de group commit llena') from None
+        if not item.done.wait(self.timeout):
+            with self._lock:
+                if not item.started:
+                    item.cancelled = True
+            if item.cancelled:
+                raise TimeoutError('Tiempo de espera agotado en group commit')
+            # La tanda ya está en la BD: su resultado es el que vale
+            item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _run(self, pending):
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        with self._lock:
+            batch = [item for item in batch if not item.cancelled]
+            for item in batch:
+                item.started = True
+        if not batch:
+            return
+        try:
+            with db_transaction() as (_, cursor):
+                results = insert_confirmaciones_lote(cursor, [item.params for item in batch])
+            for item, result in zip(batch, results):
+                if isinstance(result, MySQLError):
+                    item.error = result
+                else:
+                    item.result = result
+            self.batches += 1
+            self.rows += len(batch)
+        except MySQLError:
+            logger.exception("Error en group commit; reintentando %s filas individualmente", len(batch))
+            self.fallbacks += 1
+            for item in batch:
+                item.result = None
+                item.error = None
+                try:
+                    with db_transaction() as (_, cursor):
+                        item.result = insert_confirmacion(cursor, item.params)
+                except Exception as e:
+                    item.error = e
+        except Exception as e:
+            logger.exception("Error en group commit (%s filas)", len(batch))
+            for item in batch:
+                item.result = None
+                item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'fallbacks': self.fallbacks,
+            'avg_batch': (self.rows / self.batches) if self.batches else 0,
+        }
+
+
+GROUP_COMMIT_ENABLED = os.getenv('DB_GROUP_COMMIT', 'False').lower() in ('1', 'true', 'yes', 'on')
+group_commit = GroupCommitWriter(
+    window=float(os.getenv('DB_GROUP_COMMIT_WINDOW_MS', 5)) / 1000.0,
+    max_rows=int(os.getenv('DB_GROUP_COMMIT_MAX_ROWS', 50)),
+    timeout=float(os.getenv('DB_GROUP_COMMIT_TIMEOUT', 10)),
+    max_queue=int(os.getenv('DB_GROUP_COMMIT_MAX_QUEUE', 200)),
+)
+
+
+metrics.callback('group_commit_batches_total', 'Tandas escritas por group commit', 'counter', lambda: group_commit.batches)
+metrics.callback('group_commit_rows_total', 'Filas escritas por group commit', 'counter', lambda: group_commit.rows)
+
+
+def registrar_confirmacion(params):
+    """Inserta una confirmación y devuelve su id.
+
+    Lanza MySQLError (errno 1062 si es duplicada) igual en ambos modos.
+    """
+    if GROUP_COMMIT_ENABLED:
+        # Espera de la tanda: sus consultas corren en el hilo del writer, sin timer
+        with tiempos.span('group-commit'):
+            return group_commit.submit(params)
+    with db_transaction() as (_, cursor):
+        return insert_confirmacion(cursor, params)
+
+
 # Decorador para rutas de administrador
 def admin_required(f):
     """Decorador para proteger rutas de administrador"""
@@ -265,6 +1111,352 @@ def admin_required(f):
     return decorated_function
 
 
+# ============================================================================
+# ASSETS ESTÁTICOS (huella de contenido y caché inmutable)
+# ============================================================================
+
+# Salida de build_assets.py; sin manifest se sirven los archivos originales
+ASSETS_DIST_DIR = os.path.join(app.static_folder, 'dist')
+ASSETS_MAX_AGE = 365 * 24 * 3600
+ASSET_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# Orden de preferencia de formatos en <picture>
+IMAGE_SOURCE_TYPES = ('image/avif', 'image/webp')
+
+
+class AssetManifest:
+    """Manifest de build_assets.py; se recarga si el archivo cambia (nuevo build)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def version(self):
+        """mtime (ns) del manifest vigente; None si no hay build."""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, name):
+        mtime = self.version()
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._assets = self._load() if mtime is not None else {}
+                    self._mtime = mtime
+        return self._assets.get(name)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as fh:
+                return json.load(fh).get('assets', {})
+        except (OSError, ValueError):
+            logger.exception("Manifest de assets ilegible (%s); se usan los originales", self.path)
+            return {}
+
+
+asset_manifest = AssetManifest(os.path.join(ASSETS_DIST_DIR, 'manifest.json'))
+
+
+def asset_url(filename):
+    """URL con huella de un archivo de static/ (o la normal si no hay build)."""
+    entry = asset_manifest.get(filename)
+    if entry is None:
+        return url_for('static', filename=filename)
+    return url_for('asset', filename=entry['file'])
+
+
+def asset_srcset(candidates):
+    return ', '.join(f"{url_for('asset', filename=c['file'])} {c['width']}w" for c in candidates)
+
+
+def responsive_image(filename, alt, sizes='100vw', **attrs):
+    """<picture> con variantes AVIF/WebP y srcset para una imagen de static/.
+
+    Los atributos extra (class_, loading, role, ...) van al <img>; `class_`
+    se emite como `class`. Sin build se devuelve un <img> simple.
+    """
+    entry = asset_manifest.get(filename)
+    img_attrs = {'alt': alt}
+    img_attrs.update({key.rstrip('_').replace('_', '-'): value for key, value in attrs.items()})
+
+    if entry is None:
+        img_attrs['src'] = url_for('static', filename=filename)
+        return Markup('<img %s>') % Markup(_html_attrs(img_attrs))
+
+    img_attrs.update({
+        'src': url_for('asset', filename=entry['file']),
+        'srcset': asset_srcset(entry['variants'][entry['fallback']]),
+        'sizes': sizes,
+        'width': entry['width'],
+        'height': entry['height'],
+        'decoding': img_attrs.get('decoding', 'async'),
+    })
+    sources = [
+        Markup('<source type="%s" srcset="%s" sizes="%s">') % (mimetype, asset_srcset(entry['variants'][mimetype]), sizes)
+        for mimetype in IMAGE_SOURCE_TYPES if mimetype in entry['variants']
+    ]
+    return Markup('<picture>%s<img %s></picture>') % (Markup('').join(sources), Markup(_html_attrs(img_attrs)))
+
+
+def _html_attrs(attrs):
+    return ' '.join(f'{escape(key)}="{escape(value)}"' for key, value in attrs.items() if value is not None)
+
+
+app.jinja_env.globals.update(asset_url=asset_url, responsive_image=responsive_image)
+
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    """Assets con huella: caché inmutable y copias .br/.gz precomprimidas."""
+    mimetype = mimetypes.guess_type(filename)[0]
+    response = None
+    for encoding, suffix in ASSET_ENCODINGS:
+        path = safe_join(ASSETS_DIST_DIR, filename + suffix)
+        if request.accept_encodings[encoding] and path and os.path.isfile(path):
+            response = send_from_directory(
+                ASSETS_DIST_DIR, filename + suffix, mimetype=mimetype, max_age=ASSETS_MAX_AGE
+            )
+            response.headers['Content-Encoding'] = encoding
+            # send_file lo agrega al recibir un mimetype; mostraría el nombre .br/.gz
+            response.headers.pop('Content-Disposition', None)
+            break
+    if response is None:
+        response = send_from_directory(ASSETS_DIST_DIR, filename, max_age=ASSETS_MAX_AGE)
+    # El nombre cambia con el contenido: el navegador no necesita revalidar nunca
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+# ============================================================================
+# CACHÉ DE PÁGINAS RENDERIZADAS (formulario público)
+# ============================================================================
+
+PAGE_CACHE_MAX = int(os.getenv('PAGE_CACHE_MAX', 128))
+# Segundos que un proxy/CDN puede servir el formulario sin revalidar (s-maxage)
+PAGE_CACHE_SHARED_MAX_AGE = int(os.getenv('PAGE_CACHE_SHARED_MAX_AGE', 30))
+FORM_TEMPLATES = ('form.html', 'base.html')
+
+
+class RenderedPageCache:
+    """HTML renderizado por llave (LRU, por worker) junto con su ETag fuerte.
+
+    La llave incluye la fila completa del evento: al modificarse (lo que
+    invalida evento_cache en todos los workers) cambia la llave y la entrada
+    vieja sale por LRU, sin invalidación propia.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, key):
+        """(html_bytes, etag) si `key` ya está renderizada, sin contar hit/miss."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def get_or_render(self, key, render):
+        """Devuelve (html_bytes, etag), renderizando con `render()` si falta."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        body = render().encode('utf-8')
+        entry = (body, hashlib.sha256(body).hexdigest()[:32])
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+page_cache = RenderedPageCache(PAGE_CACHE_MAX)
+
+metrics.callback('page_cache_hits_total', 'Formularios servidos desde HTML cacheado', 'counter', lambda: page_cache.hits)
+metrics.callback('page_cache_misses_total', 'Formularios renderizados con Jinja', 'counter', lambda: page_cache.misses)
+
+
+def templates_mtime(names):
+    """mtime más reciente de las plantillas (cambian solo con un despliegue)."""
+    mtime = 0.0
+    for name in names:
+        try:
+            mtime = max(mtime, os.path.getmtime(os.path.join(app.root_path, app.template_folder, name)))
+        except OSError:
+            pass
+    return datetime.fromtimestamp(mtime, timezone.utc)
+
+
+FORM_TEMPLATES_MTIME = templates_mtime(FORM_TEMPLATES)
+
+
+def evento_last_modified(evento):
+    """Last-Modified del formulario: el evento, las plantillas o el build de assets."""
+    candidates = [FORM_TEMPLATES_MTIME]
+    actualizado_en = evento.get('actualizado_en')
+    if isinstance(actualizado_en, datetime):
+        # TIMESTAMP llega como hora local ingenua (misma zona que el servidor de la app)
+        candidates.append(actualizado_en.astimezone(timezone.utc))
+    manifest_version = asset_manifest.version()
+    if manifest_version is not None:
+        candidates.append(datetime.fromtimestamp(manifest_version / 1e9, timezone.utc))
+    return max(candidates)
+
+
+def cacheable_page_headers(response, last_modified):
+    response.last_modified = last_modified
+    # Navegador: revalida siempre (304 barato). Proxy: puede servirla s-maxage segundos
+    response.cache_control.public = True
+    response.cache_control.max_age = 0
+    response.cache_control.s_maxage = PAGE_CACHE_SHARED_MAX_AGE
+    response.vary.add('Cookie')
+    return response
+
+
+def cached_page_response(key, render, last_modified):
+    """Respuesta pública cacheable con ETag/Last-Modified; 304 sin renderizar si aplica.
+
+    Con la página en caché se compara el ETag. Si este worker aún no la
+    renderizó, el ETag no se conoce sin renderizar y se decide con
+    If-Modified-Since: `last_modified` ya cubre el evento, las plantillas y
+    los assets.
+    """
+    if page_cache.peek(key) is None and not is_resource_modified(request.environ, last_modified=last_modified):
+        return cacheable_page_headers(Response(status=304), last_modified)
+    body, etag = page_cache.get_or_render(key, render)
+    response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    cacheable_page_headers(response, last_modified)
+    return response.make_conditional(request)
+
+
+def has_session_cookie():
+    return app.config['SESSION_COOKIE_NAME'] in request.cookies
+
+
+def evento_form_response(slug, evento):
+    """Respuesta de /evento/<slug> una vez obtenido el evento (también la usa asgi.py)."""
+    if not evento:
+        return render_template('no_event.html'), 404
+
+    # Con sesión puede haber mensajes flash: render normal y sin caché compartida
+    if PAGE_CACHE_MAX <= 0 or has_session_cookie():
+        response = app.make_response(render_template('form.html', evento=evento))
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    key = (slug, request.script_root, asset_manifest.version(), repr(sorted(evento.items())))
+    return cached_page_response(
+        key,
+        lambda: render_template('form.html', evento=evento),
+        evento_last_modified(evento),
+    )
+
+
+# ============================================================================
+# CONTROL DE ADMISIÓN (ruta pública de escritura)
+# ============================================================================
+
+# Requests simultáneas por worker en /api/confirmacion (0 = sin tope)
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', 16))
+ADMISSION_QUEUE_WAIT = float(os.getenv('ADMISSION_QUEUE_WAIT', 0))
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 2))
+# Token bucket por IP: tokens por segundo y ráfaga máxima (0 = sin límite)
+ADMISSION_IP_RATE = float(os.getenv('ADMISSION_IP_RATE', 1))
+ADMISSION_IP_BURST = int(os.getenv('ADMISSION_IP_BURST', 20))
+# Proxies propios delante de la app (nginx/Apache): la IP real es la N-ésima de
+# X-Forwarded-For contando desde la derecha. Con 0 se usa remote_addr, porque
+# sin proxy el header lo escribe el cliente
+ADMISSION_TRUSTED_PROXIES = int(os.getenv('ADMISSION_TRUSTED_PROXIES', 0))
+
+in_flight_limiter = InFlightLimiter(ADMISSION_MAX_IN_FLIGHT, ADMISSION_QUEUE_WAIT) if ADMISSION_MAX_IN_FLIGHT > 0 else None
+ip_buckets = None
+if ADMISSION_IP_RATE > 0 and ADMISSION_IP_BURST > 0:
+    ip_buckets = SharedTokenBucket(
+        os.path.join(RUN_DIR, 'admision_ip.bin'), rate=ADMISSION_IP_RATE, burst=ADMISSION_IP_BURST
+    )
+
+ADMISSION_REJECTED = metrics.counter(
+    'admission_rejected_total', 'Requests rechazadas por control de admisión', ('reason',)
+)
+metrics.callback(
+    'admission_in_flight', 'Requests en curso en /api/confirmacion', 'gauge',
+    lambda: in_flight_limiter.in_flight if in_flight_limiter is not None else 0
+)
+
+
+MSG_SATURADO = 'El servicio está saturado. Por favor intente de nuevo en unos segundos.'
+MSG_DEMASIADAS_SOLICITUDES = 'Demasiadas solicitudes desde su red. Por favor espere un momento.'
+
+
+def client_ip_from(forwarded_for, remote_addr):
+    """IP del cliente para límites.
+
+    Con ADMISSION_TRUSTED_PROXIES = N se toma el valor que agregó el proxy
+    más externo (N-ésimo desde la derecha); lo que el cliente haya puesto a
+    la izquierda se ignora. Con 0 el header no se lee.
+    """
+    if ADMISSION_TRUSTED_PROXIES > 0:
+        hops = [h.strip() for h in (forwarded_for or '').split(',') if h.strip()]
+        if hops:
+            return hops[-min(ADMISSION_TRUSTED_PROXIES, len(hops))]
+    return remote_addr or 'desconocida'
+
+
+def client_ip():
+    return client_ip_from(request.headers.get('X-Forwarded-For'), request.remote_addr)
+
+
+def overload_response(status, message, retry_after):
+    """Rechazo rápido con Retry-After para que el navegador no reintente de inmediato."""
+    response = jsonify({'ok': False, 'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def admission_controlled(f):
+    """Decorador: tope de requests en curso por worker (503) y límite por IP (429)."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if in_flight_limiter is not None and not in_flight_limiter.acquire():
+            ADMISSION_REJECTED.inc(reason='in_flight')
+            return overload_response(503, MSG_SATURADO, ADMISSION_RETRY_AFTER)
+        try:
+            if ip_buckets is not None:
+                allowed, wait = ip_buckets.consume(client_ip())
+                if not allowed:
+                    ADMISSION_REJECTED.inc(reason='rate_limit')
+                    return overload_response(429, MSG_DEMASIADAS_SOLICITUDES, wait)
+            return f(*args, **kwargs)
+        finally:
+            if in_flight_limiter is not None:
+                in_flight_limiter.release()
+    return decorated_function
+
+
 # ============================================================================
 # RUTAS PÚBLICAS
 # ============================================================================
@@ -273,15 +1465,8 @@ def admin_required(f):
 def index():
     """Página principal - redirige al evento activo más reciente"""
     try:
-        with db_cursor(dictionary=True) as (_, cursor):
-            # Buscar evento activo más reciente
-            cursor.execute("""
-                SELECT slug FROM evento 
-                WHERE activo = TRUE 
-                ORDER BY creado_en DESC 
-                LIMIT 1
-            """)
-            evento = cursor.fetchone()
+        # Buscar evento activo más reciente
+        evento = get_evento_activo()
         
         if evento:
             return redirect(url_for('evento_form', slug=evento['slug']))
@@ -297,18 +1482,9 @@ def index():
 def evento_form(slug):
     """Formulario de confirmación para un evento específico"""
     try:
-        with db_cursor(dictionary=True) as (_, cursor):
-            # Buscar evento por slug
-            cursor.execute("""
-                SELECT * FROM evento 
-                WHERE slug = %s AND activo = TRUE
-            """, (slug,))
-            evento = cursor.fetchone()
-        
-        if not evento:
-            return render_template('no_event.html'), 404
-            
-        return render_template('form.html', evento=evento)
+        # Buscar evento por slug
+        evento = get_evento_activo_por_slug(slug)
+        return evento_form_response(slug, evento)
         
     except Exception as e:
         logger.exception("Error al cargar formulario de evento (slug=%s)", slug)
@@ -327,102 +1503,10 @@ def success():
 
 
 @app.route('/api/confirmacion', methods=['POST'])
+@admission_controlled
 def api_confirmacion():
     """Endpoint para registrar confirmación de asistencia"""
     try:
-        class ValidationError(Exception):
-            def __init__(self, message, field=None, code=None, meta=None):
-                super().__init__(message)
-                self.message = message
-                self.field = field
-                self.code = code
-                self.meta = meta or {}
-
-        def normalize_text(value):
-            if value is None:
-                return None
-            text = str(value)
-            # Convertir saltos de línea/tabulaciones en espacios y colapsar espacios
-            text = re.sub(r"[\r\n\t]+", " ", text)
-            text = re.sub(r"\s+", " ", text).strip()
-            return text
-
-        def require_text(field, max_len, label=None):
-            label = label or field
-            value = normalize_text(data.get(field))
-            if not value:
-                raise ValidationError(f'El campo {label} es obligatorio', field=field, code='required')
-            if len(value) > max_len:
-                raise ValidationError(
-                    f'El campo {label} excede el límite de {max_len} caracteres',
-                    field=field,
-                    code='max_length',
-                    meta={'max': max_len}
-                )
-            return value
-
-        def optional_text(field, max_len, label=None):
-            label = label or field
-            value = normalize_text(data.get(field))
-            if not value:
-                return None
-            if len(value) > max_len:
-                raise ValidationError(
-                    f'El campo {label} excede el límite de {max_len} caracteres',
-                    field=field,
-                    code='max_length',
-                    meta={'max': max_len}
-                )
-            return value
-
-        EMAIL_REGEX = re.compile(
-            r"^[A-Z0-9.!#$%&'*+/=?^_`{|}~-]+@"
-            r"[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?"
-            r"(?:\.[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?)+$",
-            re.IGNORECASE,
-        )
-
-        def require_email(field='email', max_len=254, label='correo electrónico'):
-            raw = data.get(field)
-            if raw is None:
-                raise ValidationError(f'El campo {label} es obligatorio', field=field, code='required')
-            email = str(raw).strip().lower()
-            # Sanitización: eliminar cualquier whitespace (pega con espacios, saltos de línea, etc.)
-            email = re.sub(r"\s+", "", email)
-            if not email:
-                raise ValidationError(f'El campo {label} es obligatorio', field=field, code='required')
-            if len(email) > max_len:
-                raise ValidationError(
-                    f'El campo {label} excede el límite de {max_len} caracteres',
-                    field=field,
-                    code='max_length',
-                    meta={'max': max_len}
-                )
-            if not EMAIL_REGEX.fullmatch(email):
-                raise ValidationError(f'El campo {label} es inválido', field=field, code='invalid')
-            return email
-
-        def parse_id_evento(value):
-            value = normalize_text(value)
-            if not value or not value.isdigit():
-                raise ValidationError('El campo id_evento es obligatorio', field='id_evento', code='required')
-            evento_id = int(value)
-            if evento_id <= 0:
-                raise ValidationError('El campo id_evento es inválido', field='id_evento', code='invalid')
-            return evento_id
-
-        def parse_trae_vehiculo(value):
-            if value is None:
-                return None
-            if isinstance(value, bool):
-                return value
-            text = str(value).strip().lower()
-            if text in ('true', '1', 'si', 'sí', 'yes', 'on'):
-                return True
-            if text in ('false', '0', 'no', 'off'):
-                return False
-            return None
-
         # Obtener datos del formulario (JSON o form-data)
         if request.is_json:
             data = request.get_json()
@@ -432,108 +1516,21 @@ def api_confirmacion():
         if not isinstance(data, dict):
             return jsonify({'ok': False, 'error': 'Datos inválidos'}), 400
 
-        trae_vehiculo = parse_trae_vehiculo(data.get('trae_vehiculo') if isinstance(data, dict) else None)
-        if trae_vehiculo is None:
-            return jsonify({
-                'ok': False,
-                'error': 'Debe seleccionar si asistirá con vehículo',
-                'field': 'trae_vehiculo',
-                'code': 'required'
-            }), 400
-
-        # Normalizar valor en data para consistencia
-        data['trae_vehiculo'] = trae_vehiculo
-
-        try:
-            id_evento = parse_id_evento(data.get('id_evento'))
-            dependencia = require_text('dependencia', 255, 'dependencia')
-            puesto = require_text('puesto', 255, 'puesto')
-            grado = require_text('grado', 50, 'grado')
-            nombre_completo = require_text('nombre_completo', 255, 'nombre_completo')
-            email = require_email('email', 254, 'correo electrónico')
-
-            allowed_grados = {'Dr.', 'Dra.', 'Mtro.', 'Mtra.', 'Lic.', 'Ing.', 'Arq.', 'Otro'}
-            if grado not in allowed_grados:
-                raise ValidationError('El campo grado es inválido', field='grado', code='invalid_choice')
-
-            if grado == 'Otro':
-                grado_otro = require_text('grado_otro', 20, 'grado (otro)')
-                # Permitir solo letras (incluye acentos), puntos y espacios (abreviado)
-                if not re.fullmatch(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñ. ]+", grado_otro):
-                    raise ValidationError('El campo grado (otro) contiene caracteres inválidos', field='grado_otro', code='invalid_characters')
-                grado = grado_otro
-
-            vehiculo_modelo = optional_text('vehiculo_modelo', 100, 'vehiculo_modelo')
-            vehiculo_color = optional_text('vehiculo_color', 50, 'vehiculo_color')
-            vehiculo_placas_raw = optional_text('vehiculo_placas', 60, 'vehiculo_placas')
-
-            vehiculo_placas = None
-            if vehiculo_placas_raw:
-                vehiculo_placas = vehiculo_placas_raw.upper().replace(' ', '').replace('-', '')
-                if len(vehiculo_placas) > 20:
-                    raise ValidationError(
-                        'El campo vehiculo_placas excede el límite de 20 caracteres',
-                        field='vehiculo_placas',
-                        code='max_length',
-                        meta={'max': 20}
-                    )
-                if not re.fullmatch(r"[A-Z0-9]+", vehiculo_placas):
-                    raise ValidationError(
-                        'El campo vehiculo_placas contiene caracteres inválidos',
-                        field='vehiculo_placas',
-                        code='invalid_characters'
-                    )
+        values, errors = validate_confirmacion(data)
+        if errors:
+            return jsonify(validation_error_payload(errors)), 400
 
-            if trae_vehiculo:
-                if not vehiculo_modelo:
-                    raise ValidationError('El campo vehiculo_modelo es obligatorio si trae vehículo', field='vehiculo_modelo', code='required')
-                if not vehiculo_color:
-                    raise ValidationError('El campo vehiculo_color es obligatorio si trae vehículo', field='vehiculo_color', code='required')
-                if not vehiculo_placas:
-                    raise ValidationError('El campo vehiculo_placas es obligatorio si trae vehículo', field='vehiculo_placas', code='required')
-            else:
-                vehiculo_modelo = None
-                vehiculo_color = None
-                vehiculo_placas = None
-
-        except ValidationError as ve:
-            payload = {'ok': False, 'error': ve.message}
-            if ve.field:
-                payload['field'] = ve.field
-            if ve.code:
-                payload['code'] = ve.code
-            if ve.meta:
-                payload.update(ve.meta)
-            return jsonify(payload), 400
+        id_evento = values['id_evento']
+        trae_vehiculo = values['trae_vehiculo']
         
         # Capturar información de la solicitud
         ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
         user_agent = request.headers.get('User-Agent', '')
         
         try:
-            with db_transaction() as (_, cursor):
-                cursor.execute("""
-                    INSERT INTO confirmacion_asistencia 
-                    (id_evento, dependencia, puesto, grado, nombre_completo, email,
-                     trae_vehiculo, vehiculo_modelo, vehiculo_color, vehiculo_placas,
-                     ip, user_agent, confirmado_en)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-                """, (
-                    id_evento,
-                    dependencia,
-                    puesto,
-                    grado,
-                    nombre_completo,
-                    email,
-                    trae_vehiculo,
-                    vehiculo_modelo,
-                    vehiculo_color,
-                    vehiculo_placas,
-                    ip_address,
-                    user_agent
-                ))
-
-                confirmacion_id = cursor.lastrowid
+            confirmacion_id = registrar_confirmacion(
+                confirmacion_params(values, ip_address, user_agent)
+            )
 
             # Evitar PII en logs: registrar IDs y metadatos operativos
             logger.info(
@@ -549,6 +1546,12 @@ def api_confirmacion():
                 'redirect': url_for('success', conf_id=confirmacion_id)
             }), 200
 
+        except (PoolTimeout, TimeoutError):
+            # BD saturada: 503 rápido con Retry-After en lugar de un 500 genérico
+            ADMISSION_REJECTED.inc(reason='db_timeout')
+            logger.warning("Confirmación rechazada por saturación de la BD (evento_id=%s)", id_evento)
+            return overload_response(503, MSG_SATURADO, ADMISSION_RETRY_AFTER)
+
         except MySQLError as e:
             # Detectar error de duplicado
             if e.errno == 1062:  # Duplicate entry
@@ -614,31 +1617,379 @@ def admin_logout():
     return redirect(url_for('admin_login'))
 
 
+# ----------------------------------------------------------------------------
+# Listados paginados (keyset sobre confirmado_en, id)
+# ----------------------------------------------------------------------------
+
+ADMIN_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', 50))
+ADMIN_PAGE_SIZE_MAX = int(os.getenv('ADMIN_PAGE_SIZE_MAX', 500))
+
+# Parámetros de query string que definen un listado (se propagan entre páginas)
+CONFIRMACIONES_FILTER_ARGS = ('evento', 'desde', 'hasta', 'vehiculo', 'por_pagina')
+
+# Orden estable para paginar: índices idx_confirmado_en (confirmado_en, id) e
+# idx_evento_confirmado (id_evento, confirmado_en, id). MySQL coloca los NULL
+# al final en orden DESC.
+CONFIRMACIONES_PAGE_SQL = """
+    SELECT 
+        c.id,
+        e.titulo as evento_titulo,
+        e.slug as evento_slug,
+        c.dependencia,
+        c.puesto,
+        c.grado,
+        c.nombre_completo,
+        c.email,
+        c.trae_vehiculo,
+        c.vehiculo_modelo,
+        c.vehiculo_color,
+        c.vehiculo_placas,
+        c.ip,
+        c.confirmado_en
+    FROM confirmacion_asistencia c
+    JOIN evento e ON c.id_evento = e.id
+    {where}
+    ORDER BY c.confirmado_en DESC, c.id DESC
+    LIMIT %s
+"""
+
+
+def parse_page_size(value):
+    """Tamaño de página solicitado, acotado a [1, ADMIN_PAGE_SIZE_MAX]."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return ADMIN_PAGE_SIZE
+    return max(1, min(size, ADMIN_PAGE_SIZE_MAX))
+
+
+def parse_fecha_filtro(value):
+    """Fecha YYYY-MM-DD de un filtro; None si viene vacía o es inválida."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def encode_keyset_cursor(row):
+    """Cursor opaco para continuar después de `row` (confirmado_en, id)."""
+    ts = row['confirmado_en']
+    prefix = ts.strftime('%Y%m%d%H%M%S') if ts else 'null'
+    return f"{prefix}-{row['id']}"
+
+
+def decode_keyset_cursor(token):
+    """Inverso de encode_keyset_cursor; None si el cursor es inválido."""
+    if not token:
+        return None
+    prefix, _, id_text = token.partition('-')
+    try:
+        row_id = int(id_text)
+        ts = None if prefix == 'null' else datetime.strptime(prefix, '%Y%m%d%H%M%S')
+    except ValueError:
+        return None
+    return ts, row_id
+
+
+def parse_confirmaciones_filtros(args, eventos_por_slug=None):
+    """Filtros del listado a partir de request.args.
+
+    `evento` es un slug; se traduce a id con `eventos_por_slug` para que la
+    consulta use el índice (id_evento, confirmado_en, id).
+    """
+    filtros = {}
+
+    slug = (args.get('evento') or '').strip()
+    if slug and eventos_por_slug is not None:
+        evento = eventos_por_slug.get(slug)
+        # Slug desconocido: id imposible para devolver una lista vacía
+        filtros['evento_id'] = evento['id'] if evento else 0
+
+    desde = parse_fecha_filtro(args.get('desde'))
+    if desde:
+        filtros['desde'] = desde
+    hasta = parse_fecha_filtro(args.get('hasta'))
+    if hasta:
+        # Inclusivo: hasta el final del día indicado
+        filtros['hasta'] = hasta + timedelta(days=1)
+
+    vehiculo = (args.get('vehiculo') or '').strip().lower()
+    if vehiculo in ('si', 'sí'):
+        filtros['trae_vehiculo'] = True
+    elif vehiculo == 'no':
+        filtros['trae_vehiculo'] = False
+
+    return filtros
+
+
+def filtros_condiciones(filtros):
+    """Condiciones WHERE (sobre el alias `c`) y sus parámetros para `filtros`."""
+    conditions = []
+    params = []
+
+    if 'evento_id' in filtros:
+        conditions.append("c.id_evento = %s")
+        params.append(filtros['evento_id'])
+    if 'desde' in filtros:
+        conditions.append("c.confirmado_en >= %s")
+        params.append(filtros['desde'])
+    if 'hasta' in filtros:
+        conditions.append("c.confirmado_en < %s")
+        params.append(filtros['hasta'])
+    if 'trae_vehiculo' in filtros:
+        conditions.append("c.trae_vehiculo = %s")
+        params.append(filtros['trae_vehiculo'])
+    return conditions, params
+
+
+def fetch_confirmaciones_page(cursor, filtros, page_size, after=None):
+    """Una página del listado y el cursor de la siguiente (o None).
+
+    `after` es el (confirmado_en, id) de la última fila ya mostrada.
+    """
+    conditions, params = filtros_condiciones(filtros)
+
+    if after is not None:
+        after_ts, after_id = after
+        if after_ts is None:
+            conditions.append("(c.confirmado_en IS NULL AND c.id < %s)")
+            params.append(after_id)
+        else:
+            conditions.append(
+                "(c.confirmado_en < %s"
+                " OR (c.confirmado_en = %s AND c.id < %s)"
+                " OR c.confirmado_en IS NULL)"
+            )
+            params.extend([after_ts, after_ts, after_id])
+
+    where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+    # Pedir una fila extra para saber si hay página siguiente sin COUNT(*)
+    cursor.execute(CONFIRMACIONES_PAGE_SQL.format(where=where), (*params, page_size + 1))
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_keyset_cursor(rows[-1])
+    return rows, next_cursor
+
+
+def filtros_query_args(args):
+    """Parámetros no vacíos del listado para construir enlaces de paginación."""
+    return {
+        key: args.get(key)
+        for key in CONFIRMACIONES_FILTER_ARGS
+        if (args.get(key) or '').strip()
+    }
+
+
+def fetch_eventos_resumen(cursor):
+    """Eventos (id, slug, titulo) para filtros y botones de exportación."""
+    cursor.execute("SELECT id, slug, titulo FROM evento ORDER BY creado_en DESC")
+    return cursor.fetchall()
+
+
+# Búsqueda por nombre, dependencia, correo o placas (migración 006):
+# FULLTEXT ft_nombre_dependencia para nombre/dependencia y los índices de
+# prefijo idx_email / idx_placas para correo y placas. Cada rama usa su propio
+# índice (un OR entre ellas obligaría a recorrer la tabla) y los candidatos se
+# suman por id para ordenar por relevancia. La colación utf8mb4_unicode_ci
+# hace que todas las comparaciones ignoren acentos y mayúsculas.
+BUSQUEDA_MIN_CHARS = 3
+MSG_BUSQUEDA_CORTA = f'La búsqueda debe tener al menos {BUSQUEDA_MIN_CHARS} caracteres'
+# Tope de candidatos por rama y de resultados paginables: mantiene acotado el
+# costo de términos muy comunes
+BUSQUEDA_MAX_RESULTADOS = int(os.getenv('BUSQUEDA_MAX_RESULTADOS', 1000))
+# Relevancia fija de las coincidencias por correo/placas (MATCH ... AGAINST
+# en modo booleano devuelve valores chicos; una coincidencia exacta va primero)
+BUSQUEDA_PESO_EXACTO = 100
+BUSQUEDA_PESO_PREFIJO = 50
+
+# Operadores del modo booleano de FULLTEXT; en el término del usuario son texto
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+_LIKE_SPECIAL = re.compile(r'([\\%_])')
+
+BUSQUEDA_SQL = """
+    SELECT 
+        c.id,
+        e.titulo as evento_titulo,
+        e.slug as evento_slug,
+        c.dependencia,
+        c.puesto,
+        c.grado,
+        c.nombre_completo,
+        c.email,
+        c.trae_vehiculo,
+        c.vehiculo_modelo,
+        c.vehiculo_color,
+        c.vehiculo_placas,
+        c.ip,
+        c.confirmado_en,
+        r.relevancia
+    FROM (
+        SELECT id, SUM(relevancia) AS relevancia
+        FROM ({ramas}) candidatos
+        GROUP BY id
+        ORDER BY relevancia DESC, id DESC
+        LIMIT %s OFFSET %s
+    ) r
+    JOIN confirmacion_asistencia c ON c.id = r.id
+    JOIN evento e ON c.id_evento = e.id
+    ORDER BY r.relevancia DESC, c.id DESC
+"""
+
+BUSQUEDA_RAMA_FULLTEXT = """(
+        SELECT c.id, MATCH(c.nombre_completo, c.dependencia) AGAINST (%s IN BOOLEAN MODE) AS relevancia
+        FROM confirmacion_asistencia c
+        WHERE {where}
+        ORDER BY relevancia DESC
+        LIMIT %s
+    )"""
+
+BUSQUEDA_RAMA_PREFIJO = """(
+        SELECT c.id, IF(c.{columna} = %s, {exacto}, {prefijo}) AS relevancia
+        FROM confirmacion_asistencia c
+        WHERE {where}
+        LIMIT %s
+    )"""
+
+
+def parse_pagina(value):
+    """Número de página (desde 1) de los resultados de búsqueda."""
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+def fulltext_query(term):
+    """Término del usuario como consulta FULLTEXT en modo booleano.
+
+    Cada palabra es obligatoria y de prefijo ('hern' encuentra Hernández);
+    se descartan las de menos de BUSQUEDA_MIN_CHARS letras (por debajo de
+    innodb_ft_min_token_size no están en el índice). None si no queda nada.
+    """
+    words = [w for w in _FULLTEXT_OPERATORS.sub(' ', term).split() if len(w) >= BUSQUEDA_MIN_CHARS]
+    if not words:
+        return None
+    return ' '.join(f'+{w}*' for w in words)
+
+
+def like_prefix(value):
+    return _LIKE_SPECIAL.sub(r'\\\1', value) + '%'
+
+
+def busqueda_ramas(term, filtros, limite):
+    """Subconsultas (sql, params) de la búsqueda; lista vacía si el término no sirve."""
+    conditions, filter_params = filtros_condiciones(filtros)
+    ramas = []
+
+    fulltext = fulltext_query(term)
+    if fulltext:
+        where = ' AND '.join(['MATCH(c.nombre_completo, c.dependencia) AGAINST (%s IN BOOLEAN MODE)', *conditions])
+        ramas.append((
+            BUSQUEDA_RAMA_FULLTEXT.format(where=where),
+            [fulltext, fulltext, *filter_params, limite],
+        ))
+
+    # Correo y placas son una sola "palabra": prefijo sobre el índice
+    if len(term.split()) == 1:
+        email = term.lower()
+        placas = term.upper().replace('-', '')
+        candidatos = [('email', email)]
+        if PLACAS_REGEX.fullmatch(placas):
+            candidatos.append(('vehiculo_placas', placas))
+        for columna, valor in candidatos:
+            where = ' AND '.join([f'c.{columna} LIKE %s', *conditions])
+            ramas.append((
+                BUSQUEDA_RAMA_PREFIJO.format(
+                    columna=columna, where=where,
+                    exacto=BUSQUEDA_PESO_EXACTO, prefijo=BUSQUEDA_PESO_PREFIJO,
+                ),
+                [valor, like_prefix(valor), *filter_params, limite],
+            ))
+    return ramas
+
+
+def buscar_confirmaciones(cursor, term, filtros, page_size, pagina=1):
+    """Una página de resultados ordenados por relevancia y si hay siguiente.
+
+    Paginación por OFFSET (la relevancia no sirve como cursor estable),
+    limitada a los primeros BUSQUEDA_MAX_RESULTADOS resultados.
+    """
+    term = normalize_text(term)
+    if len(term) < BUSQUEDA_MIN_CHARS:
+        return [], False
+    offset = (pagina - 1) * page_size
+    if offset >= BUSQUEDA_MAX_RESULTADOS:
+        return [], False
+    limit = min(page_size + 1, BUSQUEDA_MAX_RESULTADOS - offset)
+
+    ramas = busqueda_ramas(term, filtros, BUSQUEDA_MAX_RESULTADOS)
+    if not ramas:
+        return [], False
+    params = [p for _, rama_params in ramas for p in rama_params]
+    sql = BUSQUEDA_SQL.format(ramas=' UNION ALL '.join(sql for sql, _ in ramas))
+    cursor.execute(sql, (*params, limit, offset))
+    rows = cursor.fetchall()
+
+    has_next = len(rows) > page_size
+    return rows[:page_size], has_next
+
+
 @app.route('/admin/todas-confirmaciones')
 @admin_required
 def ver_todas_confirmaciones():
-    """Ver todas las confirmaciones de todos los eventos"""
+    """Ver todas las confirmaciones de todos los eventos (paginado)"""
     try:
+        page_size = parse_page_size(request.args.get('por_pagina'))
+        after = decode_keyset_cursor(request.args.get('cursor'))
+        q = (request.args.get('q') or '').strip()
+        busqueda = None
+        if q and len(q) < BUSQUEDA_MIN_CHARS:
+            # Igual que /admin/api/buscar: se avisa y se muestra el listado completo
+            flash(MSG_BUSQUEDA_CORTA, 'warning')
+            q = ''
+
         with db_cursor(dictionary=True) as (_, cursor):
-            # Obtener todas las confirmaciones con información del evento
-            cursor.execute("""
-                SELECT 
-                    e.titulo as evento_titulo,
-                    e.slug as evento_slug,
-                    c.*
-                FROM confirmacion_asistencia c
-                JOIN evento e ON c.id_evento = e.id
-                ORDER BY c.confirmado_en DESC
-            """)
-            todas_confirmaciones = cursor.fetchall()
+            eventos = fetch_eventos_resumen(cursor)
+            filtros = parse_confirmaciones_filtros(
+                request.args, {e['slug']: e for e in eventos}
+            )
+
+            if q:
+                # Resultados por relevancia, paginados por número de página
+                pagina = parse_pagina(request.args.get('pagina'))
+                confirmaciones, has_next = buscar_confirmaciones(
+                    cursor, q, filtros, page_size, pagina
+                )
+                busqueda = {'q': q, 'pagina': pagina, 'has_next': has_next}
+                next_cursor = None
+            else:
+                # Obtener la página de confirmaciones con información del evento
+                confirmaciones, next_cursor = fetch_confirmaciones_page(
+                    cursor, filtros, page_size, after
+                )
 
             # Obtener estadísticas
-            cursor.execute("SELECT COUNT(*) as total FROM confirmacion_asistencia")
+            cursor.execute("""
+                SELECT COALESCE(SUM(total_confirmaciones), 0) as total
+                FROM evento_contador
+            """)
             stats = cursor.fetchone()
         
         return render_template('todas_confirmaciones.html',
-                             confirmaciones=todas_confirmaciones,
-                             total=stats['total'])
+                             confirmaciones=confirmaciones,
+                             total=stats['total'],
+                             eventos=eventos,
+                             filtros=filtros_query_args(request.args),
+                             page_size=page_size,
+                             is_first_page=after is None,
+                             next_cursor=next_cursor,
+                             busqueda=busqueda)
         
     except Exception as e:
         logger.exception("Error al cargar todas las confirmaciones")
@@ -646,6 +1997,110 @@ def ver_todas_confirmaciones():
         return redirect(url_for('admin_panel'))
 
 
+def confirmacion_json(row):
+    """Fila del listado lista para jsonify."""
+    item = dict(row)
+    item['trae_vehiculo'] = bool(row['trae_vehiculo'])
+    item['confirmado_en'] = row['confirmado_en'].isoformat() if row['confirmado_en'] else None
+    item['evento_url'] = url_for('admin_panel', slug=row['evento_slug'])
+    return item
+
+
+@app.route('/admin/api/confirmaciones')
+@admin_required
+def api_admin_confirmaciones():
+    """Página de confirmaciones en JSON (carga incremental de la tabla)"""
+    try:
+        page_size = parse_page_size(request.args.get('por_pagina'))
+        after = decode_keyset_cursor(request.args.get('cursor'))
+
+        with db_cursor(dictionary=True) as (_, cursor):
+            eventos = fetch_eventos_resumen(cursor)
+            filtros = parse_confirmaciones_filtros(
+                request.args, {e['slug']: e for e in eventos}
+            )
+            confirmaciones, next_cursor = fetch_confirmaciones_page(
+                cursor, filtros, page_size, after
+            )
+
+        items = [confirmacion_json(c) for c in confirmaciones]
+
+        next_url = None
+        if next_cursor:
+            next_url = url_for(
+                'api_admin_confirmaciones',
+                cursor=next_cursor,
+                **filtros_query_args(request.args)
+            )
+
+        return jsonify({
+            'ok': True,
+            'items': items,
+            'next_cursor': next_cursor,
+            'next_url': next_url,
+        }), 200
+
+    except Exception:
+        logger.exception("Error en api_admin_confirmaciones")
+        return jsonify({'ok': False, 'error': 'Error interno del servidor'}), 500
+
+
+@app.route('/admin/api/buscar')
+@admin_required
+def api_admin_buscar():
+    """Búsqueda por nombre, dependencia, correo o placas (JSON, por relevancia)
+
+    Acepta los mismos filtros que el listado (evento, desde, hasta, vehiculo,
+    por_pagina) y `pagina` para avanzar.
+    """
+    q = (request.args.get('q') or '').strip()
+    if len(q) < BUSQUEDA_MIN_CHARS:
+        return jsonify({
+            'ok': False,
+            'error': MSG_BUSQUEDA_CORTA,
+        }), 400
+
+    try:
+        page_size = parse_page_size(request.args.get('por_pagina'))
+        pagina = parse_pagina(request.args.get('pagina'))
+
+        with db_cursor(dictionary=True) as (_, cursor):
+            eventos = fetch_eventos_resumen(cursor)
+            filtros = parse_confirmaciones_filtros(
+                request.args, {e['slug']: e for e in eventos}
+            )
+            resultados, has_next = buscar_confirmaciones(
+                cursor, q, filtros, page_size, pagina
+            )
+
+        items = []
+        for row in resultados:
+            item = confirmacion_json(row)
+            item['relevancia'] = float(row['relevancia'])
+            items.append(item)
+
+        next_url = None
+        if has_next:
+            next_url = url_for(
+                'api_admin_buscar',
+                q=q,
+                pagina=pagina + 1,
+                **filtros_query_args(request.args)
+            )
+
+        return jsonify({
+            'ok': True,
+            'q': q,
+            'pagina': pagina,
+            'items': items,
+            'next_url': next_url,
+        }), 200
+
+    except Exception:
+        logger.exception("Error en api_admin_buscar")
+        return jsonify({'ok': False, 'error': 'Error interno del servidor'}), 500
+
+
 @app.route('/admin')
 @admin_required
 def admin_panel():
@@ -655,10 +2110,16 @@ def admin_panel():
             # Obtener todos los eventos
             cursor.execute("""
                 SELECT e.*, 
-                       COUNT(c.id) as total_confirmaciones
+                       COALESCE(ec.total_confirmaciones, 0) as total_confirmaciones,
+                       COALESCE(ec.total_vehiculos, 0) as total_vehiculos
                 FROM evento e
-                LEFT JOIN confirmacion_asistencia c ON e.id = c.id_evento
-                GROUP BY e.id
+                LEFT JOIN (
+                    SELECT id_evento,
+                           SUM(total_confirmaciones) as total_confirmaciones,
+                           SUM(total_vehiculos) as total_vehiculos
+                    FROM evento_contador
+                    GROUP BY id_evento
+                ) ec ON e.id = ec.id_evento
                 ORDER BY e.creado_en DESC
             """)
             eventos = cursor.fetchall()
@@ -667,24 +2128,31 @@ def admin_panel():
             confirmaciones = []
             selected_slug = request.args.get('slug')
             selected_evento = None
+            next_cursor = None
+            after = decode_keyset_cursor(request.args.get('cursor'))
+            page_size = parse_page_size(request.args.get('por_pagina'))
 
             if selected_slug:
-                cursor.execute("SELECT id, titulo, slug FROM evento WHERE slug = %s", (selected_slug,))
-                selected_evento = cursor.fetchone()
+                selected_evento = next((e for e in eventos if e['slug'] == selected_slug), None)
 
                 if selected_evento:
-                    cursor.execute("""
-                        SELECT * FROM confirmacion_asistencia 
-                        WHERE id_evento = %s
-                        ORDER BY confirmado_en DESC
-                    """, (selected_evento['id'],))
-                    confirmaciones = cursor.fetchall()
+                    filtros = parse_confirmaciones_filtros(request.args)
+                    filtros['evento_id'] = selected_evento['id']
+                    confirmaciones, next_cursor = fetch_confirmaciones_page(
+                        cursor, filtros, page_size, after
+                    )
         
+        filtros_args = filtros_query_args(request.args)
+        filtros_args.pop('evento', None)
         return render_template('admin.html', 
                              eventos=eventos, 
                              confirmaciones=confirmaciones,
                              selected_evento=selected_evento,
                              selected_slug=selected_slug,
+                             filtros=filtros_args,
+                             page_size=page_size,
+                             is_first_page=after is None,
+                             next_cursor=next_cursor,
                              ubicaciones=list_predefined_locations())
         
     except Exception as e:
@@ -746,6 +2214,7 @@ def crear_evento():
 
             evento_id = cursor.lastrowid
         
+        invalidate_evento_cache()
         flash(f'Evento "{titulo}" creado exitosamente', 'success')
         logger.info(
             "Evento creado (evento_id=%s slug=%s activo=%s ubicacion_key=%s)",
@@ -778,7 +2247,8 @@ def crear_evento():
 def editar_evento(evento_id):
     """Editar un evento existente"""
     try:
-        with db_cursor(dictionary=True) as (_, cursor):
+        # El POST reescribe el evento: leerlo del primario, no de la réplica
+        with db_cursor(dictionary=True, primary=request.method == 'POST') as (_, cursor):
             cursor.execute("SELECT * FROM evento WHERE id = %s", (evento_id,))
             evento = cursor.fetchone()
 
@@ -846,6 +2316,7 @@ def editar_evento(evento_id):
                     )
                 )
 
+            invalidate_evento_cache()
             logger.info(
                 "Evento actualizado (evento_id=%s slug=%s activo=%s ubicacion_key=%s)",
                 evento_id,
@@ -887,6 +2358,7 @@ def activar_evento(evento_id):
             # Activar el seleccionado
             cursor.execute("UPDATE evento SET activo = TRUE WHERE id = %s", (evento_id,))
         
+        invalidate_evento_cache()
         flash('Evento activado exitosamente', 'success')
         
     except Exception as e:
@@ -904,6 +2376,7 @@ def desactivar_evento(evento_id):
         with db_transaction() as (_, cursor):
             cursor.execute("UPDATE evento SET activo = FALSE WHERE id = %s", (evento_id,))
         
+        invalidate_evento_cache()
         flash('Evento desactivado exitosamente', 'success')
         
     except Exception as e:
@@ -913,10 +2386,352 @@ def desactivar_evento(evento_id):
     return redirect(url_for('admin_panel'))
 
 
+# ----------------------------------------------------------------------------
+# Importación masiva de confirmaciones (CSV / JSON Lines)
+# ----------------------------------------------------------------------------
+
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+IMPORT_CHUNK_SIZE_MAX = 5000
+
+# Encabezados aceptados en CSV además de los nombres de campo de la API
+# (incluye los del CSV de exportación, para reimportar un archivo editado)
+IMPORT_HEADER_ALIASES = {
+    'dependencia': 'dependencia',
+    'puesto': 'puesto',
+    'grado': 'grado',
+    'grado (otro)': 'grado_otro',
+    'nombre completo': 'nombre_completo',
+    'nombre': 'nombre_completo',
+    'correo': 'email',
+    'correo electrónico': 'email',
+    'trae vehículo': 'trae_vehiculo',
+    'trae vehiculo': 'trae_vehiculo',
+    'modelo': 'vehiculo_modelo',
+    'color': 'vehiculo_color',
+    'placas': 'vehiculo_placas',
+}
+
+JSONL_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines')
+
+
+def normalize_import_header(name):
+    key = (name or '').strip().lower()
+    return IMPORT_HEADER_ALIASES.get(key, key)
+
+
+def iter_import_records(stream, formato):
+    """Recorre el archivo sin cargarlo completo: (fila, dict | None, error | None)."""
+    if not hasattr(stream, 'read1'):
+        stream = io.BufferedReader(stream)
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='' if formato == 'csv' else None)
+
+    if formato == 'csv':
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if not header:
+            return
+        keys = [normalize_import_header(h) for h in header]
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            yield reader.line_num, dict(zip(keys, row)), None
+        return
+
+    for fila, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield fila, None, 'JSON inválido'
+            continue
+        if not isinstance(record, dict):
+            yield fila, None, 'Se esperaba un objeto JSON por línea'
+            continue
+        yield fila, record, None
+
+
+def iter_importacion(evento_id, records, chunk_size, ip, user_agent):
+    """Valida, inserta por lotes y emite resultados por fila en JSON Lines (bytes).
+
+    Memoria acotada por `chunk_size`: solo se retienen las filas del lote en curso.
+    """
+    totals = {'inserted': 0, 'duplicate': 0, 'invalid': 0, 'error': 0}
+    chunk = []
+    output = []
+
+    def emit(result):
+        totals[result['estado']] += 1
+        output.append(json.dumps(result, ensure_ascii=False, default=str))
+
+    def drain():
+        data = ('\n'.join(output) + '\n').encode('utf-8') if output else b''
+        output.clear()
+        return data
+
+    def flush_chunk():
+        if not chunk:
+            return
+        try:
+            with db_transaction() as (_, cursor):
+                outcomes = insert_confirmaciones_chunk(cursor, [params for _, params in chunk])
+            for (fila, _), outcome in zip(chunk, outcomes):
+                if isinstance(outcome, MySQLError):
+                    emit({'fila': fila, 'estado': 'duplicate'})
+                elif outcome is None:
+                    emit({'fila': fila, 'estado': 'inserted'})
+                else:
+                    emit({'fila': fila, 'estado': 'inserted', 'id': outcome})
+        except Exception:
+            logger.exception(
+                "Error al insertar lote de importación (evento_id=%s filas=%s)",
+                evento_id,
+                len(chunk),
+            )
+            for fila, _ in chunk:
+                emit({'fila': fila, 'estado': 'error', 'error': 'Error al insertar el lote'})
+        chunk.clear()
+
+    for fila, data, error in records:
+        if error:
+            emit({'fila': fila, 'estado': 'invalid', 'errors': [{'error': error}]})
+            continue
+
+        # El evento lo define la URL, no el archivo
+        data['id_evento'] = evento_id
+        values, errors = validate_confirmacion(data)
+        if errors:
+            emit({'fila': fila, 'estado': 'invalid', 'errors': [e.to_dict() for e in errors]})
+        else:
+            chunk.append((fila, confirmacion_params(values, ip, user_agent)))
+            if len(chunk) >= chunk_size:
+                flush_chunk()
+
+        if len(output) >= chunk_size:
+            yield drain()
+
+    flush_chunk()
+    output.append(json.dumps({'resumen': totals}))
+    yield drain()
+
+    logger.info(
+        "Importación masiva (evento_id=%s insertadas=%s duplicadas=%s invalidas=%s errores=%s)",
+        evento_id,
+        totals['inserted'],
+        totals['duplicate'],
+        totals['invalid'],
+        totals['error'],
+    )
+
+
+@app.route('/admin/evento/<int:evento_id>/importar', methods=['POST'])
+@admin_required
+def importar_confirmaciones(evento_id):
+    """Importación masiva de confirmaciones (CSV o JSON Lines) en streaming"""
+    try:
+        with db_cursor(dictionary=True) as (_, cursor):
+            cursor.execute("SELECT id FROM evento WHERE id = %s", (evento_id,))
+            evento = cursor.fetchone()
+
+        if not evento:
+            return jsonify({'ok': False, 'error': 'Evento no encontrado'}), 404
+
+        # Archivo subido desde el panel (multipart) o cuerpo crudo (curl --data-binary)
+        upload = request.files.get('archivo')
+        if upload is not None:
+            stream = upload.stream
+            filename = (upload.filename or '').lower()
+            content_type = (upload.mimetype or '').lower()
+        else:
+            stream = request.stream
+            filename = ''
+            content_type = (request.mimetype or '').lower()
+
+        formato = (request.args.get('formato') or request.form.get('formato') or '').lower()
+        if formato not in ('csv', 'jsonl'):
+            if content_type in JSONL_CONTENT_TYPES or filename.endswith(('.jsonl', '.ndjson')):
+                formato = 'jsonl'
+            else:
+                formato = 'csv'
+
+        try:
+            chunk_size = int(request.args.get('lote') or IMPORT_CHUNK_SIZE)
+        except ValueError:
+            chunk_size = IMPORT_CHUNK_SIZE
+        chunk_size = max(1, min(chunk_size, IMPORT_CHUNK_SIZE_MAX))
+
+        ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
+        user_agent = f"importacion-masiva ({session.get('admin_user', 'admin')})"
+
+        # Los commits ocurren mientras se envía el cuerpo, cuando la cookie de
+        # sesión ya salió: lo que marque db_transaction ahí se pierde
+        mark_recent_write()
+
+        return Response(
+            stream_with_context(iter_importacion(
+                evento_id,
+                iter_import_records(stream, formato),
+                chunk_size,
+                ip_address,
+                user_agent,
+            )),
+            mimetype='application/x-ndjson',
+            headers={'X-Accel-Buffering': 'no'}
+        )
+
+    except Exception:
+        logger.exception("Error en importación masiva (evento_id=%s)", evento_id)
+        return jsonify({'ok': False, 'error': 'Error interno del servidor'}), 500
+
+
+@app.route('/admin/metrics')
+def admin_metrics():
+    """Métricas de todos los workers en formato Prometheus.
+
+    Acepta la sesión de administrador o `Authorization: Bearer $METRICS_TOKEN`
+    (para el scraper de Prometheus).
+    """
+    token = os.getenv('METRICS_TOKEN')
+    auth = request.headers.get('Authorization', '')
+    authorized = session.get('is_admin') or (
+        token and hmac.compare_digest(auth.encode(), f'Bearer {token}'.encode())
+    )
+    if not authorized:
+        return Response('No autorizado\n', status=401, mimetype='text/plain')
+
+    metrics_store.flush()
+    return Response(
+        render_prometheus(metrics_store.collect()),
+        mimetype='text/plain; version=0.0.4'
+    )
+
+
+@app.route('/admin/cache')
+@admin_required
+def admin_cache_stats():
+    """Contadores de las cachés de eventos y de páginas de este worker (JSON)"""
+    return jsonify({
+        'pid': os.getpid(),
+        'evento_cache': evento_cache.stats(),
+        'page_cache': page_cache.stats(),
+        'reporte_cache': reporte_cache.stats(),
+    })
+
+
+EXPORT_CSV_HEADER = [
+    'Slug', 'Título Evento', 'Dependencia', 'Puesto', 'Grado', 
+    'Nombre Completo', 'Correo', 'Trae Vehículo', 'Modelo', 'Color', 'Placas',
+    'Confirmado En', 'Creado En'
+]
+
+# Columnas en el mismo orden que EXPORT_CSV_HEADER (cursor por tuplas, sin dicts por fila)
+EXPORT_CSV_QUERY = """
+    SELECT 
+        e.slug,
+        e.titulo,
+        c.dependencia,
+        c.puesto,
+        c.grado,
+        c.nombre_completo,
+        c.email,
+        c.trae_vehiculo,
+        c.vehiculo_modelo,
+        c.vehiculo_color,
+        c.vehiculo_placas,
+        c.confirmado_en,
+        c.creado_en
+    FROM confirmacion_asistencia c
+    JOIN evento e ON c.id_evento = e.id
+    WHERE c.id_evento = %s
+    ORDER BY c.confirmado_en DESC
+"""
+
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 500))
+
+
+def format_export_row(row):
+    """Convierte una fila de EXPORT_CSV_QUERY en la fila del CSV."""
+    (slug, titulo, dependencia, puesto, grado, nombre_completo, email,
+     trae_vehiculo, vehiculo_modelo, vehiculo_color, vehiculo_placas,
+     confirmado_en, creado_en) = row
+    return [
+        slug,
+        titulo,
+        dependencia,
+        puesto,
+        grado,
+        nombre_completo,
+        email or '',
+        'Sí' if trae_vehiculo else 'No',
+        vehiculo_modelo or '',
+        vehiculo_color or '',
+        vehiculo_placas or '',
+        confirmado_en.strftime('%Y-%m-%d %H:%M:%S') if confirmado_en else '',
+        creado_en.strftime('%Y-%m-%d %H:%M:%S') if creado_en else ''
+    ]
+
+
+def iter_export_csv(evento_id, slug, chunk_size=None):
+    """Genera el CSV por bloques (bytes UTF-8 con BOM) a partir de iter_export_rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data.encode('utf-8')
+
+    # Agregar BOM para UTF-8 (para Excel)
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_CSV_HEADER)
+    yield drain()
+
+    for rows in iter_export_rows(evento_id, slug, chunk_size):
+        writer.writerows(rows)
+        yield drain()
+
+
+def iter_export_rows(evento_id, slug, chunk_size=None):
+    """Filas del export ya formateadas, en bloques de `chunk_size` (fetchmany).
+
+    El cursor es sin buffer: MySQL envía las filas conforme se consumen y la
+    memoria depende del tamaño de bloque, no del número de confirmaciones.
+    """
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    total = 0
+    finished = False
+    with db_cursor() as (conn, cursor):
+        try:
+            cursor.execute(EXPORT_CSV_QUERY, (evento_id,))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total += len(rows)
+                yield [format_export_row(row) for row in rows]
+            finished = True
+        finally:
+            if not finished:
+                # Cliente desconectado o error: descartar filas pendientes antes de devolver la conexión
+                try:
+                    conn.consume_results()
+                except Exception:
+                    logger.exception("Error al descartar resultados del export (slug=%s)", slug)
+
+    logger.info(
+        "Export (slug=%s evento_id=%s filas=%s)",
+        slug,
+        evento_id,
+        total,
+    )
+
+
 @app.route('/admin/export')
 @admin_required
 def export_csv():
-    """Exportar confirmaciones a CSV"""
+    """Exportar confirmaciones a CSV (respuesta en streaming)"""
     try:
         slug = request.args.get('slug')
         if not slug:
@@ -925,84 +2740,20 @@ def export_csv():
         
         with db_cursor(dictionary=True) as (_, cursor):
             # Obtener evento
-            cursor.execute("SELECT * FROM evento WHERE slug = %s", (slug,))
+            cursor.execute("SELECT id FROM evento WHERE slug = %s", (slug,))
             evento = cursor.fetchone()
 
-            if not evento:
-                flash('Evento no encontrado', 'danger')
-                return redirect(url_for('admin_panel'))
-
-            # Obtener confirmaciones
-            cursor.execute("""
-                SELECT 
-                    e.slug,
-                    e.titulo,
-                    c.dependencia,
-                    c.puesto,
-                    c.grado,
-                    c.nombre_completo,
-                    c.email,
-                    c.trae_vehiculo,
-                    c.vehiculo_modelo,
-                    c.vehiculo_color,
-                    c.vehiculo_placas,
-                    c.confirmado_en,
-                    c.creado_en
-                FROM confirmacion_asistencia c
-                JOIN evento e ON c.id_evento = e.id
-                WHERE c.id_evento = %s
-                ORDER BY c.confirmado_en DESC
-            """, (evento['id'],))
-
-            confirmaciones = cursor.fetchall()
+        if not evento:
+            flash('Evento no encontrado', 'danger')
+            return redirect(url_for('admin_panel'))
 
-            logger.info(
-                "Export CSV (slug=%s evento_id=%s filas=%s)",
-                slug,
-                evento['id'],
-                len(confirmaciones),
-            )
-        
-        # Crear CSV en memoria
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Encabezados
-        writer.writerow([
-            'Slug', 'Título Evento', 'Dependencia', 'Puesto', 'Grado', 
-            'Nombre Completo', 'Correo', 'Trae Vehículo', 'Modelo', 'Color', 'Placas',
-            'Confirmado En', 'Creado En'
-        ])
-        
-        # Datos
-        for c in confirmaciones:
-            writer.writerow([
-                c['slug'],
-                c['titulo'],
-                c['dependencia'],
-                c['puesto'],
-                c['grado'],
-                c['nombre_completo'],
-                c.get('email') or '',
-                'Sí' if c['trae_vehiculo'] else 'No',
-                c['vehiculo_modelo'] or '',
-                c['vehiculo_color'] or '',
-                c['vehiculo_placas'] or '',
-                c['confirmado_en'].strftime('%Y-%m-%d %H:%M:%S') if c['confirmado_en'] else '',
-                c['creado_en'].strftime('%Y-%m-%d %H:%M:%S') if c['creado_en'] else ''
-            ])
-        
-        # Preparar respuesta
-        output.seek(0)
-        
-        # Agregar BOM para UTF-8 (para Excel)
-        csv_data = '\ufeff' + output.getvalue()
-        
+        # Sin Content-Length: el servidor WSGI envía la respuesta con chunked transfer
         return Response(
-            csv_data,
+            stream_with_context(iter_export_csv(evento['id'], slug)),
             mimetype='text/csv; charset=utf-8-sig',
             headers={
-                'Content-Disposition': f'attachment; filename=confirmaciones_{slug}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+                'Content-Disposition': f'attachment; filename=confirmaciones_{slug}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+                'X-Accel-Buffering': 'no',
             }
         )
         
@@ -1012,6 +2763,396 @@ def export_csv():
         return redirect(url_for('admin_panel'))
 
 
+# ----------------------------------------------------------------------------
+# Exportaciones en segundo plano (exportaciones.py)
+# ----------------------------------------------------------------------------
+
+# El request solo encola el trabajo: ni el worker HTTP ni la conexión quedan
+# ocupados mientras se escribe el archivo, y el proxy no corta por timeout
+export_jobs = ExportJobs(
+    directory=os.getenv('EXPORT_JOB_DIR') or os.path.join(RUN_DIR, 'exports'),
+    workers=max(1, int(os.getenv('EXPORT_JOB_WORKERS', 2))),
+    max_pending=int(os.getenv('EXPORT_JOB_MAX_PENDING', 8)),
+    retention=float(os.getenv('EXPORT_RETENTION_SECONDS', 24 * 3600)),
+    dedup_window=float(os.getenv('EXPORT_DEDUP_SECONDS', 60)),
+    logger=logger,
+)
+
+metrics.callback('export_jobs_pending', 'Exportaciones en cola o en curso en este worker', 'gauge', lambda: export_jobs.stats()['pending'])
+metrics.callback('export_jobs_submitted_total', 'Exportaciones encoladas', 'counter', lambda: export_jobs.submitted)
+metrics.callback('export_jobs_deduplicated_total', 'Solicitudes de exportación resueltas con un trabajo existente', 'counter', lambda: export_jobs.deduplicated)
+metrics.callback('export_jobs_failed_total', 'Exportaciones fallidas', 'counter', lambda: export_jobs.failed)
+
+
+def export_job_json(job):
+    """Estado público de un trabajo (con porcentaje y URLs)."""
+    total = job.get('total')
+    payload = {
+        'id': job['id'],
+        'formato': job['formato'],
+        'nombre': job['nombre'],
+        'estado': job['estado'],
+        'filas': job['filas'],
+        'total': total,
+        'porcentaje': min(100, round(100 * job['filas'] / total)) if total else None,
+        'error': job['error'],
+        'creado_en': datetime.fromtimestamp(job['creado']).isoformat(timespec='seconds'),
+        'estado_url': url_for('exportacion_estado', job_id=job['id']),
+        'descarga_url': None,
+    }
+    if job['estado'] == EXPORT_LISTO:
+        payload['porcentaje'] = 100
+        payload['bytes'] = job.get('bytes')
+        payload['descarga_url'] = url_for('exportacion_descarga', job_id=job['id'])
+    return payload
+
+
+@app.route('/admin/exportaciones', methods=['POST'])
+@admin_required
+def crear_exportacion():
+    """Encola la exportación de un evento (slug, formato=csv|xlsx); devuelve el id"""
+    slug = (request.form.get('slug') or request.args.get('slug') or '').strip()
+    formato = (request.form.get('formato') or request.args.get('formato') or 'csv').strip().lower()
+    if formato not in EXPORT_FORMATOS:
+        return jsonify({'ok': False, 'error': 'Formato inválido (csv o xlsx)'}), 400
+    if not formato_disponible(formato):
+        return jsonify({'ok': False, 'error': 'XLSX no disponible en este servidor'}), 400
+
+    try:
+        with db_cursor(dictionary=True) as (_, cursor):
+            cursor.execute("SELECT id FROM evento WHERE slug = %s", (slug,))
+            evento = cursor.fetchone()
+            if evento:
+                cursor.execute(
+                    "SELECT COALESCE(SUM(total_confirmaciones), 0) AS total FROM evento_contador WHERE id_evento = %s",
+                    (evento['id'],),
+                )
+                total = int(cursor.fetchone()['total'])
+        if not evento:
+            return jsonify({'ok': False, 'error': 'Evento no encontrado'}), 404
+
+        evento_id = evento['id']
+        job, created = export_jobs.submit(
+            key=f'evento:{evento_id}:{formato}',
+            formato=formato,
+            nombre=f'confirmaciones_{slug}_{datetime.now().strftime("%Y%m%d_%H%M%S")}',
+            header=EXPORT_CSV_HEADER,
+            total=total,
+            producer=lambda: iter_export_rows(evento_id, slug),
+        )
+        # 202 si se creó, 200 si ya había uno igual reciente (deduplicado)
+        return jsonify({'ok': True, 'nuevo': created, 'job': export_job_json(job)}), 202 if created else 200
+
+    except ExportQueueFull:
+        return jsonify({'ok': False, 'error': 'Hay demasiadas exportaciones en curso, intenta en un momento'}), 503
+    except Exception:
+        logger.exception("Error al crear la exportación (slug=%s)", slug)
+        return jsonify({'ok': False, 'error': 'Error interno del servidor'}), 500
+
+
+@app.route('/admin/exportaciones/<job_id>')
+@admin_required
+def exportacion_estado(job_id):
+    """Avance de una exportación (para polling)"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'ok': False, 'error': 'Exportación no encontrada o expirada'}), 404
+    return jsonify({'ok': True, 'job': export_job_json(job)}), 200
+
+
+@app.route('/admin/exportaciones/<job_id>/descarga')
+@admin_required
+def exportacion_descarga(job_id):
+    """Archivo terminado de una exportación"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'ok': False, 'error': 'Exportación no encontrada o expirada'}), 404
+    if job['estado'] != EXPORT_LISTO:
+        return jsonify({'ok': False, 'job': export_job_json(job)}), 409
+    path = export_jobs.artifact_path(job)
+    if not os.path.exists(path):
+        return jsonify({'ok': False, 'error': 'El archivo ya fue eliminado'}), 410
+    return send_file(
+        path,
+        mimetype=EXPORT_FORMATOS[job['formato']]['mimetype'],
+        as_attachment=True,
+        download_name=job['nombre'],
+        max_age=0,
+    )
+
+
+# ----------------------------------------------------------------------------
+# Reporte de vehículos y estacionamiento por ubicación
+# ----------------------------------------------------------------------------
+
+# Todo se agrega en MySQL (SUM/COUNT ... GROUP BY): Python solo recibe las
+# filas ya resumidas. Los totales salen de evento_contador (sin recorrer
+# confirmaciones); los desgloses usan idx_evento_vehiculo (migración 007).
+REPORTE_TOP = int(os.getenv('REPORTE_TOP', 15))
+REPORTE_INTERVALOS = {
+    'hora': '%Y-%m-%d %H:00',
+    'dia': '%Y-%m-%d',
+}
+
+
+def parse_capacidad_estacionamiento(value):
+    """'teatro-jose-vasconcelos=120,duacyd=40' -> {ubicacion_key: cajones}."""
+    capacidad = {}
+    for item in (value or '').split(','):
+        key, _, cajones = item.partition('=')
+        key = key.strip()
+        if key in PREDEFINED_LOCATIONS:
+            try:
+                capacidad[key] = max(0, int(cajones))
+            except ValueError:
+                logger.warning("ESTACIONAMIENTO_CAPACIDAD: valor inválido para %s", key)
+    return capacidad
+
+
+# Cajones de estacionamiento por ubicación (opcional; sin dato no hay % de ocupación)
+ESTACIONAMIENTO_CAPACIDAD = parse_capacidad_estacionamiento(os.getenv('ESTACIONAMIENTO_CAPACIDAD'))
+
+# Misma caché que los eventos, con TTL corto: refrescar el reporte durante el
+# evento no vuelve a recorrer la tabla, y editar un evento la invalida
+reporte_cache = EventoCache(
+    max_entries=int(os.getenv('REPORTE_CACHE_MAX', 64)),
+    ttl=float(os.getenv('REPORTE_CACHE_TTL', 30)),
+    negative_ttl=0,
+    version_file=evento_cache.version_file,
+)
+
+REPORTE_UBICACIONES_SQL = """
+    SELECT 
+        e.ubicacion_key,
+        MAX(COALESCE(e.ubicacion_nombre, e.lugar)) as ubicacion_nombre,
+        COUNT(DISTINCT e.id) as eventos,
+        CAST(COALESCE(SUM(ec.total_confirmaciones), 0) AS UNSIGNED) as total_confirmaciones,
+        CAST(COALESCE(SUM(ec.total_vehiculos), 0) AS UNSIGNED) as total_vehiculos
+    FROM evento e
+    LEFT JOIN evento_contador ec ON ec.id_evento = e.id
+    {where}
+    GROUP BY e.ubicacion_key
+    ORDER BY total_vehiculos DESC
+"""
+
+REPORTE_EVENTOS_SQL = """
+    SELECT 
+        e.id,
+        e.slug,
+        e.titulo,
+        e.ubicacion_key,
+        COALESCE(e.ubicacion_nombre, e.lugar) as ubicacion_nombre,
+        e.fecha_inicio,
+        e.activo,
+        CAST(COALESCE(SUM(ec.total_confirmaciones), 0) AS UNSIGNED) as total_confirmaciones,
+        CAST(COALESCE(SUM(ec.total_vehiculos), 0) AS UNSIGNED) as total_vehiculos
+    FROM evento e
+    LEFT JOIN evento_contador ec ON ec.id_evento = e.id
+    {where}
+    GROUP BY e.id
+    ORDER BY e.fecha_inicio DESC, e.id DESC
+"""
+
+# La colación utf8mb4_unicode_ci agrupa 'Gris', 'gris ' y 'GRÍS' juntos
+REPORTE_DESGLOSE_SQL = """
+    SELECT c.{columna} as valor, COUNT(*) as total
+    FROM confirmacion_asistencia c
+    WHERE c.trae_vehiculo = TRUE AND {where}
+    GROUP BY c.{columna}
+    ORDER BY total DESC, valor
+    LIMIT %s
+"""
+
+REPORTE_SERIE_SQL = """
+    SELECT 
+        DATE_FORMAT(c.confirmado_en, %s) as periodo,
+        COUNT(*) as confirmaciones,
+        CAST(COALESCE(SUM(c.trae_vehiculo), 0) AS UNSIGNED) as vehiculos
+    FROM confirmacion_asistencia c
+    WHERE c.confirmado_en IS NOT NULL AND {where}
+    GROUP BY periodo
+    ORDER BY periodo
+"""
+
+
+def reporte_alcance(args, eventos_por_slug):
+    """(tipo, valor) del reporte: un evento, una ubicación o todo."""
+    slug = (args.get('evento') or '').strip()
+    if slug:
+        evento = eventos_por_slug.get(slug)
+        return 'evento', evento['id'] if evento else 0
+    ubicacion = (args.get('ubicacion') or '').strip()
+    if ubicacion in PREDEFINED_LOCATIONS:
+        return 'ubicacion', ubicacion
+    return 'todo', None
+
+
+def reporte_condiciones(alcance, alias):
+    """Condición SQL sobre `alias` (evento `e` o confirmación `c`) y sus parámetros."""
+    tipo, valor = alcance
+    if tipo == 'evento':
+        column = 'e.id' if alias == 'e' else 'c.id_evento'
+        return f"{column} = %s", [valor]
+    if tipo == 'ubicacion':
+        if alias == 'e':
+            return "e.ubicacion_key = %s", [valor]
+        return "c.id_evento IN (SELECT id FROM evento WHERE ubicacion_key = %s)", [valor]
+    return "TRUE", []
+
+
+def fetch_reporte_vehiculos(cursor, alcance, intervalo):
+    """Reporte completo; cada sección es una consulta agregada."""
+    where_e, params_e = reporte_condiciones(alcance, 'e')
+    where_c, params_c = reporte_condiciones(alcance, 'c')
+
+    cursor.execute(REPORTE_UBICACIONES_SQL.format(where=f"WHERE {where_e}"), params_e)
+    ubicaciones = cursor.fetchall()
+
+    cursor.execute(REPORTE_EVENTOS_SQL.format(where=f"WHERE {where_e}"), params_e)
+    eventos = cursor.fetchall()
+
+    desglose = {}
+    for nombre, columna in (('modelos', 'vehiculo_modelo'), ('colores', 'vehiculo_color')):
+        cursor.execute(
+            REPORTE_DESGLOSE_SQL.format(columna=columna, where=where_c),
+            (*params_c, REPORTE_TOP),
+        )
+        desglose[nombre] = cursor.fetchall()
+
+    cursor.execute(
+        REPORTE_SERIE_SQL.format(where=where_c),
+        (REPORTE_INTERVALOS[intervalo], *params_c),
+    )
+    serie = cursor.fetchall()
+
+    return {
+        'ubicaciones': ubicaciones,
+        'eventos': eventos,
+        'modelos': desglose['modelos'],
+        'colores': desglose['colores'],
+        'serie': serie,
+        'intervalo': intervalo,
+        'capacidad': ESTACIONAMIENTO_CAPACIDAD,
+        'generado_en': datetime.now(),
+    }
+
+
+def get_reporte_vehiculos(alcance, intervalo):
+    """Reporte cacheado REPORTE_CACHE_TTL segundos por alcance e intervalo."""
+    def load():
+        with db_cursor(dictionary=True) as (_, cursor):
+            return fetch_reporte_vehiculos(cursor, alcance, intervalo)
+    return reporte_cache.get(('reporte_vehiculos', alcance, intervalo), load)
+
+
+def parse_intervalo(value):
+    value = (value or '').strip().lower()
+    return value if value in REPORTE_INTERVALOS else 'dia'
+
+
+@app.route('/admin/reporte-vehiculos')
+@admin_required
+def reporte_vehiculos():
+    """Vehículos por ubicación y evento, modelos, colores y registros en el tiempo"""
+    try:
+        intervalo = parse_intervalo(request.args.get('intervalo'))
+        with db_cursor(dictionary=True) as (_, cursor):
+            eventos = fetch_eventos_resumen(cursor)
+        alcance = reporte_alcance(request.args, {e['slug']: e for e in eventos})
+        reporte = get_reporte_vehiculos(alcance, intervalo)
+
+        return render_template('reporte_vehiculos.html',
+                             reporte=reporte,
+                             eventos=eventos,
+                             ubicaciones=list_predefined_locations(),
+                             filtros={
+                                 key: value for key, value in (
+                                     ('evento', (request.args.get('evento') or '').strip()),
+                                     ('ubicacion', alcance[1] if alcance[0] == 'ubicacion' else ''),
+                                     ('intervalo', intervalo),
+                                 ) if value
+                             },
+                             cache_ttl=reporte_cache.ttl)
+
+    except Exception:
+        logger.exception("Error al generar el reporte de vehículos")
+        flash('Error al generar el reporte de vehículos', 'danger')
+        return redirect(url_for('admin_panel'))
+
+
+@app.route('/admin/api/reporte-vehiculos')
+@admin_required
+def api_reporte_vehiculos():
+    """Mismo reporte en JSON (evento, ubicacion, intervalo=hora|dia)"""
+    try:
+        intervalo = parse_intervalo(request.args.get('intervalo'))
+        with db_cursor(dictionary=True) as (_, cursor):
+            eventos = fetch_eventos_resumen(cursor)
+        alcance = reporte_alcance(request.args, {e['slug']: e for e in eventos})
+        reporte = get_reporte_vehiculos(alcance, intervalo)
+
+        payload = dict(reporte)
+        payload['eventos'] = [
+            dict(e, fecha_inicio=e['fecha_inicio'].isoformat() if e['fecha_inicio'] else None,
+                 activo=bool(e['activo']))
+            for e in reporte['eventos']
+        ]
+        payload['generado_en'] = reporte['generado_en'].isoformat(timespec='seconds')
+        return jsonify(dict(payload, ok=True)), 200
+
+    except Exception:
+        logger.exception("Error en api_reporte_vehiculos")
+        return jsonify({'ok': False, 'error': 'Error interno del servidor'}), 500
+
+
+# ============================================================================
+# COMANDOS DE MANTENIMIENTO (flask --app app <comando>)
+# ============================================================================
+
+def reconciliar_contadores(evento_id=None):
+    """Reconstruye evento_contador desde confirmacion_asistencia.
+
+    Devuelve {id_evento: (total, vehiculos)} ya recalculado.
+    """
+    filtro = "WHERE id_evento = %s" if evento_id is not None else ""
+    params = (evento_id,) if evento_id is not None else ()
+    with db_transaction() as (_, cursor):
+        # Primero el DELETE: espera a las transacciones que tengan slots bloqueados,
+        # así el conteo siguiente ya incluye sus filas
+        cursor.execute(f"DELETE FROM evento_contador {filtro}", params)
+        cursor.execute(f"""
+            INSERT INTO evento_contador (id_evento, slot, total_confirmaciones, total_vehiculos)
+            SELECT id_evento, 0, COUNT(*), COALESCE(SUM(trae_vehiculo), 0)
+            FROM confirmacion_asistencia
+            {filtro}
+            GROUP BY id_evento
+        """, params)
+        cursor.execute(f"""
+            SELECT id_evento, total_confirmaciones, total_vehiculos
+            FROM evento_contador
+            {filtro}
+        """, params)
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+@app.cli.command('reconciliar-contadores')
+@click.option('--evento', 'evento_id', type=int, default=None, help='Solo este id de evento')
+def reconciliar_contadores_command(evento_id):
+    """Recalcula los contadores por evento a partir de las confirmaciones."""
+    contadores = reconciliar_contadores(evento_id)
+    for evento, (total, vehiculos) in sorted(contadores.items()):
+        click.echo(f"evento_id={evento} confirmaciones={total} vehiculos={vehiculos}")
+    click.echo(f"✓ Contadores reconciliados ({len(contadores)} eventos)")
+    logger.info("Contadores reconciliados (evento_id=%s eventos=%s)", evento_id, len(contadores))
+
+
+@app.cli.command('limpiar-exportaciones')
+def limpiar_exportaciones_command():
+    """Borra exportaciones más viejas que EXPORT_RETENTION_SECONDS."""
+    removed = export_jobs.cleanup()
+    click.echo(f"✓ Exportaciones limpiadas ({removed} archivos eliminados)")
+
+
 # ============================================================================
 # MANEJO DE ERRORES
 # ============================================================================
@@ -1029,6 +3170,12 @@ def internal_error(e):
     return render_template('no_event.html'), 500
 
 
+def warm_templates():
+    """Compila todas las plantillas (con --preload quedan compartidas entre workers)."""
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+
 # ============================================================================
 # PUNTO DE ENTRADA
 # ============================================================================
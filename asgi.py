@@ -0,0 +1,440 @@
+"""
+ASGI Configuration: rutas públicas con MySQL asíncrono
+Sirve /, /evento/<slug> y /api/confirmacion con aiomysql y un pool asíncrono,
+reutilizando la validación, el SQL, la caché de eventos, la caché de páginas
+y el control de admisión de app.py. El resto (admin, static, assets) sigue
+en la app Flask, montada vía WSGI en un pool de hilos. Respeta APP_PREFIX
+igual que wsgi.py.
+
+Requiere: pip install -r requirements-asgi.txt
+Uso:
+    uvicorn asgi:application --workers 4 --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import quote, urlencode
+
+import aiomysql
+import pymysql
+from a2wsgi import WSGIMiddleware
+from dotenv import load_dotenv
+from flask import render_template
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse, RedirectResponse, Response
+from starlette.routing import Mount, Route
+
+# Cargar variables de entorno
+load_dotenv()
+
+from admision import InFlightLimiter
+from app import (
+    ACTIVE_EVENTO_KEY,
+    ADMISSION_REJECTED,
+    ADMISSION_RETRY_AFTER,
+    DB_COMMIT_SECONDS,
+    DB_CONFIG,
+    DB_ERRORS,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_QUERY_SECONDS,
+    DB_ROLLBACK_SECONDS,
+    EVENTO_ACTIVO_SQL,
+    EVENTO_POR_SLUG_SQL,
+    INCREMENTAR_CONTADOR_SQL,
+    INSERT_CONFIRMACION_SQL,
+    MSG_DEMASIADAS_SOLICITUDES,
+    MSG_SATURADO,
+    app,
+    client_ip_from,
+    confirmacion_params,
+    contador_params,
+    evento_cache,
+    evento_form_response,
+    ip_buckets,
+    logger,
+    metrics,
+    metrics_store,
+)
+from compresion import CompressionMiddleware, compression_from_env, compression_settings
+from pool_conexiones import PoolTimeout
+from validacion import validate_confirmacion, validation_error_payload
+
+APP_PREFIX = os.getenv('APP_PREFIX', '').strip().strip('/')
+
+ASYNC_DB_POOL_MIN = int(os.getenv('ASYNC_DB_POOL_MIN', 1))
+ASYNC_DB_POOL_MAX = int(os.getenv('ASYNC_DB_POOL_MAX', 20))
+ASYNC_DB_POOL_TIMEOUT = float(os.getenv('ASYNC_DB_POOL_TIMEOUT', os.getenv('DB_POOL_TIMEOUT', 10)))
+# Requests en curso por worker en /api/confirmacion (0 = sin tope). Con un
+# event loop no se espera turno: bloquearía el loop, así que se rechaza con 503
+ASGI_MAX_IN_FLIGHT = int(os.getenv('ASGI_MAX_IN_FLIGHT', 100))
+
+# Errores de cliente MySQL tras los que la conexión no debe volver al pool
+CONNECTION_ERRORS = (2003, 2006, 2013, 2055)
+
+in_flight = InFlightLimiter(ASGI_MAX_IN_FLIGHT) if ASGI_MAX_IN_FLIGHT > 0 else None
+async_pool = None
+_pool_lock = asyncio.Lock()
+
+metrics.callback(
+    'async_db_pool_size', 'Conexiones abiertas en el pool asíncrono (asgi.py)', 'gauge',
+    lambda: async_pool.size if async_pool is not None else 0,
+)
+metrics.callback(
+    'async_db_pool_free', 'Conexiones libres en el pool asíncrono (asgi.py)', 'gauge',
+    lambda: async_pool.freesize if async_pool is not None else 0,
+)
+
+
+# ============================================================================
+# POOL ASÍNCRONO (aiomysql)
+# ============================================================================
+
+async def init_async_pool():
+    """Crea el pool del worker la primera vez (si MySQL no responde, reintenta en la siguiente)."""
+    global async_pool
+    if async_pool is not None:
+        return async_pool
+    async with _pool_lock:
+        if async_pool is None:
+            async_pool = await aiomysql.create_pool(
+                minsize=ASYNC_DB_POOL_MIN,
+                maxsize=ASYNC_DB_POOL_MAX,
+                pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+                host=DB_CONFIG['host'],
+                port=DB_CONFIG['port'],
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password'],
+                db=DB_CONFIG['database'],
+                charset=DB_CONFIG['charset'],
+                autocommit=DB_CONFIG['autocommit'],
+                init_command=f"SET NAMES {DB_CONFIG['charset']} COLLATE {DB_CONFIG['collation']}",
+            )
+            logger.info(
+                "Pool MySQL asíncrono listo (min=%s max=%s host=%s db=%s)",
+                ASYNC_DB_POOL_MIN, ASYNC_DB_POOL_MAX, DB_CONFIG['host'], DB_CONFIG['database'],
+            )
+    return async_pool
+
+
+@asynccontextmanager
+async def async_db_conn():
+    """Conexión del pool asíncrono; PoolTimeout si no se libera ninguna a tiempo."""
+    pool = await init_async_pool()
+    start = time.perf_counter()
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), ASYNC_DB_POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise PoolTimeout(f"Sin conexión libre en {ASYNC_DB_POOL_TIMEOUT}s (pool asíncrono)") from None
+    finally:
+        DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+    try:
+        yield conn
+    except pymysql.err.MySQLError as e:
+        if e.args and e.args[0] in CONNECTION_ERRORS:
+            conn.close()
+        raise
+    finally:
+        # Una conexión cerrada o con transacción abierta no vuelve a la lista libre
+        pool.release(conn)
+
+
+async def timed_execute(cursor, route, sql, params=None):
+    start = time.perf_counter()
+    try:
+        return await cursor.execute(sql, params)
+    except pymysql.err.MySQLError as e:
+        DB_ERRORS.inc(errno=e.args[0] if e.args else 'unknown')
+        raise
+    finally:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - start, route=route)
+
+
+async def fetch_evento(key, sql, params, route):
+    """Como get_evento_activo(_por_slug) de app.py, con la misma caché y lectura asíncrona.
+
+    Siempre lee del primario: la réplica de lectura (y su control de retraso)
+    solo se usa desde el camino WSGI.
+    """
+    found, evento, version = evento_cache.lookup(key)
+    if found:
+        return evento
+    async with async_db_conn() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await timed_execute(cursor, route, sql, params)
+            rows = await cursor.fetchall()
+    evento = rows[0] if rows else None
+    evento_cache.store(key, evento, version)
+    return evento
+
+
+async def registrar_confirmacion(params):
+    """INSERT de la confirmación y su contador en una transacción; devuelve su id."""
+    async with async_db_conn() as conn:
+        await conn.begin()
+        try:
+            async with conn.cursor() as cursor:
+                await timed_execute(cursor, 'api_confirmacion', INSERT_CONFIRMACION_SQL, params)
+                confirmacion_id = cursor.lastrowid
+                for contador in contador_params((params,)):
+                    await timed_execute(cursor, 'api_confirmacion', INCREMENTAR_CONTADOR_SQL, contador)
+            start = time.perf_counter()
+            try:
+                await conn.commit()
+            finally:
+                DB_COMMIT_SECONDS.observe(time.perf_counter() - start)
+        except BaseException:
+            start = time.perf_counter()
+            try:
+                await conn.rollback()
+            except Exception:
+                logger.exception("Error al hacer rollback (asgi)")
+            finally:
+                DB_ROLLBACK_SECONDS.observe(time.perf_counter() - start)
+            raise
+    return confirmacion_id
+
+
+# ============================================================================
+# PUENTE CON FLASK (plantillas, caché de páginas, compresión)
+# ============================================================================
+
+COMPRESSION = compression_settings()
+
+
+def route_path(request):
+    """Ruta relativa al punto de montaje (equivale a PATH_INFO de WSGI)."""
+    path, root_path = request.scope['path'], request.scope.get('root_path', '')
+    return path[len(root_path):] if path.startswith(root_path) else path
+
+
+async def flask_response(request, build):
+    """Ejecuta `build()` en un contexto de request de Flask y convierte su respuesta.
+
+    Así el HTML sale de las mismas funciones que en WSGI (render_template,
+    url_for, caché de páginas con ETag/304) y pasa por la misma compresión.
+    Corre en el pool de hilos: un render sin caché o una pasada de brotli
+    frenarían todas las conexiones del worker si ocuparan el event loop.
+    """
+    return await run_in_threadpool(build_flask_response, request, build)
+
+
+def build_flask_response(request, build):
+    with app.test_request_context(
+        route_path(request),
+        base_url=f"{request.url.scheme}://{request.url.netloc}{request.scope.get('root_path', '')}",
+        method=request.method,
+        query_string=request.scope.get('query_string', b''),
+        headers=[(k, v) for k, v in request.headers.items() if k != 'host'],
+        environ_base={'REMOTE_ADDR': request.client.host if request.client else ''},
+    ) as ctx:
+        response = app.process_response(app.make_response(build()))
+        environ = ctx.request.environ
+
+    captured = {}
+
+    def start_response(status, headers, exc_info=None):
+        captured['status'] = int(status.split(' ', 1)[0])
+        captured['headers'] = headers
+
+    wsgi_app = response if COMPRESSION is None else CompressionMiddleware(response, **COMPRESSION)
+    app_iter = wsgi_app(environ, start_response)
+    try:
+        body = b''.join(app_iter)
+    finally:
+        close = getattr(app_iter, 'close', None)
+        if close is not None:
+            close()
+
+    result = Response(body, status_code=captured['status'])
+    raw_headers = [
+        (name.lower().encode('latin-1'), value.encode('latin-1'))
+        for name, value in captured['headers']
+        if name.lower() != 'content-length'
+    ]
+    if body or captured['status'] not in (204, 304):
+        raw_headers.append((b'content-length', str(len(body)).encode('latin-1')))
+    result.raw_headers = raw_headers
+    return result
+
+
+def flush_metrics():
+    try:
+        metrics_store.maybe_flush()
+    except Exception:
+        logger.exception("Error al volcar métricas")
+
+
+def overload_response(status, message, retry_after):
+    """Igual que overload_response de app.py (Retry-After para el navegador)."""
+    return JSONResponse(
+        {'ok': False, 'error': message},
+        status_code=status,
+        headers={'Retry-After': str(max(1, math.ceil(retry_after)))},
+    )
+
+
+# ============================================================================
+# RUTAS PÚBLICAS (async)
+# ============================================================================
+
+async def index(request):
+    """Página principal - redirige al evento activo más reciente"""
+    try:
+        evento = await fetch_evento(ACTIVE_EVENTO_KEY, EVENTO_ACTIVO_SQL, None, 'index')
+    except Exception:
+        logger.exception("Error en index (asgi)")
+        evento = None
+    flush_metrics()
+    if evento:
+        root_path = request.scope.get('root_path', '')
+        return RedirectResponse(f"{root_path}/evento/{quote(evento['slug'])}", status_code=302)
+    return await flask_response(request, lambda: render_template('no_event.html'))
+
+
+async def evento_form(request):
+    """Formulario de confirmación para un evento específico"""
+    slug = request.path_params['slug']
+    try:
+        evento = await fetch_evento(('slug', slug), EVENTO_POR_SLUG_SQL, (slug,), 'evento_form')
+    except Exception:
+        logger.exception("Error al cargar formulario de evento (slug=%s, asgi)", slug)
+        return await flask_response(request, lambda: (render_template('no_event.html'), 500))
+    return await flask_response(request, lambda: evento_form_response(slug, evento))
+
+
+async def read_confirmacion_data(request):
+    """Datos del formulario (JSON o form-data); None si no se pueden leer."""
+    content_type = request.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+    if content_type == 'application/json' or content_type.endswith('+json'):
+        try:
+            return await request.json()
+        except ValueError:
+            return None
+    form = await request.form()
+    data = {}
+    for key, value in form.multi_items():
+        # Como request.form.to_dict() de Flask: el primer valor de cada campo
+        data.setdefault(key, value)
+    return data
+
+
+async def api_confirmacion(request):
+    """Endpoint para registrar confirmación de asistencia"""
+    if in_flight is not None and not in_flight.acquire():
+        ADMISSION_REJECTED.inc(reason='in_flight')
+        return overload_response(503, MSG_SATURADO, ADMISSION_RETRY_AFTER)
+    try:
+        remote_addr = request.client.host if request.client else None
+        if ip_buckets is not None:
+            # fcntl + mmap: puede esperar el lock de otro worker, fuera del loop
+            allowed, wait = await run_in_threadpool(
+                ip_buckets.consume,
+                client_ip_from(request.headers.get('x-forwarded-for'), remote_addr),
+            )
+            if not allowed:
+                ADMISSION_REJECTED.inc(reason='rate_limit')
+                return overload_response(429, MSG_DEMASIADAS_SOLICITUDES, wait)
+        return await registrar(request, remote_addr)
+    except Exception:
+        logger.exception("Error en api_confirmacion (asgi)")
+        return JSONResponse({'ok': False, 'error': 'Error interno del servidor'}, status_code=500)
+    finally:
+        if in_flight is not None:
+            in_flight.release()
+        flush_metrics()
+
+
+async def registrar(request, remote_addr):
+    data = await read_confirmacion_data(request)
+    if not isinstance(data, dict):
+        return JSONResponse({'ok': False, 'error': 'Datos inválidos'}, status_code=400)
+
+    values, errors = validate_confirmacion(data)
+    if errors:
+        return JSONResponse(validation_error_payload(errors), status_code=400)
+
+    id_evento = values['id_evento']
+    ip_address = request.headers.get('x-forwarded-for', remote_addr)
+    user_agent = request.headers.get('user-agent', '')
+
+    try:
+        confirmacion_id = await registrar_confirmacion(
+            confirmacion_params(values, ip_address, user_agent)
+        )
+    except PoolTimeout:
+        ADMISSION_REJECTED.inc(reason='db_timeout')
+        logger.warning("Confirmación rechazada por saturación de la BD (evento_id=%s, asgi)", id_evento)
+        return overload_response(503, MSG_SATURADO, ADMISSION_RETRY_AFTER)
+    except pymysql.err.MySQLError as e:
+        if e.args and e.args[0] == 1062:  # Duplicate entry
+            logger.info("Confirmación duplicada (evento_id=%s ip=%s)", id_evento, ip_address)
+            return JSONResponse({
+                'ok': False,
+                'error': 'Esta persona ya tiene una confirmación registrada para este evento'
+            }, status_code=409)
+        logger.exception("Error MySQL al insertar confirmación (evento_id=%s ip=%s, asgi)", id_evento, ip_address)
+        return JSONResponse({
+            'ok': False,
+            'error': 'Error al registrar la confirmación. Por favor intente nuevamente.'
+        }, status_code=500)
+
+    # Evitar PII en logs: registrar IDs y metadatos operativos
+    logger.info(
+        "Confirmación registrada (confirmacion_id=%s evento_id=%s trae_vehiculo=%s ip=%s)",
+        confirmacion_id, id_evento, values['trae_vehiculo'], ip_address,
+    )
+    root_path = request.scope.get('root_path', '')
+    return JSONResponse({
+        'ok': True,
+        'redirect': f"{root_path}/success?{urlencode({'conf_id': confirmacion_id})}"
+    })
+
+
+# ============================================================================
+# APLICACIÓN
+# ============================================================================
+
+@asynccontextmanager
+async def lifespan(_starlette_app):
+    try:
+        # Detectar credenciales/host incorrectos al arrancar (si falla, se reintenta por request)
+        await init_async_pool()
+    except Exception:
+        logger.exception("Error al conectar con MySQL (pool asíncrono, host=%s)", DB_CONFIG['host'])
+    yield
+    if async_pool is not None:
+        async_pool.close()
+        await async_pool.wait_closed()
+
+
+# Admin, static, assets, /success: Flask en hilos (misma compresión que wsgi.py)
+flask_wsgi = WSGIMiddleware(compression_from_env(app))
+
+public_routes = [
+    Route('/', index, name='index'),
+    Route('/evento/{slug}', evento_form, name='evento_form'),
+    Route('/api/confirmacion', api_confirmacion, methods=['POST'], name='api_confirmacion'),
+    Mount('', app=flask_wsgi),
+]
+
+
+async def simple_app(scope, receive, send):
+    """Aplicación simple para la raíz cuando se usa prefijo"""
+    response = PlainTextResponse(
+        'Sistema de Confirmación FES Aragón. '
+        f'La aplicación está montada en: /{APP_PREFIX}'
+    )
+    await response(scope, receive, send)
+
+
+if APP_PREFIX:
+    routes = [Mount(f'/{APP_PREFIX}', routes=public_routes), Mount('', app=simple_app)]
+    print(f"✓ Aplicación ASGI montada en subruta: /{APP_PREFIX}")
+else:
+    routes = public_routes
+    print("✓ Aplicación ASGI montada en la raíz: /")
+
+application = Starlette(routes=routes, lifespan=lifespan)
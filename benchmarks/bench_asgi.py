@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Concurrencia y memoria por conexión: Gunicorn (wsgi.py) vs Uvicorn (asgi.py)
+Abre N conexiones keep-alive simultáneas contra un servidor ya levantado y
+mide requests/s, latencias y la memoria (RSS) de sus procesos: en reposo y
+con las N conexiones activas. No levanta los servidores; por ejemplo:
+
+    gunicorn wsgi:application -w 4 --threads 8 -k gthread -b 127.0.0.1:5000
+    uvicorn asgi:application --workers 4 --host 127.0.0.1 --port 5001
+
+    python benchmarks/bench_asgi.py --url http://127.0.0.1:5000/evento/mi-evento \\
+        --pids $(pgrep -d, -f 'gunicorn wsgi') --concurrencia 10,100,500
+    python benchmarks/bench_asgi.py --url http://127.0.0.1:5001/evento/mi-evento \\
+        --pids $(pgrep -d, -f 'uvicorn asgi') --concurrencia 10,100,500
+
+Para /api/confirmacion usar --json con {n} (se reemplaza por un contador,
+para no chocar con el UNIQUE) y un evento de prueba; los 429/503 del control
+de admisión se cuentan aparte (subir ADMISSION_IP_RATE/BURST para la prueba).
+
+Uso:
+    python benchmarks/bench_asgi.py --url URL --pids PID[,PID...] [--concurrencia 10,100]
+                                    [--duracion 10] [--json '{"nombre_completo": "P {n}", ...}']
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from urllib.parse import urlsplit
+
+
+def rss_kb(pids):
+    """RSS total (KB) de los procesos y sus hijos (workers) según /proc."""
+    seen = set()
+    pending = list(pids)
+    total = 0
+    while pending:
+        pid = pending.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        try:
+            with open(f'/proc/{pid}/status') as fh:
+                for line in fh:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+            with open(f'/proc/{pid}/task/{pid}/children') as fh:
+                pending.extend(int(child) for child in fh.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+
+async def read_response(reader):
+    """Lee una respuesta HTTP/1.1 completa; devuelve (status, headers en minúsculas, cuerpo)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('conexión cerrada por el servidor')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = b''
+    if 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            chunks.append((await reader.readexactly(size + 2))[:-2])
+            if size == 0:
+                break
+        body = b''.join(chunks)
+    return status, headers, body
+
+
+def keeps_alive(headers):
+    return headers.get('connection', '').lower() != 'close'
+
+
+class Client:
+    """Una conexión keep-alive que repite la misma request hasta `deadline`."""
+
+    def __init__(self, url, body_template, counter):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.target = parts.path + (f'?{parts.query}' if parts.query else '')
+        self.body_template = body_template
+        self.counter = counter
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def request(self):
+        lines = [f'{"POST" if self.body_template else "GET"} {self.target} HTTP/1.1',
+                 f'Host: {self.host}:{self.port}', 'Accept-Encoding: gzip']
+        body = b''
+        if self.body_template:
+            body = self.body_template.replace('{n}', str(next(self.counter))).encode('utf-8')
+            lines += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+    async def run(self, deadline, connected):
+        writer = None
+        released = False
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            connected.release()
+            released = True
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                writer.write(self.request())
+                await writer.drain()
+                status, headers, _ = await read_response(reader)
+                self.latencies.append(time.perf_counter() - start)
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                if not keeps_alive(headers):
+                    writer.close()
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            self.errors += 1
+            if not released:
+                connected.release()
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+async def run_level(args, concurrencia, counter):
+    # Todas las conexiones abren primero; la memoria se mide con ellas activas
+    connected = asyncio.Semaphore(0)
+    deadline = time.perf_counter() + args.duracion
+    clients = [Client(args.url, args.json, counter) for _ in range(concurrencia)]
+    idle = rss_kb(args.pids)
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(c.run(deadline, connected)) for c in clients]
+    for _ in range(concurrencia):
+        await connected.acquire()
+    peak = idle
+    while not all(t.done() for t in tasks):
+        peak = max(peak, rss_kb(args.pids))
+        await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(itertools.chain.from_iterable(c.latencies for c in clients))
+    statuses = {}
+    for c in clients:
+        for status, count in c.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        'concurrencia': concurrencia,
+        'req_s': len(latencies) / elapsed,
+        'p50': pct(0.50),
+        'p99': pct(0.99),
+        'ok': sum(n for s, n in statuses.items() if s < 400 or s == 409),
+        'rechazos': statuses.get(429, 0) + statuses.get(503, 0),
+        'errores': sum(c.errors for c in clients) + sum(n for s, n in statuses.items() if s >= 500 and s != 503),
+        'rss_mb': peak / 1024,
+        'kb_conexion': (peak - idle) / concurrencia,
+    }
+
+
+async def main_async(args):
+    counter = itertools.count(int(time.time()))
+    results = []
+    for concurrencia in args.concurrencia:
+        results.append(await run_level(args, concurrencia, counter))
+        # Dejar que el servidor cierre las conexiones antes del siguiente nivel
+        await asyncio.sleep(1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--pids', required=True, type=lambda v: [int(p) for p in v.split(',') if p],
+                        help='PIDs del servidor (maestro y/o workers; se suman los hijos)')
+    parser.add_argument('--concurrencia', default='10,100', type=lambda v: [int(c) for c in v.split(',')])
+    parser.add_argument('--duracion', type=float, default=10, help='Segundos por nivel de concurrencia')
+    parser.add_argument('--json', help='Cuerpo JSON para POST; {n} se reemplaza por un contador')
+    args = parser.parse_args()
+
+    if not all(os.path.exists(f'/proc/{pid}') for pid in args.pids):
+        parser.error('algún PID no existe (la memoria se lee de /proc, solo Linux)')
+
+    results = asyncio.run(main_async(args))
+    print(f"{'Conexiones':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'ok':>8}"
+          f"{'429/503':>9}{'errores':>9}{'RSS MB':>9}{'KB/conexión':>13}")
+    for r in results:
+        print(f"{r['concurrencia']:>10}{r['req_s']:>10.0f}{r['p50']:>10.2f}{r['p99']:>10.2f}{r['ok']:>8}"
+              f"{r['rechazos']:>9}{r['errores']:>9}{r['rss_mb']:>9.1f}{r['kb_conexion']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Latencia de la búsqueda del admin (/admin/api/buscar) con muchas filas
+Requiere una base MySQL configurada en .env con la migración 006 aplicada.
+Crea un evento temporal, le carga --filas confirmaciones sintéticas (nombres
+con acentos, dependencias, correos y placas variados), mide cada búsqueda
+--repeticiones veces contra el primario y elimina el evento al terminar
+(ON DELETE CASCADE). El objetivo es p95 < --objetivo-ms en 200k filas.
+
+Uso:
+    python benchmarks/bench_busqueda.py [--filas 200000] [--repeticiones 20]
+        [--objetivo-ms 50] [--evento-id ID]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+NOMBRES = ('José', 'María', 'Ángel', 'Sofía', 'Raúl', 'Inés', 'Jesús', 'Lucía', 'Andrés', 'Verónica',
+           'Carlos', 'Fernanda', 'Óscar', 'Mónica', 'Martín', 'Begoña')
+APELLIDOS = ('Hernández', 'López', 'Martínez', 'González', 'Pérez', 'Sánchez', 'Ramírez', 'Díaz',
+             'Gómez', 'Muñoz', 'Jiménez', 'Ruiz', 'Álvarez', 'Núñez', 'Domínguez', 'Vázquez')
+DEPENDENCIAS = ('Dirección General de Cómputo', 'Facultad de Estudios Superiores Aragón',
+                'Secretaría Administrativa', 'Coordinación de Humanidades', 'Instituto de Ingeniería',
+                'Facultad de Química', 'Dirección General de Bibliotecas', 'Unidad de Posgrado')
+
+# (descripción, término): nombres sin acentos, prefijos, dependencia, correo y placas
+BUSQUEDAS = (
+    ('nombre sin acento', 'jose hernandez'),
+    ('prefijo de apellido', 'hern'),
+    ('nombre y apellido parcial', 'mar lop'),
+    ('dependencia', 'computo'),
+    ('correo (prefijo)', 'persona12345'),
+    ('correo exacto', 'persona777@unam.mx'),
+    ('placas con guion', 'abc-123'),
+    ('placas (prefijo)', 'XYZ9'),
+    ('sin resultados', 'zzzqqq'),
+)
+
+
+def crear_evento_temporal():
+    slug = f'bench-busqueda-{os.getpid()}-{int(time.time())}'
+    ubicacion = app.PREDEFINED_LOCATIONS['teatro-jose-vasconcelos']
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("""
+            INSERT INTO evento (slug, titulo, lugar, ubicacion_key, ubicacion_nombre,
+                                ubicacion_lat, ubicacion_lng, activo)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, FALSE)
+        """, (
+            slug, 'Benchmark búsqueda', ubicacion['nombre'], 'teatro-jose-vasconcelos',
+            ubicacion['nombre'], ubicacion['lat'], ubicacion['lng'],
+        ))
+        return cursor.lastrowid
+
+
+def cargar_filas(evento_id, filas, lote=1000):
+    rnd = random.Random(42)
+    start = time.perf_counter()
+    for inicio in range(0, filas, lote):
+        params = []
+        for i in range(inicio, min(inicio + lote, filas)):
+            trae = i % 3 == 0
+            placas = f"{rnd.choice(('ABC', 'XYZ', 'MEX', 'PUE'))}{i % 10000:04d}" if trae else None
+            params.append((
+                evento_id, rnd.choice(DEPENDENCIAS), 'Puesto', 'Lic.',
+                # El índice hace único cada nombre (UNIQUE por evento, nombre y dependencia)
+                f'{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)} {i}',
+                f'persona{i}@unam.mx', trae, 'Modelo' if trae else None, 'Gris' if trae else None,
+                placas, '127.0.0.1', 'bench_busqueda',
+            ))
+        with app.db_transaction() as (_, cursor):
+            app.insert_confirmaciones_chunk(cursor, params)
+        print(f"\r  {min(inicio + lote, filas):,}/{filas:,} filas", end='', flush=True)
+    print(f"  ({time.perf_counter() - start:.1f} s)")
+
+
+def eliminar_evento(evento_id):
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("DELETE FROM evento WHERE id = %s", (evento_id,))
+
+
+def medir(termino, repeticiones, page_size):
+    tiempos = []
+    resultados = 0
+    with app.db_cursor(dictionary=True, primary=True) as (_, cursor):
+        for _ in range(repeticiones):
+            start = time.perf_counter()
+            rows, _ = app.buscar_confirmaciones(cursor, termino, {}, page_size)
+            tiempos.append((time.perf_counter() - start) * 1000)
+            resultados = len(rows)
+    tiempos.sort()
+    return {
+        'p50': tiempos[len(tiempos) // 2],
+        'p95': tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+        'max': tiempos[-1],
+        'resultados': resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=200000)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--objetivo-ms', type=float, default=50)
+    parser.add_argument('--por-pagina', type=int, default=app.ADMIN_PAGE_SIZE)
+    parser.add_argument('--evento-id', type=int, help='Usar las filas ya cargadas de este evento (no carga ni borra)')
+    args = parser.parse_args()
+
+    evento_id = args.evento_id or crear_evento_temporal()
+    try:
+        if args.evento_id is None:
+            print(f"Cargando {args.filas:,} filas en el evento temporal {evento_id}")
+            cargar_filas(evento_id, args.filas)
+
+        print(f"\n{'Búsqueda':<28}{'término':<22}{'filas':>7}{'p50 ms':>10}{'p95 ms':>10}{'máx ms':>10}")
+        lentas = 0
+        for descripcion, termino in BUSQUEDAS:
+            r = medir(termino, args.repeticiones, args.por_pagina)
+            marca = ''
+            if r['p95'] > args.objetivo_ms:
+                lentas += 1
+                marca = '  ⚠️'
+            print(f"{descripcion:<28}{termino:<22}{r['resultados']:>7}{r['p50']:>10.2f}"
+                  f"{r['p95']:>10.2f}{r['max']:>10.2f}{marca}")
+        print(f"\n{lentas} búsqueda(s) con p95 sobre {args.objetivo_ms:.0f} ms")
+    finally:
+        if args.evento_id is None:
+            eliminar_evento(evento_id)
+
+
+if __name__ == '__main__':
+    main()
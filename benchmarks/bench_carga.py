@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de un pico de registros con reporte de latencias por ruta
+Lanza usuarios virtuales contra un servidor ya levantado (Gunicorn o Uvicorn)
+con una mezcla realista de tráfico público, más administradores consultando
+listados al mismo tiempo:
+
+- GET /evento/<slug> (formulario)
+- POST /api/confirmacion: nuevas, duplicadas (409) e inválidas (400)
+- GET /admin/todas-confirmaciones y /admin/api/confirmaciones (con sesión)
+
+Cada usuario usa su propia conexión keep-alive; cada request pública lleva
+una IP distinta en X-Forwarded-For (en un pico real cada registro viene de
+otra persona), así que el límite por IP del servidor casi no interviene y
+los 429/503 reflejan saturación. Sin proxy delante, el servidor debe correr
+con ADMISSION_TRUSTED_PROXIES=1 para tomar esas IPs. Reporta requests/s,
+p50/p95/p99 por ruta y rechazos 429/503 del control de admisión, escribe el
+resultado en JSON y, con --baseline, termina con código 1 si alguna ruta
+empeora más que --umbral respecto al resultado guardado.
+
+Requiere la base MySQL de .env (la misma del servidor): crea un evento activo
+temporal y lo elimina al terminar (ON DELETE CASCADE), salvo que se pase
+--slug y --evento-id de uno existente. El admin usa ADMIN_USER/ADMIN_PASSWORD.
+
+Uso:
+    python benchmarks/bench_carga.py --url http://127.0.0.1:5000 [--usuarios 50] [--admins 2]
+        [--duracion 30] [--rampa 5] [--mezcla formulario=70,nueva=20,duplicada=5,invalida=5]
+        [--salida resultado.json] [--baseline baseline.json --umbral 0.15]
+        [--guardar-baseline baseline.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_asgi import keeps_alive, read_response  # noqa: E402
+
+# Respuesta esperada por ruta; 429/503 cuentan como rechazos y lo demás como error
+RUTAS = {
+    'formulario': ('GET /evento/<slug>', 200),
+    'nueva': ('POST /api/confirmacion (nueva)', 200),
+    'duplicada': ('POST /api/confirmacion (duplicada)', 409),
+    'invalida': ('POST /api/confirmacion (inválida)', 400),
+    'admin_listado': ('GET /admin/todas-confirmaciones', 200),
+    'admin_api': ('GET /admin/api/confirmaciones', 200),
+}
+RECHAZOS = (429, 503)
+
+MEZCLA_DEFAULT = 'formulario=70,nueva=20,duplicada=5,invalida=5'
+
+# Payloads que la validación rechaza (uno al azar por request)
+INVALIDAS = (
+    {'email': 'no-es-correo'},
+    {'grado': 'Capitán'},
+    {'trae_vehiculo': 'si', 'vehiculo_modelo': '', 'vehiculo_placas': ''},
+    {'nombre_completo': ''},
+)
+
+
+def crear_evento_temporal():
+    import app
+
+    slug = f'carga-{os.getpid()}-{int(time.time())}'
+    ubicacion = app.PREDEFINED_LOCATIONS['teatro-jose-vasconcelos']
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("""
+            INSERT INTO evento (slug, titulo, lugar, ubicacion_key, ubicacion_nombre,
+                                ubicacion_lat, ubicacion_lng, activo)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE)
+        """, (
+            slug, 'Prueba de carga', ubicacion['nombre'], 'teatro-jose-vasconcelos',
+            ubicacion['nombre'], ubicacion['lat'], ubicacion['lng'],
+        ))
+        evento_id = cursor.lastrowid
+    app.invalidate_evento_cache()
+    return evento_id, slug
+
+
+def eliminar_evento(evento_id):
+    import app
+
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("DELETE FROM evento WHERE id = %s", (evento_id,))
+    app.invalidate_evento_cache()
+
+
+class Conexion:
+    """Conexión keep-alive con una IP de cliente fija y, opcionalmente, cookie de sesión."""
+
+    def __init__(self, base_url, ip=None):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.ip = ip
+        self.cookie = None
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, content_type=None, ip=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'{method} {self.prefix}{path} HTTP/1.1', f'Host: {self.host}:{self.port}',
+                 f'X-Forwarded-For: {ip or self.ip}', 'Accept-Encoding: gzip']
+        if self.cookie:
+            lines.append(f'Cookie: {self.cookie}')
+        body = body or b''
+        if method == 'POST':
+            lines += [f'Content-Type: {content_type}', f'Content-Length: {len(body)}']
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+        status, headers, payload = await read_response(self.reader)
+        if 'set-cookie' in headers:
+            self.cookie = headers['set-cookie'].split(';', 1)[0]
+        if not keeps_alive(headers):
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Resultados:
+    def __init__(self):
+        self.latencias = {ruta: [] for ruta in RUTAS}
+        self.estados = {ruta: {} for ruta in RUTAS}
+        self.fallas_red = {ruta: 0 for ruta in RUTAS}
+
+    def registrar(self, ruta, status, elapsed):
+        self.latencias[ruta].append(elapsed)
+        self.estados[ruta][status] = self.estados[ruta].get(status, 0) + 1
+
+    def resumen(self, duracion):
+        rutas = {}
+        for ruta, (nombre, esperado) in RUTAS.items():
+            latencias = sorted(self.latencias[ruta])
+            estados = self.estados[ruta]
+            total = len(latencias) + self.fallas_red[ruta]
+            if not total:
+                continue
+            ok = estados.get(esperado, 0)
+            rechazos = sum(estados.get(s, 0) for s in RECHAZOS)
+            rutas[ruta] = {
+                'nombre': nombre,
+                'requests': total,
+                'req_s': round(total / duracion, 2),
+                'ok': ok,
+                'rechazos': rechazos,
+                'errores': total - ok - rechazos,
+                'tasa_error': round((total - ok - rechazos) / total, 4),
+                'p50_ms': percentil(latencias, 0.50),
+                'p95_ms': percentil(latencias, 0.95),
+                'p99_ms': percentil(latencias, 0.99),
+                'max_ms': round(latencias[-1] * 1000, 2) if latencias else None,
+                'estados': {str(s): n for s, n in sorted(estados.items())},
+            }
+        todas = sorted(itertools.chain.from_iterable(self.latencias.values()))
+        total = sum(r['requests'] for r in rutas.values())
+        return rutas, {
+            'requests': total,
+            'req_s': round(total / duracion, 2),
+            'confirmaciones_s': round(rutas.get('nueva', {}).get('ok', 0) / duracion, 2),
+            'p50_ms': percentil(todas, 0.50),
+            'p95_ms': percentil(todas, 0.95),
+            'p99_ms': percentil(todas, 0.99),
+            'rechazos': sum(r['rechazos'] for r in rutas.values()),
+            'errores': sum(r['errores'] for r in rutas.values()),
+        }
+
+
+def percentil(ordenadas, p):
+    if not ordenadas:
+        return None
+    return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] * 1000, 2)
+
+
+class Escenario:
+    """Estado compartido por los usuarios virtuales de una corrida."""
+
+    def __init__(self, args, evento_id, slug):
+        self.args = args
+        self.evento_id = evento_id
+        self.slug = slug
+        self.resultados = Resultados()
+        self.secuencia = itertools.count()
+        self.ips = itertools.count(1)
+        self.etiqueta = f'{os.getpid()}-{int(time.time())}'
+        # Confirmaciones aceptadas: la mezcla "duplicada" reenvía una de ellas
+        self.aceptadas = []
+        rutas, pesos = zip(*args.mezcla.items())
+        self.rutas_publicas = rutas
+        self.pesos = pesos
+
+    def payload_nuevo(self):
+        n = next(self.secuencia)
+        return {
+            'id_evento': self.evento_id,
+            'dependencia': 'Dependencia de prueba',
+            'puesto': 'Puesto',
+            'grado': 'Lic.',
+            'nombre_completo': f'Persona {self.etiqueta} {n}',
+            'email': f'persona{n}@example.com',
+            'trae_vehiculo': 'si' if n % 4 == 0 else 'no',
+            'vehiculo_modelo': 'Sedán',
+            'vehiculo_color': 'Gris',
+            'vehiculo_placas': f'ABC{n % 1000:03d}',
+        }
+
+    def ip_nueva(self):
+        n = next(self.ips) % (1 << 24)
+        return f'10.{n >> 16}.{(n >> 8) & 255}.{n & 255}'
+
+    async def ejecutar(self, conexion, ruta):
+        if ruta == 'formulario':
+            return await conexion.request('GET', f'/evento/{self.slug}', ip=self.ip_nueva())
+        if ruta == 'admin_listado':
+            return await conexion.request('GET', f"/admin/todas-confirmaciones?{urlencode({'evento': self.slug})}")
+        if ruta == 'admin_api':
+            return await conexion.request('GET', f"/admin/api/confirmaciones?{urlencode({'evento': self.slug})}")
+
+        if ruta == 'duplicada' and self.aceptadas:
+            payload = random.choice(self.aceptadas)
+        elif ruta == 'invalida':
+            payload = dict(self.payload_nuevo(), **random.choice(INVALIDAS))
+        else:
+            payload = self.payload_nuevo()
+        body = json.dumps(payload).encode('utf-8')
+        status, respuesta = await conexion.request(
+            'POST', '/api/confirmacion', body, 'application/json', ip=self.ip_nueva()
+        )
+        if status == 200 and ruta != 'invalida':
+            self.aceptadas.append(payload)
+        return status, respuesta
+
+    async def usuario(self, n, fin, admin=False):
+        # Los admins conservan su IP (192.168.x.y); las requests públicas usan ip_nueva()
+        conexion = Conexion(self.args.url, f'192.168.{(n >> 8) & 255}.{n & 255}')
+        if admin:
+            await self.login(conexion)
+        try:
+            while time.perf_counter() < fin:
+                if admin:
+                    ruta = random.choice(('admin_listado', 'admin_api'))
+                else:
+                    ruta = random.choices(self.rutas_publicas, self.pesos)[0]
+                if ruta == 'duplicada' and not self.aceptadas:
+                    # Todavía no hay nada que duplicar: cuenta como nueva
+                    ruta = 'nueva'
+                inicio = time.perf_counter()
+                try:
+                    status, _ = await self.ejecutar(conexion, ruta)
+                except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    self.resultados.fallas_red[ruta] += 1
+                    conexion.close()
+                    continue
+                self.resultados.registrar(ruta, status, time.perf_counter() - inicio)
+                if self.args.pausa_ms:
+                    await asyncio.sleep(self.args.pausa_ms / 1000 * random.uniform(0.5, 1.5))
+        finally:
+            conexion.close()
+
+    async def login(self, conexion):
+        body = urlencode({
+            'username': os.getenv('ADMIN_USER', 'admin'),
+            'password': os.getenv('ADMIN_PASSWORD', 'admin'),
+        }).encode('utf-8')
+        status, _ = await conexion.request('POST', '/admin/login', body, 'application/x-www-form-urlencoded')
+        if status != 302 or not conexion.cookie:
+            raise SystemExit(f'❌ Login de admin fallido (status {status}); revisar ADMIN_USER/ADMIN_PASSWORD')
+
+    async def correr(self):
+        args = self.args
+        inicio = time.perf_counter()
+        fin = inicio + args.rampa + args.duracion
+        tareas = []
+        for n in range(args.admins):
+            tareas.append(asyncio.create_task(self.usuario(n + 1, fin, admin=True)))
+        for n in range(args.usuarios):
+            # Rampa lineal: el pico llega a `usuarios` simultáneos al cabo de `rampa` segundos
+            if args.rampa and args.usuarios > 1:
+                await asyncio.sleep(args.rampa / args.usuarios)
+            tareas.append(asyncio.create_task(self.usuario(args.admins + n + 1, fin)))
+        await asyncio.gather(*tareas)
+        return time.perf_counter() - inicio
+
+
+def comparar(actual, baseline, umbral, tolerancia_ms):
+    """Lista de regresiones (texto) de `actual` respecto a `baseline`."""
+    regresiones = []
+    for ruta, base in baseline['rutas'].items():
+        cur = actual['rutas'].get(ruta)
+        if cur is None:
+            continue
+        for campo in ('p95_ms', 'p99_ms'):
+            if base.get(campo) is None or cur.get(campo) is None:
+                continue
+            limite = max(base[campo] * (1 + umbral), base[campo] + tolerancia_ms)
+            if cur[campo] > limite:
+                regresiones.append(f'{ruta}: {campo} {cur[campo]:.1f} > {limite:.1f} (baseline {base[campo]:.1f})')
+        if base['req_s'] and cur['req_s'] < base['req_s'] * (1 - umbral):
+            regresiones.append(f"{ruta}: req/s {cur['req_s']:.1f} < {base['req_s'] * (1 - umbral):.1f} "
+                               f"(baseline {base['req_s']:.1f})")
+        if cur['tasa_error'] > base['tasa_error'] + 0.01:
+            regresiones.append(f"{ruta}: errores {cur['tasa_error']:.1%} (baseline {base['tasa_error']:.1%})")
+    return regresiones
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_mezcla(value):
+    mezcla = {}
+    for parte in value.split(','):
+        ruta, _, peso = parte.partition('=')
+        ruta = ruta.strip()
+        if ruta not in ('formulario', 'nueva', 'duplicada', 'invalida'):
+            raise argparse.ArgumentTypeError(f'ruta desconocida en la mezcla: {ruta}')
+        mezcla[ruta] = float(peso)
+    return mezcla
+
+
+def ms(value):
+    """Latencia para la tabla; '-' si la ruta solo tuvo fallas de red (None)."""
+    return f'{value:>9.1f}' if value is not None else f"{'-':>9}"
+
+
+def imprimir(resultado):
+    print(f"\n{'Ruta':<36}{'req':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'429/503':>9}{'errores':>9}")
+    for r in resultado['rutas'].values():
+        print(f"{r['nombre']:<36}{r['requests']:>8}{r['req_s']:>9.1f}{ms(r['p50_ms'])}"
+              f"{ms(r['p95_ms'])}{ms(r['p99_ms'])}{r['rechazos']:>9}{r['errores']:>9}")
+    t = resultado['total']
+    print(f"{'Total':<36}{t['requests']:>8}{t['req_s']:>9.1f}{ms(t['p50_ms'])}"
+          f"{ms(t['p95_ms'])}{ms(t['p99_ms'])}{t['rechazos']:>9}{t['errores']:>9}")
+    print(f"Confirmaciones aceptadas por segundo: {t['confirmaciones_s']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', required=True, help='URL base del servidor, incluido APP_PREFIX')
+    parser.add_argument('--usuarios', type=int, default=50, help='Usuarios públicos simultáneos en el pico')
+    parser.add_argument('--admins', type=int, default=2, help='Administradores consultando listados')
+    parser.add_argument('--duracion', type=float, default=30, help='Segundos de pico (después de la rampa)')
+    parser.add_argument('--rampa', type=float, default=5, help='Segundos para llegar al pico')
+    parser.add_argument('--pausa-ms', type=float, default=0, help='Pausa media entre requests de un usuario')
+    parser.add_argument('--mezcla', type=parse_mezcla, default=parse_mezcla(MEZCLA_DEFAULT))
+    parser.add_argument('--slug', help='Usar un evento activo existente (con --evento-id)')
+    parser.add_argument('--evento-id', type=int)
+    parser.add_argument('--salida', help='Archivo JSON con el resultado')
+    parser.add_argument('--baseline', help='Resultado JSON de referencia')
+    parser.add_argument('--umbral', type=float, default=0.15, help='Empeoramiento relativo tolerado')
+    parser.add_argument('--tolerancia-ms', type=float, default=2.0,
+                        help='Diferencia absoluta de latencia que nunca cuenta como regresión')
+    parser.add_argument('--guardar-baseline', help='Guardar este resultado como baseline')
+    args = parser.parse_args()
+    if bool(args.slug) != bool(args.evento_id):
+        parser.error('--slug y --evento-id van juntos')
+
+    creado = args.slug is None
+    evento_id, slug = (crear_evento_temporal() if creado else (args.evento_id, args.slug))
+    try:
+        escenario = Escenario(args, evento_id, slug)
+        duracion = asyncio.run(escenario.correr())
+    finally:
+        if creado:
+            eliminar_evento(evento_id)
+
+    # La rampa cuenta en la duración: las tasas son del periodo completo
+    rutas, total = escenario.resultados.resumen(duracion)
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'config': {
+            'url': args.url, 'usuarios': args.usuarios, 'admins': args.admins,
+            'duracion': args.duracion, 'rampa': args.rampa, 'pausa_ms': args.pausa_ms,
+            'mezcla': args.mezcla,
+        },
+        'duracion_s': round(duracion, 2),
+        'rutas': rutas,
+        'total': total,
+    }
+    # Primero a disco: la corrida en la que el servidor se cayó es la que más
+    # importa conservar
+    for path in filter(None, (args.salida, args.guardar_baseline)):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(resultado, fh, indent=2, ensure_ascii=False)
+
+    imprimir(resultado)
+    for path in filter(None, (args.salida, args.guardar_baseline)):
+        print(f"Resultado guardado en {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        if baseline.get('config', {}).get('usuarios') != args.usuarios:
+            print("⚠️  La baseline se tomó con otro número de usuarios; la comparación es orientativa")
+        regresiones = comparar(resultado, baseline, args.umbral, args.tolerancia_ms)
+        if regresiones:
+            print(f"\n❌ Regresiones respecto a {args.baseline} (umbral {args.umbral:.0%}):")
+            for linea in regresiones:
+                print(f"   - {linea}")
+            sys.exit(1)
+        print(f"\n✓ Sin regresiones respecto a {args.baseline} (umbral {args.umbral:.0%})")
+
+
+if __name__ == '__main__':
+    main()
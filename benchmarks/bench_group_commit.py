@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Throughput de inserción de confirmaciones: commit por fila vs group commit
+Requiere una base MySQL configurada en .env (usa el mismo DB_CONFIG que app.py).
+Crea un evento temporal y lo elimina al terminar (ON DELETE CASCADE).
+
+Uso:
+    python benchmarks/bench_group_commit.py [--hilos 16] [--filas 2000]
+        [--ventana-ms 5] [--max-filas 50]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+def crear_evento_temporal():
+    slug = f'bench-group-commit-{os.getpid()}-{int(time.time())}'
+    ubicacion = app.PREDEFINED_LOCATIONS['teatro-jose-vasconcelos']
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("""
+            INSERT INTO evento (slug, titulo, lugar, ubicacion_key, ubicacion_nombre,
+                                ubicacion_lat, ubicacion_lng, activo)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, FALSE)
+        """, (
+            slug, 'Benchmark group commit', ubicacion['nombre'], 'teatro-jose-vasconcelos',
+            ubicacion['nombre'], ubicacion['lat'], ubicacion['lng'],
+        ))
+        return cursor.lastrowid
+
+
+def eliminar_evento(evento_id):
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("DELETE FROM evento WHERE id = %s", (evento_id,))
+
+
+def params_confirmacion(evento_id, etiqueta, i):
+    return (
+        evento_id, f'Dependencia {etiqueta}', 'Puesto', 'Lic.', f'Persona {etiqueta} {i}',
+        f'persona{i}@example.com', False, None, None, None, '127.0.0.1', 'bench',
+    )
+
+
+def run(insert, evento_id, etiqueta, hilos, filas):
+    latencias = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        insert(params_confirmacion(evento_id, etiqueta, i))
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencias.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        list(executor.map(one, range(filas)))
+    total = time.perf_counter() - start
+
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] * 1000
+    p99 = latencias[int(len(latencias) * 0.99) - 1] * 1000
+    return filas / total, p50, p99
+
+
+def insert_directo(params):
+    with app.db_transaction() as (_, cursor):
+        return app.insert_confirmacion(cursor, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--filas', type=int, default=2000)
+    parser.add_argument('--ventana-ms', type=float, default=5)
+    parser.add_argument('--max-filas', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.hilos > int(os.getenv('DB_POOL_SIZE', 5)):
+        print(f"⚠️  DB_POOL_SIZE menor que --hilos: el modo directo puede fallar por PoolError")
+
+    writer = app.GroupCommitWriter(
+        window=args.ventana_ms / 1000.0, max_rows=args.max_filas, timeout=30
+    )
+
+    evento_id = crear_evento_temporal()
+    try:
+        directo = run(insert_directo, evento_id, 'directo', args.hilos, args.filas)
+        agrupado = run(writer.submit, evento_id, 'grupo', args.hilos, args.filas)
+    finally:
+        eliminar_evento(evento_id)
+
+    print(f"{'Modo':<22}{'filas/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"{'commit por fila':<22}{directo[0]:>10.0f}{directo[1]:>10.2f}{directo[2]:>10.2f}")
+    print(f"{'group commit':<22}{agrupado[0]:>10.0f}{agrupado[1]:>10.2f}{agrupado[2]:>10.2f}")
+    print(f"Tandas: {writer.stats()}")
+
+
+if __name__ == '__main__':
+    main()
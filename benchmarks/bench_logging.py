@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Costo del logging en la latencia de las requests
+Compara, en un proceso nuevo por modo (el logging es global al proceso):
+- sin_log:   LOG_LEVEL=WARNING (log_request_summary no escribe)
+- sincrono:  LOG_QUEUE=0, el archivo se escribe en el hilo de la request
+- cola:      LOG_QUEUE=1 (QueueHandler + QueueListener, default)
+- cola_json: cola con LOG_FORMAT=json
+
+Mide µs por llamada a logger.info y la latencia de una request barata que
+pasa por log_request_summary (GET /api/confirmacion -> 405) con --hilos
+hilos a la vez, usando el cliente de pruebas de Flask (sin MySQL).
+
+Uso:
+    python benchmarks/bench_logging.py [--requests 5000] [--hilos 1,8] [--modos sin_log,sincrono,cola,cola_json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODOS = {
+    'sin_log': {'LOG_LEVEL': 'WARNING'},
+    'sincrono': {'LOG_QUEUE': '0'},
+    'cola': {'LOG_QUEUE': '1'},
+    'cola_json': {'LOG_QUEUE': '1', 'LOG_FORMAT': 'json'},
+}
+
+
+def percentil(ordenadas, p):
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))]
+
+
+def medir_en_proceso(requests, hilos):
+    """Corre dentro del proceso hijo ya configurado; devuelve el resultado como dict."""
+    sys.path.insert(0, BASE_DIR)
+    import app
+
+    def esperar_cola():
+        while app.log_pipeline is not None and app.log_pipeline.stats()['queued']:
+            time.sleep(0.01)
+
+    # Ráfaga menor que LOG_QUEUE_MAX: mide el costo de encolar, no el de descartar
+    logger = app.logger
+    llamadas = 5000
+    start = time.perf_counter()
+    for i in range(llamadas):
+        logger.info('HTTP %s %s ip=%s', 'GET', '/api/bench', '127.0.0.1', extra={'i': i})
+    us_por_llamada = (time.perf_counter() - start) / llamadas * 1e6
+    esperar_cola()
+
+    resultados = {'us_por_llamada': us_por_llamada}
+    for n in hilos:
+        latencias = []
+        lock = threading.Lock()
+
+        def worker(count):
+            client = app.app.test_client()
+            propias = []
+            for _ in range(count):
+                t0 = time.perf_counter()
+                client.get('/api/confirmacion')
+                propias.append(time.perf_counter() - t0)
+            with lock:
+                latencias.extend(propias)
+
+        threads = [threading.Thread(target=worker, args=(requests // n,)) for _ in range(n)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        esperar_cola()
+        latencias.sort()
+        resultados[str(n)] = {
+            'req_s': len(latencias) / elapsed,
+            'p50_us': percentil(latencias, 0.50) * 1e6,
+            'p99_us': percentil(latencias, 0.99) * 1e6,
+        }
+
+    if app.log_pipeline is not None:
+        resultados['descartados'] = app.log_pipeline.stats()['dropped']
+        app.log_pipeline.stop()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--hilos', default='1,8', type=lambda v: [int(n) for n in v.split(',')])
+    parser.add_argument('--modos', default=','.join(MODOS), type=lambda v: v.split(','))
+    parser.add_argument('--hijo', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(medir_en_proceso(args.requests, args.hilos)))
+        return
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for modo in args.modos:
+            env = dict(
+                os.environ,
+                LOG_FILE=os.path.join(tmp, f'{modo}.log'),
+                LOG_LEVEL='INFO',
+                LOG_FORMAT='text',
+                RUN_DIR=os.path.join(tmp, 'run'),
+            )
+            env.update(MODOS[modo])
+            # stderr (el StreamHandler de consola) se captura para no medir la terminal
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--hijo',
+                 '--requests', str(args.requests), '--hilos', ','.join(map(str, args.hilos))],
+                env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout
+            resultados[modo] = json.loads(out.strip().splitlines()[-1])
+
+    base = resultados.get('sin_log')
+    print(f"{'Modo':<12}{'µs/log':>9}" + ''.join(
+        f"{f'{n} hilo(s) p50 µs':>20}{'p99 µs':>10}{'req/s':>10}" for n in args.hilos))
+    for modo, r in resultados.items():
+        fila = f"{modo:<12}{r['us_por_llamada']:>9.1f}"
+        for n in args.hilos:
+            h = r[str(n)]
+            fila += f"{h['p50_us']:>20.1f}{h['p99_us']:>10.1f}{h['req_s']:>10.0f}"
+        print(fila)
+    for modo, r in resultados.items():
+        if r.get('descartados'):
+            print(f"⚠️  {modo}: {r['descartados']} registros descartados por cola llena (LOG_QUEUE_MAX)")
+    if base:
+        print("\nCosto agregado a la latencia p50 frente a sin_log:")
+        for modo, r in resultados.items():
+            if modo == 'sin_log':
+                continue
+            partes = [f"{n} hilo(s) {r[str(n)]['p50_us'] - base[str(n)]['p50_us']:+.1f} µs" for n in args.hilos]
+            print(f"  {modo:<12}" + ', '.join(partes))
+
+
+if __name__ == '__main__':
+    main()
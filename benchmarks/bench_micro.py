@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks de las partes de CPU (sin MySQL)
+- Validación de /api/confirmacion: normalize_text, regex de correo,
+  normalización de placas y el esquema completo
+- Formateo del export CSV (format_export_row + csv.writer por bloques,
+  como iter_export_csv)
+- Render Jinja de form.html, admin.html y todas_confirmaciones.html
+
+Los datos son sintéticos y deterministas (misma semilla en cada corrida).
+Cada caso se mide --repeticiones veces y se reporta la mejor. El resultado
+se agrega a benchmarks/resultados/micro.jsonl con el commit actual, y se
+compara contra la última corrida de otro commit: así un cambio de
+rendimiento queda visible en el diff del PR.
+
+Uso:
+    python benchmarks/bench_micro.py [--filas 1000,10000,100000] [--repeticiones 3]
+        [--solo validacion,export,render] [--no-guardar]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import app  # noqa: E402
+from validacion import CONFIRMACION_SCHEMA, EMAIL_REGEX, normalize_text, validate_confirmacion  # noqa: E402
+
+RESULTADOS_PATH = os.path.join(BASE_DIR, 'benchmarks', 'resultados', 'micro.jsonl')
+
+NOMBRES = ('María Fernanda', 'Juan Carlos', 'Ana Sofía', 'José Luis', 'Guadalupe', 'Ricardo')
+APELLIDOS = ('López Hernández', 'Pérez García', 'Martínez Ruiz', 'Sánchez Díaz', 'Ramírez Cruz')
+DEPENDENCIAS = (
+    'Dirección General de Cómputo', 'Facultad de Estudios Superiores Aragón',
+    'Secretaría Administrativa', 'Coordinación de Humanidades',
+)
+GRADOS = ('Dr.', 'Dra.', 'Mtro.', 'Mtra.', 'Lic.', 'Ing.')
+PLACAS_FIELD = next(f for f in CONFIRMACION_SCHEMA.fields if f.name == 'vehiculo_placas')
+
+
+# ----------------------------------------------------------------------------
+# Datos sintéticos
+# ----------------------------------------------------------------------------
+
+def payloads(n, rnd):
+    """Payloads como los que llegan del formulario (con whitespace y mayúsculas por limpiar)."""
+    result = []
+    for i in range(n):
+        trae = i % 3 == 0
+        payload = {
+            'id_evento': str(1 + i % 5),
+            'dependencia': f'  {rnd.choice(DEPENDENCIAS)}\t',
+            'puesto': 'Jefe de  Departamento',
+            'grado': rnd.choice(GRADOS),
+            'nombre_completo': f'{rnd.choice(NOMBRES)}\n {rnd.choice(APELLIDOS)} {i}',
+            'email': f' Persona.{i}@Aragon.UNAM.mx ',
+            'trae_vehiculo': 'si' if trae else 'no',
+        }
+        if trae:
+            payload.update({
+                'vehiculo_modelo': 'Nissan Versa',
+                'vehiculo_color': 'Gris',
+                'vehiculo_placas': f'abc-{i % 1000:03d} x',
+            })
+        if i % 10 == 9:
+            payload['email'] = f'persona{i}@'  # inválido
+        result.append(payload)
+    return result
+
+
+def filas_export(n, rnd):
+    """Tuplas con las columnas de EXPORT_CSV_QUERY."""
+    base = datetime(2026, 10, 1, 9, 0)
+    filas = []
+    for i in range(n):
+        trae = i % 3 == 0
+        confirmado = base + timedelta(seconds=37 * i)
+        filas.append((
+            'ceremonia-inicio', 'Ceremonia de Inicio de Cursos', rnd.choice(DEPENDENCIAS), 'Puesto',
+            rnd.choice(GRADOS), f'{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {i}', f'persona{i}@unam.mx',
+            1 if trae else 0, 'Nissan Versa' if trae else None, 'Gris' if trae else None,
+            f'ABC{i % 1000:03d}' if trae else None, confirmado, confirmado,
+        ))
+    return filas
+
+
+def confirmaciones_pagina(n, rnd):
+    """Filas como las de CONFIRMACIONES_PAGE_SQL (cursor dictionary)."""
+    base = datetime(2026, 10, 1, 9, 0)
+    filas = []
+    for i in range(n):
+        trae = i % 3 == 0
+        filas.append({
+            'id': n - i,
+            'evento_titulo': 'Ceremonia de Inicio de Cursos',
+            'evento_slug': 'ceremonia-inicio',
+            'dependencia': rnd.choice(DEPENDENCIAS),
+            'puesto': 'Puesto',
+            'grado': rnd.choice(GRADOS),
+            'nombre_completo': f'{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {i}',
+            'email': f'persona{i}@unam.mx',
+            'trae_vehiculo': 1 if trae else 0,
+            'vehiculo_modelo': 'Nissan Versa' if trae else None,
+            'vehiculo_color': 'Gris' if trae else None,
+            'vehiculo_placas': f'ABC{i % 1000:03d}' if trae else None,
+            'ip': f'10.0.{i // 256 % 256}.{i % 256}',
+            'confirmado_en': base + timedelta(seconds=37 * i),
+        })
+    return filas
+
+
+def eventos(n=20):
+    ubicacion = app.PREDEFINED_LOCATIONS['teatro-jose-vasconcelos']
+    return [{
+        'id': i + 1,
+        'slug': f'evento-{i + 1}',
+        'titulo': f'Evento {i + 1}',
+        'lugar': ubicacion['nombre'],
+        'ubicacion_key': 'teatro-jose-vasconcelos',
+        'ubicacion_nombre': ubicacion['nombre'],
+        'ubicacion_lat': ubicacion['lat'],
+        'ubicacion_lng': ubicacion['lng'],
+        'fecha_recepcion': datetime(2026, 10, 20, 9, 0),
+        'fecha_inicio': datetime(2026, 10, 20, 10, 0),
+        'fecha_fin': datetime(2026, 10, 20, 13, 0),
+        'activo': 1 if i == 0 else 0,
+        'creado_en': datetime(2026, 9, 1, 12, 0),
+        'actualizado_en': datetime(2026, 9, 15, 12, 0),
+        'total_confirmaciones': 100 * i,
+        'total_vehiculos': 10 * i,
+    } for i in range(n)]
+
+
+# ----------------------------------------------------------------------------
+# Casos
+# ----------------------------------------------------------------------------
+
+def caso_normalize_text(datos):
+    for payload in datos:
+        normalize_text(payload['nombre_completo'])
+        normalize_text(payload['dependencia'])
+
+
+def caso_email_regex(datos):
+    fullmatch = EMAIL_REGEX.fullmatch
+    for payload in datos:
+        fullmatch(payload['email'].strip().lower())
+
+
+def caso_placas(datos):
+    clean = PLACAS_FIELD.clean
+    for payload in datos:
+        clean(payload)
+
+
+def caso_validacion(datos):
+    for payload in datos:
+        validate_confirmacion(payload)
+
+
+def caso_export(filas):
+    # Mismo bucle que iter_export_csv, sin la lectura de MySQL
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    chunk = app.EXPORT_CHUNK_SIZE
+    total = 0
+    for start in range(0, len(filas), chunk):
+        writer.writerows(app.format_export_row(row) for row in filas[start:start + chunk])
+        total += len(buffer.getvalue().encode('utf-8'))
+        buffer.seek(0)
+        buffer.truncate(0)
+    return total
+
+
+def render(template, **context):
+    # Contexto de request de admin (url_for, sesión) como en las vistas reales
+    with app.app.test_request_context('/admin'):
+        app.session['is_admin'] = True
+        return app.render_template(template, **context)
+
+
+def caso_render_form(evento):
+    render('form.html', evento=evento)
+
+
+def caso_render_admin(contexto):
+    render('admin.html', **contexto)
+
+
+def caso_render_todas(contexto):
+    render('todas_confirmaciones.html', **contexto)
+
+
+def medir(func, datos, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        start = time.perf_counter()
+        func(datos)
+        elapsed = time.perf_counter() - start
+        mejor = elapsed if mejor is None else min(mejor, elapsed)
+    return mejor
+
+
+def correr(args):
+    rnd = random.Random(42)
+    resultados = {}
+
+    def registrar(nombre, filas, segundos):
+        resultados[nombre] = {
+            'filas': filas,
+            'ms': round(segundos * 1000, 3),
+            'filas_s': round(filas / segundos) if segundos else None,
+        }
+        print(f"{nombre:<40}{filas:>9}{segundos * 1000:>12.2f}{filas / segundos:>14,.0f}")
+
+    print(f"{'Caso':<40}{'filas':>9}{'ms':>12}{'filas/s':>14}")
+    for n in args.filas:
+        if 'validacion' in args.solo:
+            datos = payloads(n, rnd)
+            for nombre, func in (
+                ('normalize_text', caso_normalize_text),
+                ('email_regex', caso_email_regex),
+                ('placas', caso_placas),
+                ('validate_confirmacion', caso_validacion),
+            ):
+                func(datos[:100])  # calentamiento
+                registrar(f'validacion.{nombre}[{n}]', n, medir(func, datos, args.repeticiones))
+
+        if 'export' in args.solo:
+            filas = filas_export(n, rnd)
+            caso_export(filas[:100])
+            registrar(f'export.format_export_row[{n}]', n, medir(caso_export, filas, args.repeticiones))
+
+        if 'render' in args.solo:
+            lista_eventos = eventos()
+            confirmaciones = confirmaciones_pagina(n, rnd)
+            comunes = {
+                'eventos': lista_eventos,
+                'confirmaciones': confirmaciones,
+                'page_size': n,
+                'is_first_page': True,
+                'next_cursor': 'siguiente',
+            }
+            admin = dict(
+                comunes,
+                selected_evento=lista_eventos[0],
+                selected_slug=lista_eventos[0]['slug'],
+                filtros={},
+                ubicaciones=app.list_predefined_locations(),
+            )
+            todas = dict(comunes, total=n, filtros={})
+            caso_render_admin(dict(admin, confirmaciones=confirmaciones[:10]))
+            caso_render_todas(dict(todas, confirmaciones=confirmaciones[:10]))
+            registrar(f'render.admin[{n}]', n, medir(caso_render_admin, admin, args.repeticiones))
+            registrar(f'render.todas_confirmaciones[{n}]', n, medir(caso_render_todas, todas, args.repeticiones))
+
+    if 'render' in args.solo:
+        # Una sola fila (el evento); se reporta como renders por segundo
+        evento = eventos(1)[0]
+        caso_render_form(evento)
+        veces = 200
+        segundos = medir(lambda e: [caso_render_form(e) for _ in range(veces)], evento, args.repeticiones)
+        registrar('render.form', veces, segundos)
+    return resultados
+
+
+# ----------------------------------------------------------------------------
+# Resultados por commit
+# ----------------------------------------------------------------------------
+
+def git(*argv):
+    try:
+        return subprocess.run(['git', *argv], capture_output=True, text=True, check=True, cwd=BASE_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cargar_anteriores():
+    if not os.path.exists(RESULTADOS_PATH):
+        return []
+    with open(RESULTADOS_PATH, encoding='utf-8') as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def comparar(resultados, commit, anteriores):
+    previa = next((r for r in reversed(anteriores) if r['commit'] != commit), None)
+    if previa is None:
+        return
+    print(f"\nComparado con {previa['commit']} ({previa['fecha']}; positivo = más rápido):")
+    for nombre, actual in resultados.items():
+        antes = previa['resultados'].get(nombre)
+        if not antes or not antes.get('ms') or not actual['ms']:
+            continue
+        cambio = antes['ms'] / actual['ms'] - 1
+        marca = '  ⚠️' if cambio < -0.10 else ''
+        print(f"  {nombre:<40}{antes['ms']:>10.2f} → {actual['ms']:>10.2f} ms  {cambio:>+7.1%}{marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', default='1000,10000,100000', type=lambda v: [int(n) for n in v.split(',')])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--solo', default='validacion,export,render', type=lambda v: set(v.split(',')))
+    parser.add_argument('--no-guardar', action='store_true', help=f'No agregar a {os.path.relpath(RESULTADOS_PATH, BASE_DIR)}')
+    args = parser.parse_args()
+
+    resultados = correr(args)
+
+    commit = git('rev-parse', '--short', 'HEAD')
+    # Cambios sin commit: el resultado corresponde a HEAD más esos cambios
+    dirty = bool(git('status', '--porcelain', '--untracked-files=no'))
+    anteriores = cargar_anteriores()
+    comparar(resultados, commit, anteriores)
+
+    if not args.no_guardar:
+        os.makedirs(os.path.dirname(RESULTADOS_PATH), exist_ok=True)
+        registro = {
+            'commit': commit,
+            'dirty': dirty,
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'maquina': platform.machine(),
+            'resultados': resultados,
+        }
+        with open(RESULTADOS_PATH, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(registro, ensure_ascii=False, sort_keys=True) + '\n')
+        print(f"\nResultado agregado a {os.path.relpath(RESULTADOS_PATH, BASE_DIR)} (commit {commit}{' + cambios' if dirty else ''})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Sentencias calientes en modo texto vs prepared statements del servidor
+Requiere una base MySQL configurada en .env (usa el mismo DB_CONFIG que app.py).
+Crea un evento temporal y lo elimina al terminar (ON DELETE CASCADE).
+
+Mide, con varios hilos compartiendo el pool, las tres sentencias que se
+preparan por conexión: evento activo (index), evento por slug (formulario)
+e INSERT de confirmación (con su contador, en transacción). Las lecturas
+van directo a MySQL, sin pasar por la caché de eventos.
+
+Uso:
+    python benchmarks/bench_prepared.py [--hilos 16] [--operaciones 3000]
+"""
+import argparse
+import itertools
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+def crear_evento_temporal():
+    slug = f'bench-prepared-{os.getpid()}-{int(time.time())}'
+    ubicacion = app.PREDEFINED_LOCATIONS['teatro-jose-vasconcelos']
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("""
+            INSERT INTO evento (slug, titulo, lugar, ubicacion_key, ubicacion_nombre,
+                                ubicacion_lat, ubicacion_lng, activo)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE)
+        """, (
+            slug, 'Benchmark prepared statements', ubicacion['nombre'], 'teatro-jose-vasconcelos',
+            ubicacion['nombre'], ubicacion['lat'], ubicacion['lng'],
+        ))
+        return cursor.lastrowid, slug
+
+
+def eliminar_evento(evento_id):
+    with app.db_transaction() as (_, cursor):
+        cursor.execute("DELETE FROM evento WHERE id = %s", (evento_id,))
+
+
+def evento_activo(_evento_id, _slug, _i):
+    with app.db_cursor(dictionary=True) as (_, cursor):
+        app.fetch_evento_activo(cursor)
+
+
+def evento_por_slug(_evento_id, slug, _i):
+    with app.db_cursor(dictionary=True) as (_, cursor):
+        app.fetch_evento_por_slug(cursor, slug)
+
+
+# Nombres únicos entre corridas (calentamiento incluido) para no chocar con el UNIQUE
+_secuencia = itertools.count()
+
+
+def insertar(evento_id, _slug, _i):
+    n = next(_secuencia)
+    params = (
+        evento_id, 'Dependencia bench', 'Puesto', 'Lic.', f'Persona {n}',
+        f'persona{n}@example.com', False, None, None, None, '127.0.0.1', 'bench',
+    )
+    with app.db_transaction() as (_, cursor):
+        app.insert_confirmacion(cursor, params)
+
+
+SENTENCIAS = (
+    ('evento activo', evento_activo),
+    ('evento por slug', evento_por_slug),
+    ('INSERT confirmación', insertar),
+)
+
+
+def run(func, evento_id, slug, hilos, operaciones):
+    latencias = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        func(evento_id, slug, i)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencias.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        list(executor.map(one, range(operaciones)))
+    total = time.perf_counter() - start
+
+    latencias.sort()
+    p50 = latencias[len(latencias) // 2] * 1000
+    p99 = latencias[int(len(latencias) * 0.99) - 1] * 1000
+    return operaciones / total, p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--operaciones', type=int, default=3000)
+    args = parser.parse_args()
+
+    evento_id, slug = crear_evento_temporal()
+    resultados = []
+    try:
+        for nombre, func in SENTENCIAS:
+            for prepared in (False, True):
+                app.PREPARED_STATEMENTS = prepared
+                # Calentamiento: abre las conexiones del pool y prepara las sentencias
+                run(func, evento_id, slug, args.hilos, args.hilos * 4)
+                resultados.append((nombre, prepared, run(func, evento_id, slug, args.hilos, args.operaciones)))
+    finally:
+        eliminar_evento(evento_id)
+
+    print(f"{'Sentencia':<22}{'Modo':<10}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for nombre, prepared, (ops, p50, p99) in resultados:
+        modo = 'preparada' if prepared else 'texto'
+        print(f"{nombre:<22}{modo:<10}{ops:>10.0f}{p50:>10.2f}{p99:>10.2f}")
+    print(f"Pool: {app.pool_stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Requests/s de un worker en /evento/<slug>: render con Jinja vs HTML cacheado vs 304
+No necesita MySQL: el evento se sirve desde un stub (en producción ya viene de
+evento_cache), así que se mide solo el costo de la vista, la plantilla y Flask.
+
+Uso:
+    python benchmarks/bench_render_cache.py [--requests 3000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+EVENTO = {
+    'id': 1,
+    'slug': 'bench-render',
+    'titulo': 'Ceremonia de Inicio de Cursos',
+    'lugar': 'Teatro José Vasconcelos',
+    'ubicacion_key': 'teatro-jose-vasconcelos',
+    'ubicacion_nombre': 'Teatro José Vasconcelos',
+    'ubicacion_lat': 19.476396427168083,
+    'ubicacion_lng': -99.04633425890201,
+    'fecha_recepcion': datetime(2026, 10, 20, 9, 0),
+    'fecha_inicio': datetime(2026, 10, 20, 10, 0),
+    'fecha_fin': datetime(2026, 10, 20, 13, 0),
+    'activo': 1,
+    'creado_en': datetime(2026, 9, 1, 12, 0),
+    'actualizado_en': datetime(2026, 9, 15, 12, 0),
+}
+
+
+def measure(client, requests, headers=None, expected=200):
+    url = f"/evento/{EVENTO['slug']}"
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url, headers=headers or {})
+        assert response.status_code == expected, response.status_code
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    client = app.app.test_client()
+    with mock.patch.object(app, 'get_evento_activo_por_slug', return_value=EVENTO):
+        # Calentamiento: compila la plantilla y llena la caché
+        etag = client.get(f"/evento/{EVENTO['slug']}").headers['ETag']
+
+        with mock.patch.object(app, 'PAGE_CACHE_MAX', 0):
+            sin_cache = measure(client, args.requests)
+        con_cache = measure(client, args.requests)
+        condicional = measure(client, args.requests, {'If-None-Match': etag}, expected=304)
+
+    print(f"{'Modo':<28}{'req/s':>10}{'x':>8}")
+    print(f"{'render Jinja (sin caché)':<28}{sin_cache:>10.0f}{1:>8.2f}")
+    print(f"{'HTML cacheado (200)':<28}{con_cache:>10.0f}{con_cache / sin_cache:>8.2f}")
+    print(f"{'GET condicional (304)':<28}{condicional:>10.0f}{condicional / sin_cache:>8.2f}")
+    print(f"Caché: {app.page_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
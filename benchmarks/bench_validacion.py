@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de la validación de /api/confirmacion
+Compara la implementación anterior (clases y closures redefinidos en cada
+POST) contra el esquema precompilado de validacion.py
+
+Uso:
+    python benchmarks/bench_validacion.py [--iteraciones 20000]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validacion import validate_confirmacion  # noqa: E402
+
+
+PAYLOADS = [
+    {
+        'id_evento': '1',
+        'dependencia': 'Dirección General de Cómputo',
+        'puesto': 'Jefe de Departamento',
+        'grado': 'Mtra.',
+        'nombre_completo': 'María  Fernanda\tLópez Hernández',
+        'email': ' Maria.Lopez@Aragon.UNAM.mx ',
+        'trae_vehiculo': 'si',
+        'vehiculo_modelo': 'Nissan Versa',
+        'vehiculo_color': 'Gris',
+        'vehiculo_placas': 'abc-12 3',
+    },
+    {
+        'id_evento': 1,
+        'dependencia': 'Facultad de Estudios Superiores Aragón',
+        'puesto': 'Director',
+        'grado': 'Otro',
+        'grado_otro': 'Fís.',
+        'nombre_completo': 'Juan Pérez',
+        'email': 'juan@unam.mx',
+        'trae_vehiculo': False,
+    },
+    {
+        # Inválido: correo mal formado
+        'id_evento': '1',
+        'dependencia': 'Secretaría Administrativa',
+        'puesto': 'Asistente',
+        'grado': 'Lic.',
+        'nombre_completo': 'Ana Ruiz',
+        'email': 'ana@',
+        'trae_vehiculo': 'no',
+    },
+]
+
+
+def legacy_validate(data):
+    """Copia fiel de la validación inline previa de api_confirmacion."""
+    class ValidationError(Exception):
+        def __init__(self, message, field=None, code=None, meta=None):
+            super().__init__(message)
+            self.message = message
+            self.field = field
+            self.code = code
+            self.meta = meta or {}
+
+    def normalize_text(value):
+        if value is None:
+            return None
+        text = str(value)
+        text = re.sub(r"[\r\n\t]+", " ", text)
+        text = re.sub(r"\s+", " ", text).strip()
+        return text
+
+    def require_text(field, max_len, label=None):
+        label = label or field
+        value = normalize_text(data.get(field))
+        if not value:
+            raise ValidationError(f'El campo {label} es obligatorio', field=field, code='required')
+        if len(value) > max_len:
+            raise ValidationError(
+                f'El campo {label} excede el límite de {max_len} caracteres',
+                field=field, code='max_length', meta={'max': max_len}
+            )
+        return value
+
+    def optional_text(field, max_len, label=None):
+        label = label or field
+        value = normalize_text(data.get(field))
+        if not value:
+            return None
+        if len(value) > max_len:
+            raise ValidationError(
+                f'El campo {label} excede el límite de {max_len} caracteres',
+                field=field, code='max_length', meta={'max': max_len}
+            )
+        return value
+
+    EMAIL_REGEX = re.compile(
+        r"^[A-Z0-9.!#$%&'*+/=?^_`{|}~-]+@"
+        r"[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?"
+        r"(?:\.[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?)+$",
+        re.IGNORECASE,
+    )
+
+    def require_email(field='email', max_len=254, label='correo electrónico'):
+        raw = data.get(field)
+        if raw is None:
+            raise ValidationError(f'El campo {label} es obligatorio', field=field, code='required')
+        email = str(raw).strip().lower()
+        email = re.sub(r"\s+", "", email)
+        if not email:
+            raise ValidationError(f'El campo {label} es obligatorio', field=field, code='required')
+        if len(email) > max_len:
+            raise ValidationError(
+                f'El campo {label} excede el límite de {max_len} caracteres',
+                field=field, code='max_length', meta={'max': max_len}
+            )
+        if not EMAIL_REGEX.fullmatch(email):
+            raise ValidationError(f'El campo {label} es inválido', field=field, code='invalid')
+        return email
+
+    def parse_id_evento(value):
+        value = normalize_text(value)
+        if not value or not value.isdigit():
+            raise ValidationError('El campo id_evento es obligatorio', field='id_evento', code='required')
+        evento_id = int(value)
+        if evento_id <= 0:
+            raise ValidationError('El campo id_evento es inválido', field='id_evento', code='invalid')
+        return evento_id
+
+    def parse_trae_vehiculo(value):
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in ('true', '1', 'si', 'sí', 'yes', 'on'):
+            return True
+        if text in ('false', '0', 'no', 'off'):
+            return False
+        return None
+
+    data = dict(data)
+    trae_vehiculo = parse_trae_vehiculo(data.get('trae_vehiculo'))
+    if trae_vehiculo is None:
+        return None, 'trae_vehiculo'
+    data['trae_vehiculo'] = trae_vehiculo
+
+    try:
+        id_evento = parse_id_evento(data.get('id_evento'))
+        dependencia = require_text('dependencia', 255, 'dependencia')
+        puesto = require_text('puesto', 255, 'puesto')
+        grado = require_text('grado', 50, 'grado')
+        nombre_completo = require_text('nombre_completo', 255, 'nombre_completo')
+        email = require_email('email', 254, 'correo electrónico')
+
+        allowed_grados = {'Dr.', 'Dra.', 'Mtro.', 'Mtra.', 'Lic.', 'Ing.', 'Arq.', 'Otro'}
+        if grado not in allowed_grados:
+            raise ValidationError('El campo grado es inválido', field='grado', code='invalid_choice')
+
+        if grado == 'Otro':
+            grado_otro = require_text('grado_otro', 20, 'grado (otro)')
+            if not re.fullmatch(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñ. ]+", grado_otro):
+                raise ValidationError('El campo grado (otro) contiene caracteres inválidos',
+                                      field='grado_otro', code='invalid_characters')
+            grado = grado_otro
+
+        vehiculo_modelo = optional_text('vehiculo_modelo', 100, 'vehiculo_modelo')
+        vehiculo_color = optional_text('vehiculo_color', 50, 'vehiculo_color')
+        vehiculo_placas_raw = optional_text('vehiculo_placas', 60, 'vehiculo_placas')
+
+        vehiculo_placas = None
+        if vehiculo_placas_raw:
+            vehiculo_placas = vehiculo_placas_raw.upper().replace(' ', '').replace('-', '')
+            if len(vehiculo_placas) > 20:
+                raise ValidationError('El campo vehiculo_placas excede el límite de 20 caracteres',
+                                      field='vehiculo_placas', code='max_length', meta={'max': 20})
+            if not re.fullmatch(r"[A-Z0-9]+", vehiculo_placas):
+                raise ValidationError('El campo vehiculo_placas contiene caracteres inválidos',
+                                      field='vehiculo_placas', code='invalid_characters')
+
+        if trae_vehiculo:
+            if not vehiculo_modelo:
+                raise ValidationError('El campo vehiculo_modelo es obligatorio si trae vehículo',
+                                      field='vehiculo_modelo', code='required')
+            if not vehiculo_color:
+                raise ValidationError('El campo vehiculo_color es obligatorio si trae vehículo',
+                                      field='vehiculo_color', code='required')
+            if not vehiculo_placas:
+                raise ValidationError('El campo vehiculo_placas es obligatorio si trae vehículo',
+                                      field='vehiculo_placas', code='required')
+        else:
+            vehiculo_modelo = None
+            vehiculo_color = None
+            vehiculo_placas = None
+    except ValidationError as ve:
+        return None, ve.field
+
+    return {
+        'trae_vehiculo': trae_vehiculo,
+        'id_evento': id_evento,
+        'dependencia': dependencia,
+        'puesto': puesto,
+        'grado': grado,
+        'nombre_completo': nombre_completo,
+        'email': email,
+        'vehiculo_modelo': vehiculo_modelo,
+        'vehiculo_color': vehiculo_color,
+        'vehiculo_placas': vehiculo_placas,
+    }, None
+
+
+def check_equivalence():
+    """Ambas implementaciones deben aceptar/rechazar igual y normalizar igual."""
+    for payload in PAYLOADS:
+        legacy_values, legacy_field = legacy_validate(payload)
+        values, errors = validate_confirmacion(payload)
+        if legacy_values is None:
+            assert errors and errors[0].field == legacy_field, (payload, legacy_field, errors)
+        else:
+            assert not errors, (payload, [e.to_dict() for e in errors])
+            assert values == legacy_values, (values, legacy_values)
+
+
+def measure(func, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(PAYLOADS[i % len(PAYLOADS)])
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iteraciones', type=int, default=20000)
+    args = parser.parse_args()
+
+    check_equivalence()
+
+    # Calentamiento (caché interna de `re`, bytecode, etc.)
+    measure(legacy_validate, 1000)
+    measure(validate_confirmacion, 1000)
+
+    antes = measure(legacy_validate, args.iteraciones)
+    despues = measure(validate_confirmacion, args.iteraciones)
+
+    print(f"Validaciones/s (antes, closures por request): {antes:,.0f}")
+    print(f"Validaciones/s (después, esquema compilado):  {despues:,.0f}")
+    print(f"Mejora: x{despues / antes:.2f}")
+
+
+if __name__ == '__main__':
+    main()
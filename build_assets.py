@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Build de assets estáticos
+Genera en static/dist/ variantes WebP/AVIF redimensionadas de las imágenes,
+copias precomprimidas (gzip/brotli) de CSS/JS/SVG y nombres con hash de
+contenido, más static/dist/manifest.json, que app.py usa para emitir URLs
+con huella (cacheables para siempre) y srcset. Al final imprime los bytes
+ahorrados por página.
+
+Requiere Pillow (pip install -r requirements-build.txt); brotli es opcional
+(sin él solo se generan copias .gz). Ejecutar en cada despliegue, antes de
+reiniciar Gunicorn.
+
+Uso:
+    python build_assets.py [--calidad 80] [--limpiar]
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+
+try:
+    from PIL import Image, features
+except ImportError:
+    sys.exit("❌ Falta Pillow: pip install -r requirements-build.txt")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# Anchos a generar y ancho máximo en pantalla (px CSS) de cada imagen
+IMAGES = {
+    # .header-logos: 310px de ancho como máximo (80px de alto)
+    'img/logos1.png': {'widths': (320, 640, 960), 'display': 310},
+    'img/logos2.png': {'widths': (320, 640, 960), 'display': 310},
+    # .event-poster-img: ancho completo de la tarjeta
+    'img/cartel_evento.jpeg': {'widths': (480, 960, 1600), 'display': 412},
+}
+
+TEXT_ASSETS = (
+    'css/main.css',
+    'js/form.js',
+    'img/teatro-jose-vasconcelos-marker.svg',
+)
+
+# Assets que el navegador descarga en cada página (el cartel del formulario
+# está comentado en form.html, así que hoy no cuenta)
+BASE_PAGE = ('css/main.css', 'img/logos1.png', 'img/logos2.png')
+PAGES = {
+    'evento_form': BASE_PAGE + ('js/form.js', 'img/teatro-jose-vasconcelos-marker.svg'),
+    'no_event / success': BASE_PAGE,
+}
+
+# Teléfono de referencia para el reporte (devicePixelRatio)
+REPORT_DPR = 2
+
+FORMATS = {
+    'PNG': ('image/png', '.png'),
+    'JPEG': ('image/jpeg', '.jpg'),
+    'WEBP': ('image/webp', '.webp'),
+    'AVIF': ('image/avif', '.avif'),
+}
+
+
+def fingerprint(name, data, ext=None):
+    """`img/logos1.png` -> `img/logos1.<hash>.png` (el hash cambia con el contenido)."""
+    root, original_ext = os.path.splitext(name)
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    return f'{root}.{digest}{ext or original_ext}'
+
+
+def write_output(relpath, data):
+    path = os.path.join(DIST_DIR, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Mismo nombre = mismo contenido: no reescribir (conserva mtime/ETag)
+    if not os.path.exists(path):
+        with open(path, 'wb') as fh:
+            fh.write(data)
+    return relpath
+
+
+def encode_image(img, fmt, quality):
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        img.convert('RGB').save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        img.save(buffer, 'PNG', optimize=True)
+    elif fmt == 'WEBP':
+        img.save(buffer, 'WEBP', quality=quality, method=6)
+    else:
+        # AVIF comprime más a igual calidad visual
+        img.save(buffer, 'AVIF', quality=max(30, quality - 20))
+    return buffer.getvalue()
+
+
+def build_image(name, spec, quality, formats):
+    source = Image.open(os.path.join(STATIC_DIR, name))
+    source.load()
+    fallback = 'PNG' if source.format == 'PNG' else 'JPEG'
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGBA' if 'transparency' in source.info or 'A' in source.mode else 'RGB')
+    widths = [w for w in spec['widths'] if w <= source.width] or [source.width]
+
+    variants = {}
+    for fmt in formats + (fallback,):
+        mimetype, ext = FORMATS[fmt]
+        entries = []
+        for width in widths:
+            height = round(source.height * width / source.width)
+            img = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+            data = encode_image(img, fmt, quality)
+            stem = f'{os.path.splitext(name)[0]}-{width}'
+            relpath = write_output(fingerprint(stem, data, ext), data)
+            entries.append({'file': relpath, 'width': width, 'bytes': len(data)})
+        variants[mimetype] = entries
+
+    largest = variants[FORMATS[fallback][0]][-1]
+    return {
+        'file': largest['file'],
+        'width': largest['width'],
+        'height': round(source.height * largest['width'] / source.width),
+        'fallback': FORMATS[fallback][0],
+        'display': spec['display'],
+        'variants': variants,
+    }
+
+
+def build_text(name):
+    with open(os.path.join(STATIC_DIR, name), 'rb') as fh:
+        data = fh.read()
+    relpath = write_output(fingerprint(name, data), data)
+    entry = {'file': relpath, 'bytes': len(data), 'encodings': {}}
+    compressed = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(data, quality=11)
+    suffixes = {'gzip': '.gz', 'br': '.br'}
+    for encoding, payload in compressed.items():
+        # Solo si realmente ahorra bytes
+        if len(payload) < len(data):
+            write_output(relpath + suffixes[encoding], payload)
+            entry['encodings'][encoding] = len(payload)
+    return entry
+
+
+def served_bytes(entry):
+    """Bytes que descarga un teléfono moderno (REPORT_DPR) con el asset optimizado."""
+    if 'variants' not in entry:
+        return min([entry['bytes']] + list(entry['encodings'].values()))
+    needed = entry['display'] * REPORT_DPR
+    best = None
+    for candidates in entry['variants'].values():
+        # Lo que elegiría srcset: el primer ancho que cubre la pantalla (o el mayor)
+        chosen = next((c for c in candidates if c['width'] >= needed), candidates[-1])
+        if best is None or chosen['bytes'] < best:
+            best = chosen['bytes']
+    return best
+
+
+def report(assets):
+    print(f"\n{'Página':<22}{'Antes':>12}{'Después':>12}{'Ahorro':>12}")
+    for page, names in PAGES.items():
+        before = sum(os.path.getsize(os.path.join(STATIC_DIR, n)) for n in names)
+        after = sum(served_bytes(assets[n]) for n in names)
+        saved = before - after
+        print(f"{page:<22}{before / 1024:>10.1f}KB{after / 1024:>10.1f}KB"
+              f"{saved / 1024:>10.1f}KB ({saved / before:.0%})")
+    print(f"(teléfono con devicePixelRatio={REPORT_DPR}; CSS/JS/SVG con la mejor compresión disponible)")
+
+
+def clean(manifest):
+    """Borra archivos de builds anteriores que ya no están en el manifest."""
+    keep = {MANIFEST_PATH}
+    for entry in manifest['assets'].values():
+        keep.add(os.path.join(DIST_DIR, entry['file']))
+        for suffix in ('.gz', '.br'):
+            keep.add(os.path.join(DIST_DIR, entry['file'] + suffix))
+        for candidates in entry.get('variants', {}).values():
+            keep.update(os.path.join(DIST_DIR, c['file']) for c in candidates)
+    removed = 0
+    for root, _, files in os.walk(DIST_DIR):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if path not in keep:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calidad', type=int, default=80, help='Calidad WebP/JPEG (AVIF usa 20 menos)')
+    parser.add_argument('--limpiar', action='store_true',
+                        help='Borrar archivos de builds anteriores (no usar si aún hay workers viejos sirviendo)')
+    args = parser.parse_args()
+
+    formats = ('AVIF', 'WEBP') if features.check('avif') else ('WEBP',)
+    if 'AVIF' not in formats:
+        print("⚠️  Pillow sin soporte AVIF: solo se generan variantes WebP")
+    if brotli is None:
+        print("⚠️  Módulo brotli no instalado: solo se generan copias .gz")
+
+    assets = {}
+    for name, spec in IMAGES.items():
+        assets[name] = build_image(name, spec, args.calidad, formats)
+        print(f"✓ {name}: {', '.join(assets[name]['variants'])}")
+    for name in TEXT_ASSETS:
+        assets[name] = build_text(name)
+        print(f"✓ {name}: {assets[name]['file']} {sorted(assets[name]['encodings'])}")
+
+    manifest = {'version': 1, 'assets': assets}
+    tmp_path = f'{MANIFEST_PATH}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+    print(f"Manifest: {os.path.relpath(MANIFEST_PATH, BASE_DIR)}")
+
+    if args.limpiar:
+        print(f"Archivos anteriores borrados: {clean(manifest)}")
+
+    report(assets)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Middleware WSGI de compresión gzip/brotli
+Comprime HTML, JSON, CSV y demás respuestas de texto según Accept-Encoding,
+chunk por chunk (sin juntar el cuerpo completo), para que las respuestas en
+streaming (exportación CSV, importación NDJSON) sigan llegando incrementalmente.
+"""
+import os
+import time
+import zlib
+
+from werkzeug.http import parse_accept_header
+
+import tiempos
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin el módulo solo se ofrece gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = frozenset((
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'application/xml',
+    'image/svg+xml',
+))
+
+# Sin cuerpo (204/304) o con un rango de bytes del original (206)
+SKIP_STATUS = ('204', '206', '304')
+
+
+def _compressible(content_type):
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits 16+: formato gzip (cabecera y CRC), no zlib crudo
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        # SYNC_FLUSH: el cliente puede descomprimir lo recibido hasta ahora
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _CompressedIterable:
+    """Cuerpo comprimido; `close()` se propaga al iterable original (WSGI).
+
+    El compresor se toma de `state` al iterar: una app WSGI puede llamar a
+    start_response recién al producir su primer chunk.
+    """
+
+    def __init__(self, app_iter, state):
+        self._app_iter = app_iter
+        self._state = state
+
+    def __iter__(self):
+        # Un solo span `compress` con el tiempo sumado de todos los chunks
+        timer = tiempos.current()
+        first = None
+        spent = 0.0
+        for chunk in self._app_iter:
+            stream = self._state.get('stream')
+            if stream is None:
+                yield chunk
+            elif chunk:
+                start = time.perf_counter()
+                data = stream.compress(chunk)
+                spent += time.perf_counter() - start
+                first = first or start
+                if data:
+                    yield data
+        stream = self._state.get('stream')
+        if stream is not None:
+            start = time.perf_counter()
+            data = stream.finish()
+            spent += time.perf_counter() - start
+            if timer is not None:
+                timer.record('compress', first or start, spent, self._state.get('encoding'))
+            yield data
+
+    def close(self):
+        close = getattr(self._app_iter, 'close', None)
+        if close is not None:
+            close()
+
+
+class CompressionMiddleware:
+    """Comprime las respuestas de `app` con brotli o gzip según Accept-Encoding.
+
+    No toca respuestas que ya traen Content-Encoding, tipos no textuales
+    (imágenes, zip, xlsx ya van comprimidos), cuerpos con Content-Length menor
+    a `min_size`, respuestas con `Cache-Control: no-transform` ni HEAD/206/304.
+    """
+
+    def __init__(self, app, level=6, brotli_quality=4, min_size=1024):
+        self.app = app
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.min_size = min_size
+
+    def _choose_encoding(self, environ):
+        accept = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and accept['br']:
+            return 'br'
+        if accept['gzip']:
+            return 'gzip'
+        return None
+
+    def _should_compress(self, status, headers):
+        if status[:3] in SKIP_STATUS:
+            return False
+        values = {name.lower(): value for name, value in headers}
+        if 'content-encoding' in values or 'content-range' in values:
+            return False
+        if not _compressible(values.get('content-type', '')):
+            return False
+        if 'no-transform' in values.get('cache-control', '').lower():
+            return False
+        length = values.get('content-length')
+        # Sin Content-Length (streaming) siempre conviene comprimir
+        return length is None or not length.isdigit() or int(length) >= self.min_size
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+        encoding = self._choose_encoding(environ)
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        state = {}
+
+        def compressing_start_response(status, headers, exc_info=None):
+            state['started'] = True
+            if not self._should_compress(status, headers):
+                return start_response(status, headers, exc_info)
+
+            new_headers = []
+            vary = None
+            for name, value in headers:
+                lower = name.lower()
+                if lower == 'content-length':
+                    continue
+                if lower == 'etag' and not value.startswith('W/'):
+                    # Otra representación: el ETag fuerte ya no aplica byte a byte
+                    value = f'W/{value}'
+                if lower == 'vary':
+                    vary = value
+                    continue
+                new_headers.append((name, value))
+            if vary is None:
+                vary = 'Accept-Encoding'
+            elif 'accept-encoding' not in vary.lower():
+                vary = f'{vary}, Accept-Encoding'
+            new_headers.append(('Vary', vary))
+            new_headers.append(('Content-Encoding', encoding))
+
+            if encoding == 'br':
+                stream = _BrotliStream(self.brotli_quality)
+            else:
+                stream = _GzipStream(self.level)
+            state['stream'] = stream
+            state['encoding'] = encoding
+            write = start_response(status, new_headers, exc_info)
+
+            def compressing_write(data):
+                # API write() heredada de WSGI (Flask no la usa)
+                write(stream.compress(data))
+            return compressing_write
+
+        app_iter = self.app(environ, compressing_start_response)
+        if state.get('started') and 'stream' not in state:
+            return app_iter
+        return _CompressedIterable(app_iter, state)
+
+
+def compression_settings():
+    """Parámetros de CompressionMiddleware según COMPRESS_* (None si está desactivada)."""
+    if os.getenv('COMPRESS_ENABLED', 'True').lower() not in ('1', 'true', 'yes', 'on'):
+        return None
+    return {
+        'level': int(os.getenv('COMPRESS_LEVEL', 6)),
+        'brotli_quality': int(os.getenv('COMPRESS_BROTLI_QUALITY', 4)),
+        'min_size': int(os.getenv('COMPRESS_MIN_SIZE', 1024)),
+    }
+
+
+def compression_from_env(app):
+    """Envuelve `app` según COMPRESS_* (wsgi.py y asgi.py); sin cambios si está desactivada."""
+    settings = compression_settings()
+    return app if settings is None else CompressionMiddleware(app, **settings)
@@ -0,0 +1,377 @@
+"""
+Exportaciones en segundo plano
+Un pool acotado de hilos por worker escribe el archivo en disco (CSV
+comprimido con gzip, o XLSX con openpyxl en modo write-only) mientras el
+admin consulta el avance. El estado de cada trabajo es un JSON en
+`directory`, así que cualquier worker del host responde el polling y la
+descarga, no solo el que lo generó.
+"""
+import csv
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows (desarrollo): la deduplicación queda local al proceso
+    fcntl = None
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX opcional (requirements-xlsx.txt)
+    Workbook = None
+
+PENDIENTE = 'pendiente'
+EN_PROCESO = 'en_proceso'
+LISTO = 'listo'
+ERROR = 'error'
+
+FORMATOS = {
+    'csv': {'extension': 'csv.gz', 'mimetype': 'application/gzip'},
+    'xlsx': {
+        'extension': 'xlsx',
+        'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    },
+}
+
+
+class ExportQueueFull(Exception):
+    """Demasiados trabajos en cola en este worker."""
+
+
+def formato_disponible(formato):
+    return formato == 'csv' or (formato == 'xlsx' and Workbook is not None)
+
+
+def _process_start(pid):
+    """Inicio del proceso (ticks desde el arranque, /proc) o None si no se sabe.
+
+    Junto con el PID identifica al proceso aunque el PID se reutilice.
+    """
+    try:
+        with open(f'/proc/{pid}/stat', encoding='ascii') as fh:
+            stat = fh.read()
+    except OSError:
+        return None
+    # El nombre del comando va entre paréntesis y puede tener espacios;
+    # starttime es el campo 22 (el 20 contando desde el que sigue al nombre)
+    try:
+        return int(stat.rsplit(')', 1)[1].split()[19])
+    except (IndexError, ValueError):
+        return None
+
+
+def _pid_alive(pid, start=None):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    # PID reutilizado por otro proceso (p. ej. tras reciclar workers)
+    return start is None or _process_start(pid) in (None, start)
+
+
+class ExportJobs:
+    """Trabajos de exportación: cola acotada, estado en disco, dedup y limpieza.
+
+    - `workers` hilos por proceso y como máximo `max_pending` trabajos en
+      cola o en curso; más allá, `submit()` lanza ExportQueueFull.
+    - Dos solicitudes con la misma `key` dentro de `dedup_window` segundos
+      devuelven el mismo trabajo (salvo que haya fallado).
+    - Los archivos y estados con más de `retention` segundos se borran en
+      `cleanup()` (se llama sola al crear trabajos, como mucho una vez por
+      minuto).
+    """
+
+    CLEANUP_INTERVAL = 60
+    # Escrituras del estado durante el avance (el polling no necesita más)
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(self, directory, workers, max_pending, retention, dedup_window, logger=None):
+        self.directory = directory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self.dedup_window = dedup_window
+        self.logger = logger
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._pending = 0
+        self._last_cleanup = 0.0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.failed = 0
+
+    # -- rutas -------------------------------------------------------------
+
+    def _state_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def _dedup_path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directory, f'dedup-{digest}')
+
+    def artifact_path(self, job):
+        return os.path.join(self.directory, f"{job['id']}.{FORMATOS[job['formato']]['extension']}")
+
+    # -- estado ------------------------------------------------------------
+
+    def _write_state(self, job):
+        tmp_path = f"{self._state_path(job['id'])}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(job, fh, ensure_ascii=False)
+        os.replace(tmp_path, self._state_path(job['id']))
+
+    def get(self, job_id):
+        """Estado del trabajo o None; los ids vienen del cliente y se validan."""
+        try:
+            uuid.UUID(hex=job_id)
+        except (TypeError, ValueError):
+            return None
+        try:
+            with open(self._state_path(job_id), encoding='utf-8') as fh:
+                job = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if job['estado'] in (PENDIENTE, EN_PROCESO) and not _pid_alive(job['pid'], job.get('pid_inicio')):
+            # El worker que lo generaba terminó (reinicio, max_requests, OOM)
+            job.update(estado=ERROR, error='El proceso que generaba el archivo terminó', actualizado=time.time())
+            self._write_state(job)
+        return job
+
+    # -- ejecución ---------------------------------------------------------
+
+    def _get_executor(self):
+        # Perezoso y por PID: los hilos no sobreviven a un fork (preload)
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export')
+            self._pid = os.getpid()
+            self._pending = 0
+        return self._executor
+
+    @contextmanager
+    def _dedup_lock(self):
+        """Candado entre workers (flock sobre `directory/.lock`) para la deduplicación."""
+        with self._submit_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, '.lock'), 'a') as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def submit(self, key, formato, nombre, header, total, producer):
+        """Encola un trabajo; devuelve (estado, creado).
+
+        `producer()` se llama en el hilo del pool y devuelve un iterable de
+        bloques (listas de filas). `total` es el número esperado de filas
+        (para el porcentaje; puede ser None).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._maybe_cleanup()
+
+        with self._dedup_lock():
+            existing = self._find_recent(key)
+            if existing is not None:
+                self.deduplicated += 1
+                return existing, False
+
+            with self._lock:
+                executor = self._get_executor()
+                if self.max_pending and self._pending >= self.max_pending:
+                    raise ExportQueueFull()
+                self._pending += 1
+
+            now = time.time()
+            job = {
+                'id': uuid.uuid4().hex,
+                'formato': formato,
+                'nombre': f"{nombre}.{FORMATOS[formato]['extension']}",
+                'estado': PENDIENTE,
+                'filas': 0,
+                'total': total,
+                'error': None,
+                'pid': os.getpid(),
+                'pid_inicio': _process_start(os.getpid()),
+                'creado': now,
+                'actualizado': now,
+            }
+            self._write_state(job)
+            tmp_path = f'{self._dedup_path(key)}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                fh.write(job['id'])
+            os.replace(tmp_path, self._dedup_path(key))
+
+        try:
+            executor.submit(self._run, dict(job), header, producer)
+        except RuntimeError as e:
+            # Executor cerrado (el proceso está terminando): el estado y el
+            # puntero de dedup ya están en disco y harían esperar a un trabajo
+            # que nunca va a correr
+            with self._lock:
+                self._pending -= 1
+            self.failed += 1
+            job.update(estado=ERROR, error=str(e) or e.__class__.__name__, actualizado=time.time())
+            self._write_state(job)
+            with self._dedup_lock():
+                try:
+                    with open(self._dedup_path(key), encoding='utf-8') as fh:
+                        apunta_aqui = fh.read().strip() == job['id']
+                    if apunta_aqui:
+                        os.unlink(self._dedup_path(key))
+                except OSError:
+                    pass
+            raise
+        self.submitted += 1
+        return job, True
+
+    def _find_recent(self, key):
+        try:
+            with open(self._dedup_path(key), encoding='utf-8') as fh:
+                job_id = fh.read().strip()
+        except OSError:
+            return None
+        job = self.get(job_id)
+        if job is None or job['estado'] == ERROR:
+            return None
+        if time.time() - job['creado'] > self.dedup_window:
+            return None
+        if job['estado'] == LISTO and not os.path.exists(self.artifact_path(job)):
+            return None
+        return job
+
+    def _run(self, job, header, producer):
+        final_path = self.artifact_path(job)
+        tmp_path = f'{final_path}.tmp'
+        last_write = 0.0
+
+        def progress(filas):
+            nonlocal last_write
+            job['filas'] = filas
+            now = time.monotonic()
+            if now - last_write >= self.PROGRESS_INTERVAL:
+                last_write = now
+                job['actualizado'] = time.time()
+                self._write_state(job)
+
+        try:
+            job.update(estado=EN_PROCESO, actualizado=time.time())
+            self._write_state(job)
+            start = time.perf_counter()
+            if job['formato'] == 'xlsx':
+                _write_xlsx(tmp_path, header, producer(), progress)
+            else:
+                _write_csv_gz(tmp_path, header, producer(), progress)
+            os.replace(tmp_path, final_path)
+            job.update(
+                estado=LISTO,
+                bytes=os.path.getsize(final_path),
+                segundos=round(time.perf_counter() - start, 3),
+                actualizado=time.time(),
+            )
+            self._write_state(job)
+            if self.logger:
+                self.logger.info(
+                    "Exportación %s lista (%s, %s filas, %s bytes, %.2fs)",
+                    job['id'], job['formato'], job['filas'], job['bytes'], job['segundos'],
+                )
+        except Exception as e:
+            self.failed += 1
+            if self.logger:
+                self.logger.exception("Error en la exportación %s", job['id'])
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            job.update(estado=ERROR, error=str(e) or e.__class__.__name__, actualizado=time.time())
+            self._write_state(job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    # -- limpieza ----------------------------------------------------------
+
+    def _maybe_cleanup(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_cleanup < self.CLEANUP_INTERVAL:
+                return
+            self._last_cleanup = now
+        self.cleanup()
+
+    def cleanup(self):
+        """Borra archivos, estados y entradas de dedup más viejos que `retention`."""
+        cutoff = time.time() - self.retention
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            if name == '.lock':
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    # Un trabajo en curso actualiza su estado; su .tmp puede ser
+                    # viejo solo si el proceso murió
+                    os.unlink(path)
+                    removed += 1
+            except OSError:
+                continue
+        if removed and self.logger:
+            self.logger.info("Limpieza de exportaciones: %s archivos eliminados", removed)
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'submitted': self.submitted,
+                'deduplicated': self.deduplicated,
+                'failed': self.failed,
+                'retention': self.retention,
+                'dedup_window': self.dedup_window,
+            }
+
+
+def _write_csv_gz(path, header, chunks, progress):
+    # utf-8-sig: BOM para Excel, igual que el export en streaming
+    filas = 0
+    with gzip.open(path, 'wt', encoding='utf-8-sig', newline='', compresslevel=6) as fh:
+        writer = csv.writer(fh)
+        writer.writerow(header)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            filas += len(chunk)
+            progress(filas)
+
+
+def _write_xlsx(path, header, chunks, progress):
+    if Workbook is None:
+        raise RuntimeError('openpyxl no está instalado (requirements-xlsx.txt)')
+    # write_only: las filas se escriben en streaming, sin mantener la hoja en memoria
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Confirmaciones')
+    sheet.append(header)
+    filas = 0
+    for chunk in chunks:
+        for row in chunk:
+            sheet.append(row)
+        filas += len(chunk)
+        progress(filas)
+    workbook.save(path)
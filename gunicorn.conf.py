@@ -0,0 +1,93 @@
+"""
+Configuración de Gunicorn
+Gunicorn la lee automáticamente desde el directorio de trabajo:
+
+    gunicorn wsgi:application
+
+- preload: el maestro importa la aplicación una sola vez (Flask, plantillas
+  compiladas, manifest) y los workers la heredan por copy-on-write, así que
+  arrancan más rápido y comparten esa memoria.
+- gthread: `threads` hilos por worker; si DB_POOL_SIZE no se define, se
+  deriva de GUNICORN_THREADS más los hilos de fondo que también toman una
+  conexión (exportaciones y, con DB_GROUP_COMMIT, el writer). El pool sigue
+  a GUNICORN_THREADS, no a --threads: para cambiar los hilos usar la variable.
+- El maestro cierra sus conexiones antes del fork y cada worker abre las
+  suyas (DB_POOL_WARMUP) en post_fork.
+
+Todas las opciones se pueden cambiar con variables GUNICORN_* (o con la
+línea de comandos, que tiene prioridad salvo para derivar DB_POOL_SIZE).
+"""
+import gc
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# Antes de derivar DB_POOL_SIZE: .env puede definirlo
+load_dotenv()
+
+
+def _env_bool(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+preload_app = _env_bool('GUNICORN_PRELOAD', 'True')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Reciclar workers cada N requests (0 = nunca); el jitter evita reinicios simultáneos
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+# Solo se deriva si no viene definido (lo dice when_ready si --threads no coincide)
+_pool_size_derived = worker_class == 'gthread' and 'DB_POOL_SIZE' not in os.environ
+if _pool_size_derived:
+    # Un hilo = como máximo una conexión, incluidos los que la retienen
+    # mucho rato: los EXPORT_JOB_WORKERS y el writer de group commit
+    background = max(1, int(os.getenv('EXPORT_JOB_WORKERS', 2)))
+    if _env_bool('DB_GROUP_COMMIT', 'False'):
+        background += 1
+    os.environ['DB_POOL_SIZE'] = str(threads + background)
+
+
+def when_ready(server):
+    """Maestro, después del preload y antes de crear los workers."""
+    if _pool_size_derived and server.cfg.threads != threads:
+        server.log.warning(
+            "--threads=%s no coincide con GUNICORN_THREADS=%s: DB_POOL_SIZE=%s no lo sigue; "
+            "definir GUNICORN_THREADS o DB_POOL_SIZE",
+            server.cfg.threads, threads, os.environ['DB_POOL_SIZE'],
+        )
+    if not server.cfg.preload_app:
+        return
+    import app
+
+    app.warm_templates()
+    app.close_connection_pools()
+    # Lo que ya existe pasa a la generación permanente: el recolector de los
+    # workers no lo recorre ni escribe en esas páginas (se mantienen compartidas)
+    gc.collect()
+    gc.freeze()
+    server.log.info(
+        "Aplicación precargada (DB_POOL_SIZE=%s, %s hilos por worker)",
+        os.environ.get('DB_POOL_SIZE'), server.cfg.threads,
+    )
+
+
+def post_fork(server, worker):
+    """Worker recién creado: conexiones propias y métricas en cero."""
+    import app
+
+    app.init_worker()
+
+
+def worker_exit(server, worker):
+    """Worker saliendo: escribe lo que quede en la cola de logs."""
+    import app
+
+    if app.log_pipeline is not None:
+        app.log_pipeline.stop()
@@ -0,0 +1,302 @@
+"""
+Métricas en formato de texto de Prometheus
+Cada worker acumula en memoria y vuelca un snapshot JSON a un directorio
+compartido; el endpoint de métricas combina los snapshots de todos los workers.
+"""
+import json
+import os
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name}: etiquetas esperadas {self.labelnames}, recibidas {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def reset(self):
+        # Candado nuevo: el heredado de un fork pudo quedar tomado
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def describe(self):
+        return {
+            'type': self.type,
+            'help': self.documentation,
+            'labelnames': list(self.labelnames),
+        }
+
+    def snapshot(self):
+        data = self.describe()
+        data['samples'] = self._samples()
+        return data
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [conteo por bucket (no acumulado) + bucket +Inf, suma, total]
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            else:
+                state[0][-1] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            return [[list(key), [list(state[0]), state[1], state[2]]] for key, state in self._values.items()]
+
+    def describe(self):
+        data = super().describe()
+        data['buckets'] = list(self.buckets)
+        return data
+
+
+class CallbackMetric(_Metric):
+    """Valor calculado al momento del snapshot (p. ej. contadores de otro objeto)."""
+
+    def __init__(self, name, documentation, type, callback):
+        super().__init__(name, documentation)
+        self.type = type
+        self.callback = callback
+
+    def _samples(self):
+        return [[[], self.callback()]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f'Métrica duplicada: {metric.name}')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, type, callback):
+        return self._register(CallbackMetric(name, documentation, type, callback))
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self):
+        """Descarta lo acumulado (worker recién creado a partir de un maestro con --preload)."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiProcessStore:
+    """Snapshots por PID en `directory`; combina todos los workers al leer.
+
+    Contadores e histogramas suman también los de workers ya terminados (para
+    que no retrocedan al reciclar workers); los gauges solo de procesos vivos.
+    Los archivos de procesos muertos se borran después de `retention` segundos.
+    """
+
+    def __init__(self, registry, directory, interval=1.0, retention=86400):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.retention = retention
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def maybe_flush(self):
+        """Vuelca el snapshot si pasó `interval` desde el último (barato en el camino caliente)."""
+        now = time.monotonic()
+        if now - self._last_flush < self.interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = now
+            self._write()
+        finally:
+            self._lock.release()
+
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            self._write()
+
+    def _write(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(os.getpid())
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.registry.snapshot(), fh)
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """Snapshot combinado de todos los workers."""
+        merged = {}
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            names = []
+
+        for filename in names:
+            if not filename.endswith('.json'):
+                continue
+            try:
+                pid = int(filename[:-5])
+            except ValueError:
+                continue
+            path = os.path.join(self.directory, filename)
+            alive = _pid_alive(pid)
+            try:
+                if not alive and now - os.path.getmtime(path) > self.retention:
+                    os.remove(path)
+                    continue
+                with open(path, encoding='utf-8') as fh:
+                    snapshot = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            _merge(merged, snapshot, alive)
+        return merged
+
+
+def _merge(merged, snapshot, alive):
+    for name, data in snapshot.items():
+        if data['type'] == 'gauge' and not alive:
+            continue
+        target = merged.setdefault(name, {
+            'type': data['type'],
+            'help': data['help'],
+            'labelnames': data['labelnames'],
+            'buckets': data.get('buckets'),
+            'samples': {},
+        })
+        for labels, value in data['samples']:
+            key = tuple(labels)
+            current = target['samples'].get(key)
+            if data['type'] == 'histogram':
+                counts, total_sum, total_count = value
+                if current is None:
+                    target['samples'][key] = [list(counts), total_sum, total_count]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], counts)]
+                    current[1] += total_sum
+                    current[2] += total_count
+            else:
+                target['samples'][key] = (current or 0) + value
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels_text(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def render_prometheus(merged):
+    """Texto de exposición de Prometheus (versión 0.0.4)."""
+    lines = []
+    for name in sorted(merged):
+        data = merged[name]
+        lines.append(f'# HELP {name} {data["help"]}')
+        lines.append(f'# TYPE {name} {data["type"]}')
+        labelnames = data['labelnames']
+        for key in sorted(data['samples']):
+            value = data['samples'][key]
+            if data['type'] == 'histogram':
+                counts, total_sum, total_count = value
+                cumulative = 0
+                for bound, count in zip(list(data['buckets']) + [float('inf')], counts):
+                    cumulative += count
+                    labels = _labels_text(labelnames, key, ('le', _format_bound(bound)))
+                    lines.append(f'{name}_bucket{labels} {cumulative}')
+                labels = _labels_text(labelnames, key)
+                lines.append(f'{name}_sum{labels} {total_sum}')
+                lines.append(f'{name}_count{labels} {total_count}')
+            else:
+                lines.append(f'{name}{_labels_text(labelnames, key)} {value}')
+    return '\n'.join(lines) + '\n'
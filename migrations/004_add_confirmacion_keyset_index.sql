@@ -0,0 +1,10 @@
+-- Migración 004: índice compuesto para listados paginados por evento
+--
+-- Los listados del admin paginan con keyset sobre (confirmado_en, id):
+--   WHERE id_evento = ? AND (confirmado_en, id) < (?, ?)
+--   ORDER BY confirmado_en DESC, id DESC LIMIT n
+-- Con este índice MySQL recorre solo la página pedida, sin filesort.
+-- Sin filtro de evento se usa idx_confirmado_en (InnoDB agrega id al final).
+
+ALTER TABLE confirmacion_asistencia
+  ADD INDEX idx_evento_confirmado (id_evento, confirmado_en, id);
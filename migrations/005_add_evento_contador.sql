@@ -0,0 +1,26 @@
+-- Migración 005: contadores de confirmaciones por evento
+--
+-- La aplicación incrementa estos contadores en la misma transacción que cada
+-- INSERT en confirmacion_asistencia. Cada evento se reparte en varias filas
+-- (slot) para no serializar las inserciones concurrentes en un solo candado;
+-- los totales son SUM(...) GROUP BY id_evento.
+--
+-- Si alguna vez se desalinean (por ejemplo tras cargas manuales), reconstruir con:
+--   flask --app app reconciliar-contadores
+
+CREATE TABLE IF NOT EXISTS evento_contador (
+    id_evento INT NOT NULL COMMENT 'Referencia al evento',
+    slot TINYINT UNSIGNED NOT NULL COMMENT 'Fila del contador repartido',
+    total_confirmaciones INT NOT NULL DEFAULT 0,
+    total_vehiculos INT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_evento, slot),
+    FOREIGN KEY (id_evento) REFERENCES evento(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Carga inicial desde las confirmaciones existentes
+DELETE FROM evento_contador;
+INSERT INTO evento_contador (id_evento, slot, total_confirmaciones, total_vehiculos)
+SELECT id_evento, 0, COUNT(*), COALESCE(SUM(trae_vehiculo), 0)
+FROM confirmacion_asistencia
+GROUP BY id_evento;
@@ -0,0 +1,20 @@
+-- Migración 006: índices para la búsqueda del admin (/admin/api/buscar)
+--
+-- - ft_nombre_dependencia: FULLTEXT sobre nombre y dependencia; la app busca
+--   en modo booleano con prefijos ('+hern*') y ordena por relevancia.
+-- - idx_email / idx_placas: índices de prefijo para LIKE 'término%' sobre
+--   correo y placas (los primeros caracteres bastan para ser selectivos).
+--
+-- Las columnas usan utf8mb4_unicode_ci, así que tanto el FULLTEXT como los
+-- LIKE ignoran acentos y mayúsculas ('jose' encuentra 'José').
+--
+-- Las palabras de menos de innodb_ft_min_token_size (3 por omisión) no se
+-- indexan; la app las descarta de la consulta. Crear el FULLTEXT reconstruye
+-- la tabla: en producción conviene correrla fuera del horario de registro.
+
+ALTER TABLE confirmacion_asistencia
+  ADD FULLTEXT INDEX ft_nombre_dependencia (nombre_completo, dependencia);
+
+ALTER TABLE confirmacion_asistencia
+  ADD INDEX idx_email (email(20)),
+  ADD INDEX idx_placas (vehiculo_placas(8));
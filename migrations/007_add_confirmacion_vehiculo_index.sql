@@ -0,0 +1,11 @@
+-- Migración 007: índice para el reporte de vehículos (/admin/reporte-vehiculos)
+--
+-- Los desgloses por modelo y color agrupan solo las confirmaciones con
+-- vehículo de un evento:
+--   WHERE id_evento = ? AND trae_vehiculo = TRUE GROUP BY vehiculo_color
+-- Con este índice MySQL los resuelve leyendo solo el índice (covering), sin
+-- tocar las filas de la tabla. Los totales por evento y ubicación salen de
+-- evento_contador (migración 005).
+
+ALTER TABLE confirmacion_asistencia
+  ADD INDEX idx_evento_vehiculo (id_evento, trae_vehiculo, vehiculo_modelo, vehiculo_color);
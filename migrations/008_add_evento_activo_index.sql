@@ -0,0 +1,13 @@
+-- Migración 008: índice para buscar el evento activo más reciente
+--
+-- La página principal y la caché de eventos consultan:
+--   WHERE activo = TRUE ORDER BY creado_en DESC LIMIT 1
+-- Con idx_activo solo se filtraba y MySQL ordenaba los eventos activos
+-- (filesort); con (activo, creado_en) lee la primera entrada del índice.
+-- idx_activo queda cubierto por el prefijo del índice nuevo.
+--
+-- Detectado por revisar_planes.py.
+
+ALTER TABLE evento
+  DROP INDEX idx_activo,
+  ADD INDEX idx_activo_creado (activo, creado_en);
@@ -0,0 +1,380 @@
+"""
+Pool de conexiones MySQL con espera, desborde acotado y reciclaje
+Sustituye a mysql.connector.pooling.MySQLConnectionPool, que falla de
+inmediato con PoolError cuando todas las conexiones están ocupadas.
+"""
+import collections
+import logging
+import os
+import threading
+import time
+import weakref
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(PoolError):
+    """No se liberó ninguna conexión dentro del tiempo de espera."""
+
+
+def _register_fork_reset(pool):
+    # Referencia débil: el hook vive lo que el proceso, el pool no necesariamente
+    ref = weakref.ref(pool)
+
+    def after_in_child():
+        pool = ref()
+        if pool is not None:
+            pool._after_fork()
+
+    os.register_at_fork(after_in_child=after_in_child)
+
+
+class _Record:
+    __slots__ = ('conn', 'created_at', 'last_used', 'statements')
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        # Cursores preparados por (sql, dictionary); viven lo que la conexión física
+        self.statements = {}
+
+
+class PooledConnection:
+    """Conexión prestada por el pool: `close()` la devuelve en lugar de cerrarla."""
+
+    def __init__(self, pool, record):
+        self._pool = pool
+        self._record = record
+
+    def prepared_cursor(self, sql, dictionary=False):
+        """Cursor con `sql` preparado en el servidor, cacheado en esta conexión física.
+
+        El cursor solo evita el PREPARE si se le pasa el mismo objeto `sql`
+        (compara por identidad), así que conviene usar constantes de módulo.
+        """
+        record = self._record
+        if record is None:
+            raise AttributeError('Conexión ya devuelta al pool (prepared_cursor)')
+        key = (sql, dictionary)
+        cursor = record.statements.get(key)
+        if cursor is None:
+            cursor = record.conn.cursor(prepared=True, dictionary=dictionary)
+            record.statements[key] = cursor
+            self._pool.prepares += 1
+        return cursor
+
+    def forget_prepared(self, sql, dictionary=False):
+        """Descarta el cursor cacheado (el servidor ya no conoce su statement)."""
+        if self._record is not None:
+            self._record.statements.pop((sql, dictionary), None)
+
+    def close(self):
+        record, self._record = self._record, None
+        if record is not None:
+            self._pool._release(record)
+
+    def __getattr__(self, name):
+        if self._record is None:
+            raise AttributeError(f'Conexión ya devuelta al pool ({name})')
+        return getattr(self._record.conn, name)
+
+
+class ElasticPool:
+    """Pool con cola de espera y conexiones de desborde.
+
+    - Hasta `pool_size` conexiones permanentes y `max_overflow` adicionales
+      bajo ráfagas; las de desborde se cierran tras `idle_timeout` sin uso.
+    - Si todas están ocupadas, `get_connection()` espera hasta `timeout`
+      segundos antes de lanzar PoolTimeout (subclase de PoolError).
+    - Solo se hace ping a conexiones que estuvieron inactivas más de
+      `pre_ping_idle` segundos, en lugar de resetear la sesión en cada uso.
+    - Las conexiones con más de `recycle` segundos de vida se reemplazan.
+    - Cada conexión física guarda sus sentencias preparadas; una conexión
+      nueva (reciclada o reabierta) empieza sin ninguna y `reset_session`
+      vacía la caché, porque RESET CONNECTION libera los statements.
+    - Tras un fork (Gunicorn con --preload) el hijo empieza vacío y abre
+      sus propias conexiones; las heredadas quedan para el padre.
+    """
+
+    def __init__(self, connect_kwargs, pool_size=5, max_overflow=10, timeout=10.0,
+                 recycle=1800.0, pre_ping_idle=30.0, idle_timeout=60.0, reset_session=False):
+        self.connect_kwargs = dict(connect_kwargs)
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping_idle = pre_ping_idle
+        self.idle_timeout = idle_timeout
+        self.reset_session = reset_session
+
+        self._cond = threading.Condition()
+        # LIFO: se reutiliza la más reciente y las del fondo pueden expirar
+        self._idle = collections.deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self.timeouts = 0
+        self.prepares = 0
+        self._inherited = []
+        if hasattr(os, 'register_at_fork'):
+            _register_fork_reset(self)
+
+    # ------------------------------------------------------------------
+    # Préstamo y devolución
+    # ------------------------------------------------------------------
+
+    def get_connection(self):
+        deadline = time.monotonic() + self.timeout
+        record = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    record = self._idle.pop()
+                    break
+                if self._open < self.pool_size + self.max_overflow:
+                    # Reservar el lugar; la conexión se abre fuera del candado
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'Sin conexiones libres tras {self.timeout:.1f}s '
+                        f'(pool_size={self.pool_size} max_overflow={self.max_overflow})'
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._in_use += 1
+
+        try:
+            record = self._connect() if record is None else self._validate(record)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, record)
+
+    def _release(self, record):
+        conn = record.conn
+        discard = False
+        try:
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+            if self.reset_session:
+                record.statements.clear()
+                conn.cmd_reset_connection()
+        except Exception:
+            logger.warning("Conexión descartada al devolverla al pool", exc_info=True)
+            discard = True
+
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._open -= 1
+            else:
+                record.last_used = now
+                self._idle.append(record)
+            # Cerrar desborde inactivo (las del frente son las menos usadas)
+            while (self._open > self.pool_size and self._idle
+                   and now - self._idle[0].last_used > self.idle_timeout):
+                expired.append(self._idle.popleft())
+                self._open -= 1
+            self._cond.notify()
+
+        if discard:
+            expired.append(record)
+        for old in expired:
+            self._close_quietly(old.conn)
+
+    # ------------------------------------------------------------------
+    # Conexiones físicas
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        return _Record(mysql.connector.connect(**self.connect_kwargs))
+
+    def _validate(self, record):
+        now = time.monotonic()
+        if self.recycle and now - record.created_at > self.recycle:
+            self._close_quietly(record.conn)
+            return self._connect()
+        if now - record.last_used > self.pre_ping_idle:
+            try:
+                record.conn.ping(reconnect=False)
+            except Exception:
+                logger.info("Conexión inactiva sin respuesta; se reabre")
+                self._close_quietly(record.conn)
+                return self._connect()
+        return record
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def warm_up(self, count):
+        """Abre `count` conexiones por adelantado (valida credenciales al arrancar)."""
+        opened = []
+        try:
+            for _ in range(min(count, self.pool_size)):
+                opened.append(self.get_connection())
+        finally:
+            for conn in opened:
+                conn.close()
+        return len(opened)
+
+    def dispose(self):
+        """Cierra las conexiones inactivas (las prestadas se cierran al devolverse)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for record in idle:
+            self._close_quietly(record.conn)
+
+    def _after_fork(self):
+        """En el proceso hijo: olvidar las conexiones del padre sin cerrarlas.
+
+        Cerrarlas mandaría COM_QUIT (y el socket de mysql-connector hace
+        shutdown al recolectarse) por la misma conexión TCP que el padre sigue
+        usando, así que se conservan referenciadas y sin tocar.
+        """
+        self._inherited.extend(self._idle)
+        # El candado heredado pudo quedar tomado por un hilo que no existe en el hijo
+        self._cond = threading.Condition()
+        self._idle = collections.deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self.timeouts = 0
+        self.prepares = 0
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'timeouts': self.timeouts,
+                'prepares': self.prepares,
+            }
+
+
+class ReplicaHealth:
+    """Estado de una réplica de lectura, revisado como máximo cada `interval` s.
+
+    La revisión la hace el primer hilo que la encuentra vencida (los demás
+    usan el último estado conocido) con SHOW REPLICA STATUS: la réplica deja
+    de usarse si no responde, si la replicación está detenida o si su retraso
+    supera `max_lag` segundos. Un servidor sin replicación configurada o un
+    usuario sin privilegio REPLICATION CLIENT se consideran sanos (retraso
+    desconocido). `mark_down()` la aparta hasta la siguiente revisión.
+    """
+
+    # Códigos que indican que la conexión con la réplica se perdió
+    CONNECTION_ERRORS = (2003, 2006, 2013, 2055)
+
+    def __init__(self, pool, max_lag=5.0, interval=5.0):
+        self.pool = pool
+        self.max_lag = max_lag
+        self.interval = interval
+        self.healthy = True
+        self.lag = None
+        self.reason = None
+        self.fallbacks = 0
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def usable(self):
+        if time.monotonic() >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._check()
+            finally:
+                self._lock.release()
+        return self.healthy
+
+    def mark_down(self, reason):
+        if self.healthy:
+            logger.warning("Réplica apartada hasta la siguiente revisión: %s", reason)
+        self.healthy = False
+        self.reason = str(reason)
+        self._next_check = time.monotonic() + self.interval
+
+    def _check(self):
+        self._next_check = time.monotonic() + self.interval
+        try:
+            lag = self._read_lag()
+        except mysql.connector.Error as e:
+            self.mark_down(e)
+            return
+        if lag == 'stopped':
+            self.lag = None
+            self.mark_down('replicación detenida')
+            return
+        self.lag = lag
+        if lag is not None and lag > self.max_lag:
+            self.mark_down(f'retraso de {lag}s (máximo {self.max_lag:g}s)')
+        else:
+            if not self.healthy:
+                logger.info("Réplica disponible de nuevo (retraso=%s)", lag)
+            self.healthy = True
+            self.reason = None
+
+    def _read_lag(self):
+        """Segundos de retraso, None si no se puede medir o 'stopped'."""
+        conn = self.pool.get_connection()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except mysql.connector.ProgrammingError as e:
+                    if e.errno == 1064:
+                        # MySQL < 8.0.22
+                        cursor.execute("SHOW SLAVE STATUS")
+                    elif e.errno == 1227:
+                        # Sin REPLICATION CLIENT: no se puede medir el retraso
+                        return None
+                    else:
+                        raise
+                row = cursor.fetchone()
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        if 'Seconds_Behind_Source' in row:
+            lag = row['Seconds_Behind_Source']
+        else:
+            lag = row.get('Seconds_Behind_Master')
+        return 'stopped' if lag is None else int(lag)
+
+    def stats(self):
+        return {
+            'healthy': self.healthy,
+            'lag': self.lag,
+            'max_lag': self.max_lag,
+            'reason': self.reason,
+            'fallbacks': self.fallbacks,
+        }
@@ -0,0 +1,233 @@
+"""
+Logging sin bloquear la request y seguro con varios procesos
+- Los handlers reales (archivo y consola) corren en un QueueListener: el
+  hilo de la request solo formatea el mensaje y lo encola.
+- Todos los workers escriben al mismo archivo en modo append (una escritura
+  por línea) y la rotación diaria se coordina con flock: el primero que
+  escribe después de medianoche renombra el archivo y los demás, al ver la
+  fecha nueva, solo lo reabren; no se pierden ni se mezclan líneas.
+- Salida opcional en JSON (una línea por registro).
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import time
+from datetime import date, datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import fcntl
+except ImportError:  # Windows (desarrollo): sin candado entre procesos
+    fcntl = None
+
+# Atributos estándar de LogRecord; el resto son campos de `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por línea: ts, level, pid, logger, msg, campos de `extra` y exc."""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'pid': record.process,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SharedRotatingFileHandler(logging.FileHandler):
+    """Archivo compartido entre procesos con rotación diaria (app.log.AAAA-MM-DD).
+
+    El día del archivo actual se guarda en `app.log.lock`. Cuando un proceso
+    ve que cambió la fecha, toma flock sobre ese archivo: si el día guardado
+    es anterior, renombra app.log; si otro proceso ya lo hizo, solo reabre.
+    Entre cambios de día, escribir no cuesta ninguna llamada extra.
+    """
+
+    def __init__(self, filename, backup_count=14, encoding='utf-8'):
+        super().__init__(filename, mode='a', encoding=encoding, delay=True)
+        self.backup_count = backup_count
+        self.lock_path = f'{self.baseFilename}.lock'
+        self.rotations = 0
+        self._day = None
+
+    def emit(self, record):
+        try:
+            if self._day != date.today():
+                self._check_rotation()
+        except Exception:
+            self.handleError(record)
+        super().emit(record)
+
+    def _check_rotation(self):
+        today = date.today()
+        with open(self.lock_path, 'a+', encoding='utf-8') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            lock.seek(0)
+            try:
+                file_day = date.fromisoformat(lock.read().strip())
+            except ValueError:
+                # Primera vez: el día del archivo existente es el de su última escritura
+                try:
+                    file_day = date.fromtimestamp(os.stat(self.baseFilename).st_mtime)
+                except FileNotFoundError:
+                    file_day = today
+            if file_day < today and os.path.exists(self.baseFilename):
+                dest = f'{self.baseFilename}.{file_day.isoformat()}'
+                if os.path.exists(dest):
+                    dest = f'{dest}.{int(time.time())}'
+                os.rename(self.baseFilename, dest)
+                self.rotations += 1
+                self._delete_old()
+            if file_day != today:
+                lock.truncate(0)
+                lock.write(today.isoformat())
+        # Rotado por este u otro proceso: la próxima escritura abre el archivo nuevo
+        if self.stream is not None:
+            try:
+                same = os.fstat(self.stream.fileno()).st_ino == os.stat(self.baseFilename).st_ino
+            except FileNotFoundError:
+                same = False
+            if not same:
+                self.stream.close()
+                self.stream = None
+        self._day = today
+
+    def _delete_old(self):
+        if self.backup_count <= 0:
+            return
+        directory, base = os.path.split(self.baseFilename)
+        prefix = f'{base}.'
+        backups = sorted(
+            name for name in os.listdir(directory)
+            if name.startswith(prefix) and name != os.path.basename(self.lock_path)
+        )
+        for name in backups[:-self.backup_count]:
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que cuenta (en vez de reportar) los registros que no caben en la cola."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Como QueueHandler.prepare, pero el traceback queda en exc_text (no
+        # pegado al mensaje) para que JsonFormatter lo ponga en su propio campo
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Cola + QueueListener del proceso, reiniciados después de un fork.
+
+    Con --preload el maestro configura el logging; el hilo del listener no
+    sobrevive al fork, así que cada hijo crea su propia cola y su hilo.
+    """
+
+    def __init__(self, handlers, max_queue):
+        self.handlers = handlers
+        self.max_queue = max_queue
+        self.queue_handler = DroppingQueueHandler(queue.Queue(max_queue))
+        self.listener = None
+
+    def start(self):
+        self.listener = QueueListener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        """Vacía la cola y detiene el hilo (al salir del proceso)."""
+        listener, self.listener = self.listener, None
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+        for handler in self.handlers:
+            handler.flush()
+
+    def _after_fork(self):
+        # La cola heredada puede tener candados tomados por hilos que no existen aquí
+        self.queue_handler.queue = queue.Queue(self.max_queue)
+        self.queue_handler.dropped = 0
+        for handler in self.handlers:
+            if isinstance(handler, logging.FileHandler) and handler.stream is not None:
+                handler.stream.close()
+                handler.stream = None
+        self.start()
+
+    def stats(self):
+        return {
+            'queued': self.queue_handler.queue.qsize(),
+            'max_queue': self.max_queue,
+            'dropped': self.queue_handler.dropped,
+        }
+
+
+def configure_logging(level, log_file, backup_count=14, json_output=False, use_queue=True, max_queue=10000):
+    """Configura el logger raíz; devuelve el LogPipeline (None si use_queue=False).
+
+    No duplica handlers si ya se configuró (recarga del módulo, Gunicorn).
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    if any(getattr(h, '_registro', False) for h in root.handlers):
+        return next((h._pipeline for h in root.handlers if getattr(h, '_registro', False)), None)
+
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    if json_output:
+        fmt = JsonFormatter()
+    else:
+        fmt = logging.Formatter('%(asctime)s %(levelname)s pid=%(process)d %(name)s: %(message)s')
+
+    handlers = [SharedRotatingFileHandler(log_file, backup_count=backup_count), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setLevel(level)
+        handler.setFormatter(fmt)
+
+    if not use_queue:
+        for handler in handlers:
+            handler._registro = True
+            handler._pipeline = None
+            root.addHandler(handler)
+        return None
+
+    pipeline = LogPipeline(handlers, max_queue)
+    pipeline.queue_handler._registro = True
+    pipeline.queue_handler._pipeline = pipeline
+    root.addHandler(pipeline.queue_handler)
+    pipeline.start()
+    os.register_at_fork(after_in_child=pipeline._after_fork)
+    atexit.register(pipeline.stop)
+    return pipeline
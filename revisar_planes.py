@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Revisión de planes de ejecución de las consultas de app.py
+Crea una base temporal en el MySQL de .env, carga schema.sql y las
+migraciones, la llena con datos sintéticos y recorre las rutas de la app
+(cliente de pruebas de Flask con sesión de admin) registrando cada sentencia
+que ejecuta InstrumentedCursor, con sus parámetros reales. Después corre
+EXPLAIN FORMAT=JSON sobre cada SELECT/UPDATE/DELETE/INSERT ... SELECT y
+falla (exit 1) si alguna hace un recorrido completo de tabla, filesort o
+tabla temporal que no esté en PERMITIDOS.
+
+También avisa de:
+- migraciones que agregan algo que schema.sql no tiene
+- llamadas a execute() de app.py que ninguna ruta recorrió
+- entradas de PERMITIDOS que ya no hacen falta
+(con --estricto, las dos últimas también fallan).
+
+Requiere un usuario con permiso para CREATE/DROP DATABASE. La base se
+borra al terminar (salvo --conservar) y nunca puede ser la de DB_NAME.
+
+Uso:
+    python revisar_planes.py [--base confirmacion_planes] [--eventos 200]
+        [--filas 30000] [--estricto] [--conservar] [--detalle]
+"""
+import argparse
+import ast
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+import mysql.connector
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(BASE_DIR, 'app.py')
+
+FULL_SCAN = 'full_scan'
+FILESORT = 'filesort'
+TEMPORARY = 'temporary'
+
+# (función de app.py, problema, tabla o '*', motivo). Cada entrada nueva
+# necesita un motivo que explique por qué el plan es aceptable.
+PERMITIDOS = (
+    ('admin_panel', FULL_SCAN, 'e', 'Lista todos los eventos (decenas de filas), sin LIMIT'),
+    ('admin_panel', FILESORT, '*', 'Lista todos los eventos (decenas de filas), sin LIMIT'),
+    ('fetch_eventos_resumen', FULL_SCAN, 'evento', 'Lista todos los eventos para los filtros'),
+    ('fetch_eventos_resumen', FILESORT, '*', 'Lista todos los eventos para los filtros'),
+    ('ver_todas_confirmaciones', FULL_SCAN, 'evento_contador', 'Total global: suma eventos × CONTADOR_SLOTS filas'),
+    ('buscar_confirmaciones', TEMPORARY, '*', 'Suma la relevancia por id de como máximo BUSQUEDA_MAX_RESULTADOS filas'),
+    ('buscar_confirmaciones', FILESORT, '*', 'Ordena por relevancia (no hay índice posible)'),
+    ('fetch_reporte_vehiculos', FULL_SCAN, 'e', 'Agrupa los eventos por ubicación'),
+    ('fetch_reporte_vehiculos', FULL_SCAN, 'c', "Alcance 'todo': recorre todas las confirmaciones; cacheado REPORTE_CACHE_TTL"),
+    ('fetch_reporte_vehiculos', TEMPORARY, '*', 'GROUP BY de agregados (ubicación, modelo/color normalizado, periodo)'),
+    ('fetch_reporte_vehiculos', FILESORT, '*', 'Ordena los grupos por total o por periodo'),
+    ('reconciliar_contadores', FULL_SCAN, '*', 'Mantenimiento: recalcula todos los eventos'),
+    ('crear_evento', FULL_SCAN, 'evento', 'Desactiva todos los eventos (decenas de filas)'),
+    ('activar_evento', FULL_SCAN, 'evento', 'Desactiva todos los eventos (decenas de filas)'),
+    ('editar_evento', FULL_SCAN, 'evento', 'Desactiva los demás eventos (id <> %s)'),
+)
+
+# Errores de una migración que ya está incluida en schema.sql
+YA_APLICADA = {
+    1050,  # ER_TABLE_EXISTS_ERROR
+    1060,  # ER_DUP_FIELDNAME
+    1061,  # ER_DUP_KEYNAME
+    1091,  # ER_CANT_DROP_FIELD_OR_KEY
+    1826,  # ER_FK_DUP_NAME
+}
+
+EXPLICABLES = ('SELECT', 'UPDATE', 'DELETE')
+
+Captura = namedtuple('Captura', 'funcion linea sql params')
+
+NOMBRES = ('José', 'María', 'Ángel', 'Sofía', 'Raúl', 'Inés', 'Jesús', 'Lucía', 'Andrés', 'Verónica')
+APELLIDOS = ('Hernández', 'López', 'Martínez', 'González', 'Pérez', 'Sánchez', 'Ramírez', 'Díaz')
+DEPENDENCIAS = ('Dirección General de Cómputo', 'Facultad de Estudios Superiores Aragón',
+                'Secretaría Administrativa', 'Coordinación de Humanidades', 'Instituto de Ingeniería')
+MODELOS = ('Versa', 'Aveo', 'Jetta', 'March', 'Corolla', 'CX-5', 'Rio', 'Sentra')
+COLORES = ('Gris', 'Blanco', 'Negro', 'Rojo', 'Azul', 'Plata')
+
+
+# ----------------------------------------------------------------------------
+# Esquema
+# ----------------------------------------------------------------------------
+
+def sentencias_sql(texto):
+    """Sentencias de un archivo .sql (sin comentarios `--`, separadas por `;` al final de línea)."""
+    sentencias = []
+    actual = []
+    for linea in texto.splitlines():
+        if linea.strip().startswith('--'):
+            continue
+        actual.append(linea)
+        if linea.rstrip().endswith(';'):
+            sentencia = '\n'.join(actual).strip().rstrip(';').strip()
+            if sentencia:
+                sentencias.append(sentencia)
+            actual = []
+    resto = '\n'.join(actual).strip()
+    if resto:
+        sentencias.append(resto)
+    return sentencias
+
+
+def cargar_esquema(conn):
+    """schema.sql y luego cada migración; devuelve las migraciones que schema.sql no tenía."""
+    cursor = conn.cursor()
+    with open(os.path.join(BASE_DIR, 'schema.sql'), encoding='utf-8') as fh:
+        for sentencia in sentencias_sql(fh.read()):
+            # La base la elige este script
+            if re.match(r'(CREATE\s+DATABASE|USE)\b', sentencia, re.I):
+                continue
+            cursor.execute(sentencia)
+
+    faltantes = []
+    directorio = os.path.join(BASE_DIR, 'migrations')
+    for nombre in sorted(os.listdir(directorio)):
+        if not nombre.endswith('.sql'):
+            continue
+        with open(os.path.join(directorio, nombre), encoding='utf-8') as fh:
+            sentencias = sentencias_sql(fh.read())
+        for sentencia in sentencias:
+            try:
+                cursor.execute(sentencia)
+            except mysql.connector.Error as e:
+                if e.errno not in YA_APLICADA:
+                    raise
+                continue
+            if re.match(r'(ALTER|CREATE)\b', sentencia, re.I) and not re.match(r'CREATE\s+TABLE\s+IF\s+NOT\s+EXISTS', sentencia, re.I):
+                faltantes.append((nombre, ' '.join(sentencia.split())[:100]))
+    conn.commit()
+    cursor.close()
+    return faltantes
+
+
+def sembrar(app, eventos, filas):
+    """Eventos y confirmaciones sintéticas; devuelve {'activo', 'grande', 'ids'}."""
+    rnd = random.Random(42)
+    ubicaciones = list(app.PREDEFINED_LOCATIONS)
+    ahora = datetime.now().replace(microsecond=0)
+    ids = []
+    with app.db_transaction() as (_, cursor):
+        for i in range(eventos):
+            key = ubicaciones[i % len(ubicaciones)]
+            ubicacion = app.PREDEFINED_LOCATIONS[key]
+            cursor.execute("""
+                INSERT INTO evento (slug, titulo, lugar, ubicacion_key, ubicacion_nombre,
+                                    ubicacion_lat, ubicacion_lng, activo, creado_en)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, FALSE, %s)
+            """, (
+                f'planes-{i}', f'Evento sintético {i}', ubicacion['nombre'], key, ubicacion['nombre'],
+                ubicacion['lat'], ubicacion['lng'], ahora - timedelta(days=eventos - i),
+            ))
+            ids.append(cursor.lastrowid)
+        cursor.execute("SELECT slug FROM evento WHERE activo = TRUE ORDER BY creado_en DESC LIMIT 1")
+        activo = cursor.fetchone()
+
+    # Distribución sesgada: pocos eventos concentran la mayoría de las filas
+    pesos = [1.0 / (n + 1) for n in range(len(ids))]
+    for inicio in range(0, filas, 1000):
+        params = []
+        for i in range(inicio, min(inicio + 1000, filas)):
+            trae = i % 3 == 0
+            params.append((
+                rnd.choices(ids, pesos)[0], rnd.choice(DEPENDENCIAS), 'Puesto', 'Lic.',
+                f'{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)} {i}',
+                f'persona{i}@unam.mx', trae,
+                rnd.choice(MODELOS) if trae else None, rnd.choice(COLORES) if trae else None,
+                f"{rnd.choice(('ABC', 'XYZ', 'MEX'))}{i % 10000:04d}" if trae else None,
+                '127.0.0.1', 'revisar_planes',
+            ))
+        with app.db_transaction() as (_, cursor):
+            app.insert_confirmaciones_chunk(cursor, params)
+
+    with app.db_transaction() as (_, cursor):
+        # confirmado_en repartido en 90 días (NOW() las dejaría todas iguales) y
+        # algunas NULL como las filas anteriores a la columna
+        cursor.execute("""
+            UPDATE confirmacion_asistencia
+            SET confirmado_en = IF(id % 50 = 0, NULL,
+                NOW() - INTERVAL (id % 90) DAY - INTERVAL (id * 37 % 86400) SECOND)
+        """)
+    with app.db_cursor(primary=True) as (_, cursor):
+        cursor.execute("ANALYZE TABLE evento, confirmacion_asistencia, evento_contador")
+        cursor.fetchall()
+
+    return {'activo': activo[0] if activo else None, 'grande': 'planes-0', 'ids': ids}
+
+
+# ----------------------------------------------------------------------------
+# Captura de sentencias
+# ----------------------------------------------------------------------------
+
+INTERNAS = frozenset(('_timed', 'execute', 'executemany', 'execute_prepared'))
+
+
+def sitio_de_llamada(frame):
+    """(función, línea) de app.py que pidió la sentencia, saltando InstrumentedCursor."""
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename == APP_FILE and code.co_name not in INTERNAS:
+            return code.co_name, frame.f_lineno
+        frame = frame.f_back
+    return '?', 0
+
+
+def capturar(app, capturas):
+    """Registra en `capturas` cada sentencia que pasa por InstrumentedCursor."""
+    original = app.InstrumentedCursor._timed
+
+    def _timed(self, method, *args, **kwargs):
+        if args:
+            funcion, linea = sitio_de_llamada(sys._getframe(1))
+            capturas.append(Captura(funcion, linea, args[0], args[1] if len(args) > 1 else None))
+        return original(self, method, *args, **kwargs)
+
+    app.InstrumentedCursor._timed = _timed
+
+
+def sitios_sql():
+    """Llamadas a execute/executemany/execute_prepared en app.py: (función, línea, línea final)."""
+    with open(APP_FILE, encoding='utf-8') as fh:
+        tree = ast.parse(fh.read())
+    sitios = []
+
+    def visitar(nodo, funcion):
+        for hijo in ast.iter_child_nodes(nodo):
+            if isinstance(hijo, ast.ClassDef) and hijo.name == 'InstrumentedCursor':
+                continue
+            if isinstance(hijo, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                visitar(hijo, hijo.name)
+                continue
+            if (isinstance(hijo, ast.Call) and isinstance(hijo.func, ast.Attribute)
+                    and hijo.func.attr in INTERNAS and funcion is not None):
+                sitios.append((funcion, hijo.lineno, hijo.end_lineno))
+            visitar(hijo, funcion)
+
+    visitar(tree, None)
+    return sitios
+
+
+def recorrer_rutas(app, datos):
+    """Ejercita cada ruta con SQL (lecturas primero, escrituras al final)."""
+    client = app.app.test_client()
+    with client.session_transaction() as sess:
+        sess['is_admin'] = True
+
+    grande = datos['grande']
+    evento_id = datos['ids'][0]
+    desde = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    hasta = datetime.now().strftime('%Y-%m-%d')
+    cursor = app.encode_keyset_cursor({'confirmado_en': datetime.now() - timedelta(days=10), 'id': 10 ** 9})
+
+    lecturas = [
+        '/',
+        f"/evento/{datos['activo'] or grande}",
+        '/admin',
+        f'/admin?slug={grande}',
+        f'/admin?slug={grande}&vehiculo=si&desde={desde}&cursor={cursor}',
+        '/admin/todas-confirmaciones',
+        f'/admin/todas-confirmaciones?evento={grande}',
+        f'/admin/todas-confirmaciones?vehiculo=no&desde={desde}&hasta={hasta}',
+        f'/admin/todas-confirmaciones?cursor={cursor}',
+        '/admin/todas-confirmaciones?cursor=null-500',
+        '/admin/todas-confirmaciones?q=jose+hernandez',
+        f'/admin/todas-confirmaciones?q=hern&evento={grande}&pagina=2',
+        '/admin/api/confirmaciones',
+        f'/admin/api/confirmaciones?evento={grande}&cursor={cursor}',
+        '/admin/api/buscar?q=persona12',
+        '/admin/api/buscar?q=persona777@unam.mx',
+        '/admin/api/buscar?q=abc-12',
+        f'/admin/api/buscar?q=mar+lop&vehiculo=si&desde={desde}',
+        f'/admin/export?slug={grande}',
+        '/admin/reporte-vehiculos',
+        '/admin/reporte-vehiculos?ubicacion=duacyd&intervalo=hora',
+        f'/admin/api/reporte-vehiculos?evento={grande}',
+        f'/admin/evento/{evento_id}/editar',
+    ]
+    for url in lecturas:
+        response = client.get(url)
+        response.get_data()
+        response.close()
+
+    # El trabajo corre en otro hilo: hay que esperarlo para que la consulta de
+    # iter_export_rows quede capturada
+    response = client.post('/admin/exportaciones', data={'slug': grande, 'formato': 'csv'})
+    job_id = ((response.get_json() or {}).get('job') or {}).get('id')
+    if not job_id:
+        sys.exit(f"❌ /admin/exportaciones no creó el trabajo ({response.status_code}): {response.get_data(as_text=True)}")
+    job = None
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        job = app.export_jobs.get(job_id)
+        if job is None or job['estado'] in ('listo', 'error'):
+            break
+        time.sleep(0.2)
+    if job is None or job['estado'] != 'listo':
+        detalle = 'no existe' if job is None else f"quedó en '{job['estado']}'"
+        if job and job.get('error'):
+            detalle += f": {job['error']}"
+        sys.exit(f"❌ La exportación {job_id} no terminó: {detalle}")
+
+    activo_id = datos['ids'][-1]
+    ubicacion = next(iter(app.PREDEFINED_LOCATIONS))
+    client.post('/api/confirmacion', json={
+        'id_evento': evento_id, 'trae_vehiculo': 'no', 'dependencia': 'Facultad de Química',
+        'puesto': 'Docente', 'grado': 'Lic.', 'nombre_completo': 'Persona Revisión Planes',
+        'email': 'revision.planes@unam.mx',
+    })
+    # La fila repetida hace fallar el INSERT multi-fila y pasa al de fila por fila
+    importada = json.dumps({'dependencia': 'DGTIC', 'puesto': 'Jefe', 'grado': 'Ing.',
+                            'nombre_completo': 'Importada Planes', 'email': 'importada@unam.mx',
+                            'trae_vehiculo': 'no'})
+    client.post(
+        f'/admin/evento/{evento_id}/importar',
+        data=f'{importada}\n{importada}\n',
+        content_type='application/x-ndjson',
+    ).get_data()
+    client.post('/admin/evento/crear', data={
+        'slug': 'planes-nuevo', 'titulo': 'Evento nuevo', 'ubicacion_key': ubicacion, 'activo': 'on',
+    })
+    client.post(f'/admin/evento/{activo_id}/editar', data={
+        'slug': f'planes-{len(datos["ids"]) - 1}', 'titulo': 'Evento editado',
+        'ubicacion_key': ubicacion, 'activo': 'on',
+    })
+    client.post(f'/admin/evento/{evento_id}/activar')
+    client.post(f'/admin/evento/{evento_id}/desactivar')
+    app.reconciliar_contadores(evento_id)
+    app.reconciliar_contadores()
+
+
+# ----------------------------------------------------------------------------
+# Planes
+# ----------------------------------------------------------------------------
+
+def explicable(sql):
+    verbo = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    return verbo in EXPLICABLES or (verbo == 'INSERT' and re.search(r'\bSELECT\b', sql, re.I) is not None)
+
+
+def _primera_tabla(nodo):
+    if isinstance(nodo, dict):
+        if 'table_name' in nodo:
+            return nodo['table_name']
+        valores = nodo.values()
+    elif isinstance(nodo, list):
+        valores = nodo
+    else:
+        return None
+    for valor in valores:
+        tabla = _primera_tabla(valor)
+        if tabla is not None:
+            return tabla
+    return None
+
+
+def problemas_del_plan(plan):
+    """{(problema, tabla)} de un EXPLAIN FORMAT=JSON ya decodificado.
+
+    No cuenta el recorrido de tablas derivadas ya materializadas ni la tabla
+    temporal de la materialización misma: son resultados intermedios.
+    """
+    problemas = set()
+
+    def visitar(nodo, clave=None):
+        if isinstance(nodo, list):
+            for valor in nodo:
+                visitar(valor, clave)
+            return
+        if not isinstance(nodo, dict):
+            return
+        tabla = nodo.get('table_name')
+        if (tabla and nodo.get('access_type') == 'ALL' and not tabla.startswith('<')
+                and 'materialized_from_subquery' not in nodo):
+            problemas.add((FULL_SCAN, tabla))
+        if nodo.get('using_filesort'):
+            problemas.add((FILESORT, _primera_tabla(nodo) or '?'))
+        if nodo.get('using_temporary_table') and clave != 'materialized_from_subquery':
+            problemas.add((TEMPORARY, _primera_tabla(nodo) or '?'))
+        for subclave, valor in nodo.items():
+            visitar(valor, subclave)
+
+    visitar(plan)
+    return problemas
+
+
+def permitido(funcion, problema, tabla):
+    for entrada in PERMITIDOS:
+        if entrada[0] == funcion and entrada[1] == problema and entrada[2] in ('*', tabla):
+            return entrada
+    return None
+
+
+def explicar(conn, sql, params):
+    cursor = conn.cursor()
+    try:
+        if params is None:
+            cursor.execute(f'EXPLAIN FORMAT=JSON {sql}')
+        else:
+            cursor.execute(f'EXPLAIN FORMAT=JSON {sql}', params)
+        return json.loads(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+
+def revisar(conn, capturas):
+    """Una fila por sentencia distinta: (captura, problemas, no_permitidos, permitidos_usados)."""
+    vistas = {}
+    for captura in capturas:
+        if explicable(captura.sql):
+            vistas.setdefault((captura.funcion, ' '.join(captura.sql.split())), captura)
+
+    resultados = []
+    for captura in vistas.values():
+        plan = explicar(conn, captura.sql, captura.params)
+        problemas = problemas_del_plan(plan)
+        no_permitidos = []
+        usados = []
+        for problema, tabla in sorted(problemas):
+            entrada = permitido(captura.funcion, problema, tabla)
+            if entrada is None:
+                no_permitidos.append((problema, tabla))
+            else:
+                usados.append(entrada)
+        resultados.append((captura, plan, problemas, no_permitidos, usados))
+    return resultados
+
+
+# ----------------------------------------------------------------------------
+# Principal
+# ----------------------------------------------------------------------------
+
+def conexion_servidor(database=None):
+    config = {
+        'host': os.getenv('DB_HOST', '127.0.0.1'),
+        'port': int(os.getenv('DB_PORT', 3306)),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'charset': 'utf8mb4',
+        'collation': 'utf8mb4_unicode_ci',
+    }
+    if database:
+        config['database'] = database
+    return mysql.connector.connect(**config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', default='confirmacion_planes', help='Base temporal (se crea y se borra)')
+    parser.add_argument('--eventos', type=int, default=200)
+    parser.add_argument('--filas', type=int, default=30000)
+    parser.add_argument('--estricto', action='store_true', help='Fallar también por rutas sin recorrer o permisos sobrantes')
+    parser.add_argument('--conservar', action='store_true', help='No borrar la base al terminar')
+    parser.add_argument('--detalle', action='store_true', help='Imprimir SQL y plan de las sentencias con problemas')
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not re.fullmatch(r'\w+', args.base):
+        sys.exit(f"❌ Nombre de base inválido: {args.base}")
+    if args.base == os.getenv('DB_NAME', 'confirmacion_db'):
+        sys.exit("❌ --base no puede ser DB_NAME: la base se borra al terminar")
+
+    servidor = conexion_servidor()
+    cursor = servidor.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{args.base}`")
+    cursor.execute(f"CREATE DATABASE `{args.base}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cursor.close()
+
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        conn = conexion_servidor(args.base)
+        faltantes = cargar_esquema(conn)
+
+        # La app se importa contra la base temporal; valores vacíos para que
+        # load_dotenv() no los reemplace con los de .env
+        os.environ.update({
+            'DB_NAME': args.base,
+            'DB_REPLICA_HOST': '',
+            'DB_GROUP_COMMIT': '0',
+            'REPORTE_CACHE_TTL': '0',
+            'PAGE_CACHE_MAX': '0',
+            'LOG_LEVEL': 'WARNING',
+            'LOG_DIR': os.path.join(tmp.name, 'logs'),
+            'RUN_DIR': os.path.join(tmp.name, 'run'),
+            'EXPORT_JOB_DIR': os.path.join(tmp.name, 'exports'),
+        })
+        sys.path.insert(0, BASE_DIR)
+        import app
+
+        print(f"Cargando {args.eventos} eventos y {args.filas:,} confirmaciones en `{args.base}`")
+        datos = sembrar(app, args.eventos, args.filas)
+
+        capturas = []
+        capturar(app, capturas)
+        recorrer_rutas(app, datos)
+
+        resultados = revisar(conn, capturas)
+        conn.close()
+    finally:
+        if not args.conservar:
+            cursor = servidor.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS `{args.base}`")
+            cursor.close()
+        servidor.close()
+        tmp.cleanup()
+
+    fallas = 0
+    print(f"\n{'Función':<28}{'línea':>6}  {'Sentencia':<10}Resultado")
+    for captura, plan, problemas, no_permitidos, usados in sorted(resultados, key=lambda r: r[0].linea):
+        verbo = captura.sql.split(None, 1)[0].upper()
+        if no_permitidos:
+            fallas += 1
+            estado = '❌ ' + ', '.join(f'{p} ({t})' for p, t in no_permitidos)
+        elif usados:
+            estado = '⚠️  permitido: ' + ', '.join(f'{e[1]} ({e[2]})' for e in usados)
+        else:
+            estado = '✓'
+        print(f"{captura.funcion:<28}{captura.linea:>6}  {verbo:<10}{estado}")
+        if no_permitidos and args.detalle:
+            print(f"    SQL: {' '.join(captura.sql.split())}")
+            print(f"    params: {captura.params!r}")
+            print('    ' + json.dumps(plan, indent=2, ensure_ascii=False).replace('\n', '\n    '))
+
+    avisos = 0
+    if faltantes:
+        print("\n⚠️  Migraciones con cambios que schema.sql no tiene:")
+        for nombre, sentencia in faltantes:
+            print(f"    {nombre}: {sentencia}")
+
+    recorridos = {(c.funcion, c.linea) for c in capturas}
+    sin_recorrer = [
+        (funcion, inicio) for funcion, inicio, fin in sitios_sql()
+        if not any(f == funcion and inicio <= linea <= fin for f, linea in recorridos)
+    ]
+    if sin_recorrer:
+        avisos += len(sin_recorrer)
+        print("\n⚠️  Sentencias de app.py que ninguna ruta ejecutó (agregar a recorrer_rutas):")
+        for funcion, linea in sin_recorrer:
+            print(f"    {funcion} (línea {linea})")
+
+    usados = {entrada for r in resultados for entrada in r[4]}
+    sobrantes = [entrada for entrada in PERMITIDOS if entrada not in usados]
+    if sobrantes:
+        avisos += len(sobrantes)
+        print("\n⚠️  Entradas de PERMITIDOS que ya no se usan (quitarlas):")
+        for funcion, problema, tabla, _ in sobrantes:
+            print(f"    {funcion}: {problema} ({tabla})")
+
+    print(f"\n{len(resultados)} sentencias revisadas, {fallas} con problemas no permitidos")
+    if fallas or (args.estricto and avisos):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
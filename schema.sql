@@ -25,7 +25,8 @@ CREATE TABLE IF NOT EXISTS evento (
     creado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_slug (slug),
-    INDEX idx_activo (activo),
+    -- Evento activo más reciente (WHERE activo = TRUE ORDER BY creado_en DESC LIMIT 1)
+    INDEX idx_activo_creado (activo, creado_en),
     INDEX idx_ubicacion_key (ubicacion_key)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -56,7 +57,27 @@ CREATE TABLE IF NOT EXISTS confirmacion_asistencia (
     -- Índices para mejorar búsquedas
     INDEX idx_id_evento (id_evento),
     INDEX idx_nombre (nombre_completo),
-    INDEX idx_confirmado_en (confirmado_en)
+    INDEX idx_confirmado_en (confirmado_en),
+    -- Paginación keyset de listados por evento (ORDER BY confirmado_en DESC, id DESC)
+    INDEX idx_evento_confirmado (id_evento, confirmado_en, id),
+    -- Búsqueda del admin: nombre/dependencia por relevancia, correo y placas por prefijo
+    FULLTEXT INDEX ft_nombre_dependencia (nombre_completo, dependencia),
+    INDEX idx_email (email(20)),
+    INDEX idx_placas (vehiculo_placas(8)),
+    -- Reporte de vehículos: desgloses por modelo/color de un evento
+    INDEX idx_evento_vehiculo (id_evento, trae_vehiculo, vehiculo_modelo, vehiculo_color)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Contadores por evento (mantenidos por la aplicación en la misma transacción
+-- que cada confirmación; repartidos en varios slots para evitar contención)
+CREATE TABLE IF NOT EXISTS evento_contador (
+    id_evento INT NOT NULL COMMENT 'Referencia al evento',
+    slot TINYINT UNSIGNED NOT NULL COMMENT 'Fila del contador repartido',
+    total_confirmaciones INT NOT NULL DEFAULT 0,
+    total_vehiculos INT NOT NULL DEFAULT 0,
+    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_evento, slot),
+    FOREIGN KEY (id_evento) REFERENCES evento(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Insertar evento de ejemplo (opcional)
@@ -86,3 +107,4 @@ VALUES (
 -- 3. Los campos de vehículo son NULL si trae_vehiculo = 0
 -- 4. utf8mb4 permite almacenar cualquier carácter Unicode, incluidos emojis
 -- 5. ON DELETE CASCADE elimina confirmaciones si se elimina el evento
+-- 6. evento_contador se reconstruye con: flask --app app reconciliar-contadores
@@ -478,7 +478,8 @@
                 body: JSON.stringify(data)
             });
 
-            const result = await response.json();
+            // Un 503/429 de un proxy puede no traer JSON
+            const result = await response.json().catch(() => ({}));
 
             if (response.ok && result.ok) {
                 // Éxito - redirigir a página de confirmación
@@ -492,14 +493,25 @@
                 if (response.status === 409) {
                     // Error de duplicado
                     showError('Ya existe una confirmación registrada con estos datos para este evento. Si cree que es un error, verifique el nombre y la dependencia.');
+                } else if (response.status === 503 || response.status === 429) {
+                    // Servidor saturado o demasiados envíos: no reintentar antes de Retry-After
+                    const retryAfter = parseInt(response.headers.get('Retry-After'), 10);
+                    const wait = Number.isFinite(retryAfter) && retryAfter > 0 ? retryAfter : 5;
+                    showError(`${result.error || 'El servicio está saturado.'} Puede volver a enviar en ${wait} segundos.`);
+                    setSubmitLoading(true);
+                    setTimeout(() => setSubmitLoading(false), wait * 1000);
                 } else if (response.status === 400) {
-                    // Error de validación
-                    const friendly = friendlyApiMessage(result);
-                    if (friendly.field) {
-                        showFieldError(friendly.field, friendly.message);
-                    } else {
-                        showError(friendly.message);
-                    }
+                    // Error de validación: el servidor reporta todos los campos en `errors`;
+                    // se marcan en orden inverso para que el foco quede en el primero
+                    const apiErrors = Array.isArray(result.errors) && result.errors.length ? result.errors : [result];
+                    apiErrors.slice().reverse().forEach((apiError) => {
+                        const friendly = friendlyApiMessage(apiError);
+                        if (friendly.field) {
+                            showFieldError(friendly.field, friendly.message);
+                        } else {
+                            showError(friendly.message);
+                        }
+                    });
                 } else {
                     // Otro error
                     showError(result.error || 'Ocurrió un error al procesar su confirmación. Por favor intente nuevamente.');
@@ -0,0 +1,120 @@
+"""
+Tiempos por request (spans)
+Cada request lleva un RequestTimer en una ContextVar; los puntos
+instrumentados (checkout del pool, cada consulta, commit, render de Jinja,
+serialización JSON, compresión) le agregan spans. Sin timer activo (apagado,
+hilos en segundo plano) registrar cuesta una lectura de la ContextVar.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('tiempos_request', default=None)
+
+
+class RequestTimer:
+    """Spans de una request: totales por nombre y lista ordenada (acotada) para el log."""
+
+    __slots__ = ('start', 'totals', 'spans', 'max_spans', 'dropped', '_open')
+
+    def __init__(self, max_spans=200):
+        self.start = time.perf_counter()
+        self.totals = {}
+        self.spans = []
+        self.max_spans = max_spans
+        self.dropped = 0
+        self._open = []
+
+    def record(self, name, start, duration, detail=None):
+        """`start` es un perf_counter(); `detail` se convierte a texto solo al reportar."""
+        total = self.totals.get(name)
+        if total is None:
+            self.totals[name] = [1, duration]
+        else:
+            total[0] += 1
+            total[1] += duration
+        if len(self.spans) < self.max_spans:
+            self.spans.append((name, start - self.start, duration, detail))
+        else:
+            self.dropped += 1
+
+    def begin(self, name):
+        """Abre un span que se cierra con end() (para hooks sin contexto propio, p. ej. señales)."""
+        self._open.append((name, time.perf_counter()))
+
+    def end(self, name, detail=None):
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == name:
+                _, start = self._open.pop(i)
+                self.record(name, start, time.perf_counter() - start, detail)
+                return
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self):
+        """Valor del header Server-Timing: un elemento por nombre más `total`."""
+        parts = []
+        for name, (count, duration) in self.totals.items():
+            part = f'{name};dur={duration * 1000:.2f}'
+            if count > 1:
+                part += f';desc="{count}x"'
+            parts.append(part)
+        parts.append(f'total;dur={self.elapsed() * 1000:.2f}')
+        return ', '.join(parts)
+
+    def breakdown(self):
+        """Spans en orden, en ms desde el inicio de la request."""
+        return [
+            {
+                'span': name,
+                'inicio_ms': round(offset * 1000, 2),
+                'ms': round(duration * 1000, 2),
+                'detalle': _detail_text(detail),
+            }
+            for name, offset, duration, detail in self.spans
+        ]
+
+    def summary(self):
+        """Totales por nombre en una línea: `db=12.3ms/5 render=4.1ms`."""
+        parts = []
+        for name, (count, duration) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            parts.append(f'{name}={duration * 1000:.1f}ms' + (f'/{count}' if count > 1 else ''))
+        return ' '.join(parts)
+
+
+def _detail_text(detail, limit=120):
+    if detail is None:
+        return None
+    if isinstance(detail, (bytes, bytearray)):
+        detail = detail.decode('utf-8', 'replace')
+    text = ' '.join(str(detail).split())
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def start(max_spans=200):
+    """Nuevo timer para la request en curso (reemplaza al anterior del hilo)."""
+    timer = RequestTimer(max_spans)
+    _current.set(timer)
+    return timer
+
+
+def current():
+    return _current.get()
+
+
+def finish():
+    _current.set(None)
+
+
+@contextmanager
+def span(name, detail=None):
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, begin, time.perf_counter() - begin, detail)
@@ -0,0 +1,272 @@
+"""
+Validación de confirmaciones de asistencia
+Esquema declarativo compilado una sola vez al importar el módulo
+"""
+import re
+
+
+class ValidationError(Exception):
+    """Error de validación de un campo (código estable para el frontend)."""
+
+    def __init__(self, message, field=None, code=None, meta=None):
+        super().__init__(message)
+        self.message = message
+        self.field = field
+        self.code = code
+        self.meta = meta or {}
+
+    def to_dict(self):
+        payload = {'error': self.message}
+        if self.field:
+            payload['field'] = self.field
+        if self.code:
+            payload['code'] = self.code
+        if self.meta:
+            payload.update(self.meta)
+        return payload
+
+
+def normalize_text(value):
+    """Colapsa cualquier whitespace (saltos de línea, tabs, etc.) en un espacio."""
+    if value is None:
+        return None
+    # str.split() usa la misma definición de whitespace que \s en `re`
+    return ' '.join(str(value).split())
+
+
+EMAIL_REGEX = re.compile(
+    r"^[A-Z0-9.!#$%&'*+/=?^_`{|}~-]+@"
+    r"[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?"
+    r"(?:\.[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?)+$",
+    re.IGNORECASE,
+)
+
+GRADOS_PERMITIDOS = frozenset({'Dr.', 'Dra.', 'Mtro.', 'Mtra.', 'Lic.', 'Ing.', 'Arq.', 'Otro'})
+
+# Permitir solo letras (incluye acentos), puntos y espacios (abreviado)
+GRADO_OTRO_REGEX = re.compile(r"[A-Za-zÁÉÍÓÚÜÑáéíóúüñ. ]+")
+PLACAS_REGEX = re.compile(r"[A-Z0-9]+")
+
+VALORES_SI = frozenset({'true', '1', 'si', 'sí', 'yes', 'on'})
+VALORES_NO = frozenset({'false', '0', 'no', 'off'})
+
+
+def _max_length_error(field, label, max_len):
+    return ValidationError(
+        f'El campo {label} excede el límite de {max_len} caracteres',
+        field=field,
+        code='max_length',
+        meta={'max': max_len}
+    )
+
+
+# ----------------------------------------------------------------------------
+# Tipos de campo
+# ----------------------------------------------------------------------------
+
+class TextField:
+    """Texto normalizado con longitud máxima y, opcionalmente, opciones o patrón."""
+
+    def __init__(self, name, max_length, label=None, required=True, choices=None, pattern=None):
+        self.name = name
+        self.label = label or name
+        self.max_length = max_length
+        self.required = required
+        self.choices = frozenset(choices) if choices is not None else None
+        self.fullmatch = pattern.fullmatch if pattern is not None else None
+
+    def clean(self, data):
+        value = normalize_text(data.get(self.name))
+        if not value:
+            if self.required:
+                raise ValidationError(f'El campo {self.label} es obligatorio', field=self.name, code='required')
+            return None
+        if len(value) > self.max_length:
+            raise _max_length_error(self.name, self.label, self.max_length)
+        if self.choices is not None and value not in self.choices:
+            raise ValidationError(f'El campo {self.label} es inválido', field=self.name, code='invalid_choice')
+        if self.fullmatch is not None and not self.fullmatch(value):
+            raise ValidationError(
+                f'El campo {self.label} contiene caracteres inválidos',
+                field=self.name,
+                code='invalid_characters'
+            )
+        return value
+
+
+class EmailField:
+    """Correo en minúsculas, sin whitespace y validado con EMAIL_REGEX."""
+
+    def __init__(self, name, max_length, label=None):
+        self.name = name
+        self.label = label or name
+        self.max_length = max_length
+
+    def clean(self, data):
+        raw = data.get(self.name)
+        if raw is None:
+            raise ValidationError(f'El campo {self.label} es obligatorio', field=self.name, code='required')
+        # Sanitización: eliminar cualquier whitespace (pega con espacios, saltos de línea, etc.)
+        email = ''.join(str(raw).lower().split())
+        if not email:
+            raise ValidationError(f'El campo {self.label} es obligatorio', field=self.name, code='required')
+        if len(email) > self.max_length:
+            raise _max_length_error(self.name, self.label, self.max_length)
+        if not EMAIL_REGEX.fullmatch(email):
+            raise ValidationError(f'El campo {self.label} es inválido', field=self.name, code='invalid')
+        return email
+
+
+class PositiveIdField:
+    """Identificador entero positivo (p. ej. id_evento)."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def clean(self, data):
+        value = normalize_text(data.get(self.name))
+        try:
+            number = int(value) if value and value.isdigit() else None
+        except ValueError:
+            number = None
+        if number is None:
+            raise ValidationError(f'El campo {self.name} es obligatorio', field=self.name, code='required')
+        if number <= 0:
+            raise ValidationError(f'El campo {self.name} es inválido', field=self.name, code='invalid')
+        return number
+
+
+class BooleanChoiceField:
+    """Sí/No obligatorio (acepta bool o texto tipo 'si', 'false', 'on'...)."""
+
+    def __init__(self, name, message):
+        self.name = name
+        self.message = message
+
+    def clean(self, data):
+        value = data.get(self.name)
+        if isinstance(value, bool):
+            return value
+        if value is not None:
+            text = str(value).strip().lower()
+            if text in VALORES_SI:
+                return True
+            if text in VALORES_NO:
+                return False
+        raise ValidationError(self.message, field=self.name, code='required')
+
+
+class PlacasField:
+    """Placas opcionales: mayúsculas, sin espacios ni guiones, solo [A-Z0-9]."""
+
+    def __init__(self, name, raw_max_length, max_length, label=None):
+        self.name = name
+        self.label = label or name
+        self.raw = TextField(name, raw_max_length, label=self.label, required=False)
+        self.max_length = max_length
+
+    def clean(self, data):
+        raw = self.raw.clean(data)
+        if not raw:
+            return None
+        placas = raw.upper().replace(' ', '').replace('-', '')
+        if len(placas) > self.max_length:
+            raise _max_length_error(self.name, self.label, self.max_length)
+        if not PLACAS_REGEX.fullmatch(placas):
+            raise ValidationError(
+                f'El campo {self.label} contiene caracteres inválidos',
+                field=self.name,
+                code='invalid_characters'
+            )
+        return placas
+
+
+# ----------------------------------------------------------------------------
+# Esquema
+# ----------------------------------------------------------------------------
+
+class Schema:
+    """Lista de campos + reglas entre campos; reporta todos los errores.
+
+    Cada regla recibe (data, values, errors) después de limpiar los campos y
+    puede ajustar `values` o agregar errores.
+    """
+
+    def __init__(self, fields, rules=()):
+        self.fields = tuple(fields)
+        self.rules = tuple(rules)
+        self._cleaners = tuple((f.name, f.clean) for f in self.fields)
+
+    def validate(self, data):
+        """Devuelve (values, errors); `values` solo es confiable si no hay errores."""
+        values = {}
+        errors = []
+        for name, clean in self._cleaners:
+            try:
+                values[name] = clean(data)
+            except ValidationError as ve:
+                errors.append(ve)
+        for rule in self.rules:
+            rule(data, values, errors)
+        return values, errors
+
+
+GRADO_OTRO_FIELD = TextField('grado_otro', 20, label='grado (otro)', pattern=GRADO_OTRO_REGEX)
+VEHICULO_CAMPOS = ('vehiculo_modelo', 'vehiculo_color', 'vehiculo_placas')
+
+
+def _regla_grado_otro(data, values, errors):
+    """Si el grado es 'Otro', se usa el texto abreviado de grado_otro."""
+    if values.get('grado') != 'Otro':
+        return
+    try:
+        values['grado'] = GRADO_OTRO_FIELD.clean(data)
+    except ValidationError as ve:
+        errors.append(ve)
+
+
+def _regla_vehiculo(data, values, errors):
+    """Datos del vehículo obligatorios si trae vehículo; se descartan si no."""
+    trae_vehiculo = values.get('trae_vehiculo')
+    if trae_vehiculo is None:
+        return
+    if not trae_vehiculo:
+        for name in VEHICULO_CAMPOS:
+            values[name] = None
+        return
+    campos_con_error = {e.field for e in errors}
+    for name in VEHICULO_CAMPOS:
+        if name not in campos_con_error and not values.get(name):
+            errors.append(ValidationError(
+                f'El campo {name} es obligatorio si trae vehículo', field=name, code='required'
+            ))
+
+
+CONFIRMACION_SCHEMA = Schema(
+    fields=[
+        BooleanChoiceField('trae_vehiculo', 'Debe seleccionar si asistirá con vehículo'),
+        PositiveIdField('id_evento'),
+        TextField('dependencia', 255, label='dependencia'),
+        TextField('puesto', 255, label='puesto'),
+        TextField('grado', 50, label='grado', choices=GRADOS_PERMITIDOS),
+        TextField('nombre_completo', 255, label='nombre_completo'),
+        EmailField('email', 254, label='correo electrónico'),
+        TextField('vehiculo_modelo', 100, label='vehiculo_modelo', required=False),
+        TextField('vehiculo_color', 50, label='vehiculo_color', required=False),
+        PlacasField('vehiculo_placas', 60, 20, label='vehiculo_placas'),
+    ],
+    rules=[_regla_grado_otro, _regla_vehiculo],
+)
+
+
+def validate_confirmacion(data):
+    """Valida el payload de /api/confirmacion; devuelve (values, errors)."""
+    return CONFIRMACION_SCHEMA.validate(data)
+
+
+def validation_error_payload(errors):
+    """Respuesta JSON 400: el primer error en la raíz (compatibilidad) + la lista completa."""
+    payload = {'ok': False}
+    payload.update(errors[0].to_dict())
+    payload['errors'] = [e.to_dict() for e in errors]
+    return payload
@@ -12,6 +12,7 @@ load_dotenv()
 
 # Importar la aplicación Flask
 from app import app
+from compresion import brotli, compression_from_env
 
 # Obtener prefijo de la ruta desde variable de entorno
 # Normalizar: remover barras al inicio y al final
@@ -39,5 +40,11 @@ else:
     print("✓ Aplicación montada en la raíz: /")
     print("✓ URL de acceso: http://localhost:5000/")
 
+# Compresión gzip/brotli de HTML, JSON y CSV (también en streaming)
+compressed = compression_from_env(application)
+if compressed is not application:
+    application = compressed
+    print(f"✓ Compresión activa ({'brotli y gzip' if brotli is not None else 'gzip'})")
+
 # Para usar con servidores WSGI como Gunicorn:
 # gunicorn wsgi:application